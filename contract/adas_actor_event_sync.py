@@ -0,0 +1,27 @@
+from datetime import datetime
+from typing import List
+from pydantic import BaseModel
+from contract.adas_actor_event import AdasActorEvent
+
+
+class AdasActorEventSnapshot(BaseModel):
+    """
+    Full set of active events as known by nav_app after applying the delta
+    with the same sequence number.
+    """
+    epoch: str  # Boot id of the nav_app that numbered the sequence
+    sequence: int
+    timestamp: datetime
+    events: List[AdasActorEvent]
+
+
+class AdasActorEventDelta(BaseModel):
+    """
+    Change to the set of active events. Deltas are numbered consecutively,
+    so a receiver can detect a gap and resync from the next snapshot.
+    Sequence numbers restart with every nav_app run, which gets a new epoch.
+    """
+    epoch: str  # Boot id of the nav_app that numbered the sequence
+    sequence: int
+    created: List[AdasActorEvent] = []
+    deleted: List[str] = []  # UUIDs of the deleted events
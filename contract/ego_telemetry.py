@@ -0,0 +1,9 @@
+from datetime import datetime
+from typing import Tuple
+from pydantic import BaseModel
+
+
+class EgoTelemetry(BaseModel):
+    timestamp: datetime
+    location: Tuple[float, float, float]
+    speed: float  # m/s
@@ -23,6 +23,9 @@ def initialize_mqtt_client():
 
     # Callback when a message is received
     def on_message(client, userdata, message):
+        # A zero-length message only clears a retained one, nothing to handle
+        if not message.payload:
+            return
         try:
             payload = json.loads(message.payload.decode())
             topic = message.topic
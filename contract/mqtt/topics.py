@@ -2,7 +2,15 @@ class Topics:
     VEHICLE_ADAS_ACTOR_SEEN = "vehicle/adas-actor/seen"
     VEHICLE_ADAS_ACTOR_EVENT_CREATED = "vehicle/adas-actor/event_created"
     VEHICLE_ADAS_ACTOR_EVENT_DELETED = "vehicle/adas-actor/event_deleted"
-    VEHICLE_ADAS_ACTOR_SHOULD_MONITOR = "vehicle/adas-actor/should-monitor",
-    VEHICLE_PASSENGER_LEFT = "vehicle/passenger/left",
-    VEHICLE_SENSORS_SEMANTIC_SEGMENTATION = "vehicle/sensors/semantic-segmentation",
+    VEHICLE_ADAS_ACTOR_EVENT_DELTA = "vehicle/adas-actor/event_delta"
+    VEHICLE_ADAS_ACTOR_EVENT_SNAPSHOT = "vehicle/adas-actor/event_snapshot"
+    VEHICLE_ADAS_ACTOR_EVENT_SNAPSHOT_REQUEST = "vehicle/adas-actor/event_snapshot_request"
+    # Per-region topic, see contract.regions.region_topic
+    VEHICLE_ADAS_ACTOR_REGION_EVENT_SNAPSHOT = "vehicle/adas-actor/region/{x}_{y}/event_snapshot"
+    VEHICLE_ADAS_ACTOR_SHOULD_MONITOR = "vehicle/adas-actor/should-monitor"
+    VEHICLE_EGO_TELEMETRY = "vehicle/status/ego_telemetry"
+    VEHICLE_NAVIGATION_ROUTE = "vehicle/navigation/route"
+    VEHICLE_PASSENGER_LEFT = "vehicle/passenger/left"
+    # Published over Zenoh, see contract.semantic_frame_message
+    VEHICLE_SENSORS_SEMANTIC_SEGMENTATION = "vehicle/sensors/semantic-segmentation"
     FRONTEND_NOTIFICATION_UPDATE= "vehicle/infotainment/notification_update"
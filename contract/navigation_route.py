@@ -0,0 +1,8 @@
+from datetime import datetime
+from typing import List, Tuple
+from pydantic import BaseModel
+
+
+class NavigationRoute(BaseModel):
+    timestamp: datetime
+    waypoints: List[Tuple[float, float, float]]
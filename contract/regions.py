@@ -0,0 +1,31 @@
+import math
+from typing import Set, Tuple
+
+# nav_app and every subscriber must agree on the tiling, so it lives here
+REGION_TILE_SIZE_METERS = 500.0
+
+# Active events are distributed as per-region snapshots, which infotainment
+# subscribes to around the ego vehicle, instead of the fleet-wide delta and
+# snapshot topics. nav_app publishes only the stream selected here, so every
+# unit must run with the same value.
+USE_REGION_TOPICS = True
+
+Region = Tuple[int, int]
+
+
+def region_of(location) -> Region:
+    return (math.floor(location[0] / REGION_TILE_SIZE_METERS), math.floor(location[1] / REGION_TILE_SIZE_METERS))
+
+
+def regions_around(location, rings: int = 1) -> Set[Region]:
+    """The region containing location and the `rings` rings of regions around it."""
+    center_x, center_y = region_of(location)
+    return {
+        (center_x + dx, center_y + dy)
+        for dx in range(-rings, rings + 1)
+        for dy in range(-rings, rings + 1)
+    }
+
+
+def region_topic(topic_template: str, region: Region) -> str:
+    return topic_template.format(x=region[0], y=region[1])
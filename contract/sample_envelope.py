@@ -0,0 +1,37 @@
+"""
+Envelope stamping Zenoh samples with the simulation frame they belong to.
+
+The envelope travels in the sample's attachment, so payloads stay as they
+are (plain strings for the status topics) and subscribers that don't know
+about envelopes keep working. Subscribers that do can align samples of
+different topics by CARLA frame instead of pairing whatever arrived last.
+
+    magic, version, reserved, frame id, sim time (seconds)
+
+Self-contained (standard library only) so it can be copied next to the CARLA
+example scripts and the PID controller (sdv_lab/pid_controller/python-zenoh),
+which don't have the tide packages on their path.
+"""
+
+import struct
+
+MAGIC = b"TENV"
+VERSION = 1
+
+# magic, version, reserved, reserved, frame id, sim time
+_ENVELOPE = struct.Struct("<4sBBHQd")
+ENVELOPE_SIZE = _ENVELOPE.size
+
+
+def pack_envelope(frame_id: int, sim_time: float) -> bytes:
+    return _ENVELOPE.pack(MAGIC, VERSION, 0, 0, frame_id, sim_time)
+
+
+def unpack_envelope(data):
+    """(frame id, sim time) of an envelope, None if `data` isn't one."""
+    if data is None or len(data) != _ENVELOPE.size:
+        return None
+    magic, version, _, _, frame_id, sim_time = _ENVELOPE.unpack(data)
+    if magic != MAGIC or version != VERSION:
+        return None
+    return frame_id, sim_time
@@ -0,0 +1,189 @@
+"""
+Compact encoding of semantic segmentation frames.
+
+CARLA delivers semantic frames as BGRA with the class tag in the red channel
+and nothing in the other three, so only that class plane is kept. It is then
+stored with whichever of two encodings is smaller for the frame at hand:
+
+    run-length   runs of equal tags, row-major: n runs, tags, uint16 lengths
+    palette      the distinct tags, followed by every pixel's palette index
+                 bit-packed at the smallest width that fits (1 bit for two
+                 classes, 5 bits for the 23 CARLA classes)
+
+Both directions are vectorized, decoding is a single np.repeat or unpackbits.
+
+Recordings are a file header followed by one record per frame, each with the
+frame id, timestamp and encoded size in front of the encoded frame.
+
+Self-contained (numpy and the standard library only) so it can be copied next
+to the CARLA example scripts, which don't have the tide packages on their path.
+"""
+
+import struct
+from typing import BinaryIO, Iterator, Tuple
+
+import numpy as np
+
+MAGIC = b"TSCP"
+VERSION = 1
+
+METHOD_RUN_LENGTH = 0
+METHOD_PALETTE = 1
+
+CLASS_CHANNEL = 2  # red in BGRA
+
+_MAX_RUN = 0xFFFF
+
+# magic, version, method, reserved, width, height
+_HEADER = struct.Struct("<4sBBHII")
+_RUN_COUNT = struct.Struct("<I")
+_PALETTE_HEADER = struct.Struct("<BB")  # palette size - 1, bits per index
+
+RECORDING_MAGIC = b"TSCR"
+# frame id, timestamp, encoded size
+_RECORD = struct.Struct("<QdI")
+
+
+def class_plane(raw_data, width: int, height: int, channels: int = 4) -> np.ndarray:
+    """The (height, width) class tags of a raw BGRA frame, as a view (no copy)."""
+    pixels = np.frombuffer(raw_data, dtype=np.uint8)
+    if pixels.size != width * height * channels:
+        raise ValueError(f"frame has {pixels.size} bytes, expected {width * height * channels}")
+    return pixels.reshape((height, width, channels))[..., CLASS_CHANNEL]
+
+
+def _runs(flat: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    starts = np.flatnonzero(flat[1:] != flat[:-1]) + 1
+    starts = np.concatenate(([0], starts))
+    lengths = np.diff(np.append(starts, flat.size))
+    return flat[starts], lengths
+
+
+def _encode_run_length(values: np.ndarray, lengths: np.ndarray) -> bytes:
+    # Split runs longer than a uint16 into several runs of the same tag
+    pieces = (lengths + _MAX_RUN - 1) // _MAX_RUN
+    if np.any(pieces > 1):
+        values = np.repeat(values, pieces)
+        last = np.cumsum(pieces) - 1
+        split = np.full(values.size, _MAX_RUN, dtype=np.int64)
+        split[last] = lengths - (pieces - 1) * _MAX_RUN
+        lengths = split
+    return (_RUN_COUNT.pack(values.size)
+            + values.astype(np.uint8).tobytes()
+            + lengths.astype("<u2").tobytes())
+
+
+def _decode_run_length(body: memoryview, size: int) -> np.ndarray:
+    (count,) = _RUN_COUNT.unpack_from(body)
+    values = np.frombuffer(body, dtype=np.uint8, count=count, offset=_RUN_COUNT.size)
+    lengths = np.frombuffer(body, dtype="<u2", count=count, offset=_RUN_COUNT.size + count)
+    flat = np.repeat(values, lengths)
+    if flat.size != size:
+        raise ValueError(f"run-length body decodes to {flat.size} pixels, expected {size}")
+    return flat
+
+
+def _index_bits(palette_size: int) -> int:
+    return max(1, int(palette_size - 1).bit_length())
+
+
+def _encode_palette(flat: np.ndarray, palette: np.ndarray) -> bytes:
+    bits = _index_bits(palette.size)
+    lookup = np.zeros(256, dtype=np.uint8)
+    lookup[palette] = np.arange(palette.size, dtype=np.uint8)
+    indices = lookup[flat]
+    # MSB first: row i of the bit matrix holds pixel i's index
+    shifts = np.arange(bits - 1, -1, -1, dtype=np.uint8)
+    bit_matrix = (indices[:, None] >> shifts) & 1
+    return (_PALETTE_HEADER.pack(palette.size - 1, bits)
+            + palette.astype(np.uint8).tobytes()
+            + np.packbits(bit_matrix).tobytes())
+
+
+def _decode_palette(body: memoryview, size: int) -> np.ndarray:
+    palette_size, bits = _PALETTE_HEADER.unpack_from(body)
+    palette_size += 1
+    palette = np.frombuffer(body, dtype=np.uint8, count=palette_size, offset=_PALETTE_HEADER.size)
+    packed = np.frombuffer(body, dtype=np.uint8, offset=_PALETTE_HEADER.size + palette_size)
+    bit_matrix = np.unpackbits(packed, count=size * bits).reshape((size, bits))
+    weights = (1 << np.arange(bits - 1, -1, -1)).astype(np.uint8)
+    return palette[bit_matrix @ weights]
+
+
+def encode_class_plane(plane: np.ndarray) -> bytes:
+    """Encodes a (height, width) uint8 class plane with the smaller of the two encodings."""
+    height, width = plane.shape
+    flat = np.ascontiguousarray(plane, dtype=np.uint8).ravel()
+    values, lengths = _runs(flat)
+    palette = np.flatnonzero(np.bincount(flat, minlength=256))
+
+    # Sizes are known before encoding, so only the smaller one is built
+    run_length_size = _RUN_COUNT.size + 3 * int(np.sum((lengths + _MAX_RUN - 1) // _MAX_RUN))
+    palette_size = _PALETTE_HEADER.size + palette.size + (flat.size * _index_bits(palette.size) + 7) // 8
+    if run_length_size <= palette_size:
+        method, body = METHOD_RUN_LENGTH, _encode_run_length(values, lengths)
+    else:
+        method, body = METHOD_PALETTE, _encode_palette(flat, palette)
+    return _HEADER.pack(MAGIC, VERSION, method, 0, width, height) + body
+
+
+def encode_frame(raw_data, width: int, height: int, channels: int = 4) -> bytes:
+    """Encodes the class plane of a raw BGRA semantic frame."""
+    return encode_class_plane(class_plane(raw_data, width, height, channels))
+
+
+def decode_class_plane(data) -> np.ndarray:
+    """Decodes an encoded frame back to its (height, width) uint8 class plane."""
+    data = memoryview(data)
+    magic, version, method, _, width, height = _HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"not a version {VERSION} encoded semantic frame")
+    body = data[_HEADER.size:]
+    if method == METHOD_RUN_LENGTH:
+        flat = _decode_run_length(body, width * height)
+    elif method == METHOD_PALETTE:
+        flat = _decode_palette(body, width * height)
+    else:
+        raise ValueError(f"unknown semantic frame encoding method {method}")
+    return flat.reshape((height, width))
+
+
+class SemanticFrameRecorder:
+    """Appends encoded semantic frames to a recording file."""
+
+    def __init__(self, path: str, width: int, height: int, channels: int = 4):
+        self.width = width
+        self.height = height
+        self.channels = channels
+        self._file = open(path, "wb")
+        self._file.write(RECORDING_MAGIC + bytes([VERSION]))
+
+    def write(self, raw_data, frame_id: int, timestamp: float, pose=None):
+        # Recordings hold frames only; `pose` is accepted like SemanticFrameRingWriter.write and not stored
+        encoded = encode_frame(raw_data, self.width, self.height, self.channels)
+        self._file.write(_RECORD.pack(frame_id, timestamp, len(encoded)))
+        self._file.write(encoded)
+
+    def close(self):
+        self._file.close()
+
+
+def read_recording(path: str) -> Iterator[Tuple[int, float, np.ndarray]]:
+    """Yields (frame id, timestamp, class plane) for every frame in a recording."""
+    with open(path, "rb") as f:
+        _read_recording_header(f)
+        while True:
+            record = f.read(_RECORD.size)
+            if len(record) < _RECORD.size:
+                return  # end of file, or a frame cut short by a crash
+            frame_id, timestamp, size = _RECORD.unpack(record)
+            encoded = f.read(size)
+            if len(encoded) < size:
+                return
+            yield frame_id, timestamp, decode_class_plane(encoded)
+
+
+def _read_recording_header(f: BinaryIO):
+    header = f.read(len(RECORDING_MAGIC) + 1)
+    if header[:len(RECORDING_MAGIC)] != RECORDING_MAGIC or header[-1:] != bytes([VERSION]):
+        raise ValueError(f"not a version {VERSION} semantic frame recording")
@@ -0,0 +1,56 @@
+"""
+Wire format of the semantic segmentation frames published over Zenoh.
+
+The sample payload holds the pixels; this header travels in the sample's
+attachment so the payload can be handed over (or placed in Zenoh shared
+memory) without an extra copy to prepend it.
+
+Self-contained (standard library only) so it can be copied next to the CARLA
+example scripts, which don't have the tide packages on their path.
+"""
+
+import struct
+from dataclasses import dataclass
+
+# Same key as Topics.VEHICLE_SENSORS_SEMANTIC_SEGMENTATION
+SEMANTIC_FRAMES_KEY = "vehicle/sensors/semantic-segmentation"
+
+MAGIC = b"TSEM"
+VERSION = 1
+
+ENCODING_RAW = 0  # width*height*channels bytes, BGRA as delivered by CARLA
+ENCODING_CLASS_PLANE = 1  # class tags only, see contract.semantic_frame_codec
+
+# magic, version, encoding, channels, width, height, frame id, timestamp
+_HEADER = struct.Struct("<4sBBHIIQd")
+
+
+@dataclass
+class SemanticFrameHeader:
+    frame_id: int
+    timestamp: float
+    width: int
+    height: int
+    channels: int = 4
+    encoding: int = ENCODING_RAW
+
+
+def pack_frame_header(header: SemanticFrameHeader) -> bytes:
+    return _HEADER.pack(MAGIC, VERSION, header.encoding, header.channels,
+                        header.width, header.height, header.frame_id, header.timestamp)
+
+
+def unpack_frame_header(data: bytes) -> SemanticFrameHeader:
+    if len(data) != _HEADER.size:
+        raise ValueError(f"semantic frame header has {len(data)} bytes, expected {_HEADER.size}")
+    magic, version, encoding, channels, width, height, frame_id, timestamp = _HEADER.unpack(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"not a version {VERSION} semantic frame header")
+    return SemanticFrameHeader(
+        frame_id=frame_id,
+        timestamp=timestamp,
+        width=width,
+        height=height,
+        channels=channels,
+        encoding=encoding,
+    )
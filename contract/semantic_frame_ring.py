@@ -0,0 +1,207 @@
+"""
+Shared-memory ring buffer for handing semantic segmentation frames from the
+CARLA client process to on_vehicle_app without serializing them.
+
+Self-contained (numpy and the standard library only) so it can be copied next
+to the CARLA example scripts, which don't have the tide packages on their path.
+
+Layout of the shared memory block:
+
+    header   magic, version, slot count, width, height, channels, head
+    slot 0   sequence, frame id, timestamp, sensor pose, padding, width*height*channels bytes
+    slot 1   ...
+
+There is a single writer. Each slot is guarded by a sequence lock: the writer
+makes the slot's sequence odd before touching the pixels and even (2 * frame
+sequence) once done, then advances `head`. Readers never take a lock; they
+look at the slot `head` points to and use it in place if its sequence says it
+is complete. Because the pixels are not copied, a reader checks `is_valid`
+after using them to find out whether the writer lapped it in the meantime.
+"""
+
+# The CARLA client may run an older Python than the tide apps
+from __future__ import annotations
+
+import math
+import time
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Tuple
+
+import numpy as np
+
+MAGIC = 0x54494445  # "TIDE"
+VERSION = 2
+
+_HEADER_FIELDS = 8  # uint64 each: magic, version, slots, width, height, channels, head, reserved
+_HEADER_SIZE = _HEADER_FIELDS * 8
+_SLOT_HEADER_SIZE = 128  # uint64 sequence, uint64 frame id, float64 timestamp, float64 pose[6], padding
+_POSE_FIELDS = 6
+_HEAD = 6
+
+
+def _slot_size(width: int, height: int, channels: int) -> int:
+    # Keep every slot 64-byte aligned so the uint64 sequence never straddles a cache line
+    return (_SLOT_HEADER_SIZE + width * height * channels + 63) // 64 * 64
+
+
+@dataclass
+class SemanticFrameView:
+    """A frame in the ring. `pixels` is a view into shared memory, not a copy."""
+    sequence: int
+    slot: int
+    frame_id: int
+    timestamp: float
+    pixels: np.ndarray  # (height, width, channels) uint8, BGRA for CARLA frames
+    # World pose of the sensor when it took the frame, if the writer knew it:
+    # x, y, z in meters, pitch, yaw, roll in degrees (CARLA convention)
+    pose: Tuple[float, float, float, float, float, float] | None = None
+
+
+class _SemanticFrameRing:
+    def _map(self, shm: shared_memory.SharedMemory, slots: int, width: int, height: int, channels: int):
+        self._shm = shm
+        self.slots = slots
+        self.width = width
+        self.height = height
+        self.channels = channels
+        slot_size = _slot_size(width, height, channels)
+
+        self._header = np.ndarray((_HEADER_FIELDS,), dtype=np.uint64, buffer=shm.buf)
+        self._slot_headers = [
+            np.ndarray((4,), dtype=np.uint64, buffer=shm.buf, offset=_HEADER_SIZE + i * slot_size)
+            for i in range(slots)
+        ]
+        self._slot_timestamps = [
+            np.ndarray((1,), dtype=np.float64, buffer=shm.buf, offset=_HEADER_SIZE + i * slot_size + 16)
+            for i in range(slots)
+        ]
+        self._slot_poses = [
+            np.ndarray((_POSE_FIELDS,), dtype=np.float64, buffer=shm.buf, offset=_HEADER_SIZE + i * slot_size + 24)
+            for i in range(slots)
+        ]
+        self._slot_pixels = [
+            np.ndarray((height, width, channels), dtype=np.uint8, buffer=shm.buf,
+                       offset=_HEADER_SIZE + i * slot_size + _SLOT_HEADER_SIZE)
+            for i in range(slots)
+        ]
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    def close(self):
+        # Views into the buffer must go before the mapping can be closed
+        self._header = None
+        self._slot_headers = []
+        self._slot_timestamps = []
+        self._slot_poses = []
+        self._slot_pixels = []
+        self._shm.close()
+
+
+class SemanticFrameRingWriter(_SemanticFrameRing):
+    """Creates the ring and publishes frames into it. Only one writer per ring."""
+
+    def __init__(self, name: str, width: int, height: int, slots: int = 4, channels: int = 4):
+        if slots < 2:
+            raise ValueError("a ring needs at least two slots")
+        size = _HEADER_SIZE + slots * _slot_size(width, height, channels)
+        try:
+            shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            # Left over from a writer that didn't shut down cleanly
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+            shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        self._map(shm, slots, width, height, channels)
+        self._header[:] = (MAGIC, VERSION, slots, width, height, channels, 0, 0)
+        self._sequence = 0
+
+    def write(self, raw_data, frame_id: int, timestamp: float | None = None, pose=None) -> int:
+        """
+        Copies one frame into the next slot and makes it the latest frame.
+        `pose` is the sensor's world pose (x, y, z, pitch, yaw, roll), if known.
+        Returns the frame's sequence number in the ring.
+        """
+        pixels = np.frombuffer(raw_data, dtype=np.uint8)
+        if pixels.size != self.width * self.height * self.channels:
+            raise ValueError(f"frame has {pixels.size} bytes, ring slots hold "
+                             f"{self.width * self.height * self.channels}")
+
+        self._sequence += 1
+        slot = self._sequence % self.slots
+        slot_header = self._slot_headers[slot]
+        slot_header[0] = 2 * self._sequence - 1  # odd: write in progress
+        slot_header[1] = frame_id
+        self._slot_timestamps[slot][0] = time.time() if timestamp is None else timestamp
+        self._slot_poses[slot][:] = math.nan if pose is None else pose
+        np.copyto(self._slot_pixels[slot], pixels.reshape(self.height, self.width, self.channels))
+        slot_header[0] = 2 * self._sequence      # even: complete
+        self._header[_HEAD] = self._sequence
+        return self._sequence
+
+    def unlink(self):
+        self._shm.unlink()
+
+
+class SemanticFrameRingReader(_SemanticFrameRing):
+    """Attaches to a ring created by a SemanticFrameRingWriter."""
+
+    def __init__(self, name: str):
+        try:
+            # Python >= 3.13: don't let the resource tracker unlink the writer's block
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            shm = shared_memory.SharedMemory(name=name)
+        header = np.ndarray((_HEADER_FIELDS,), dtype=np.uint64, buffer=shm.buf)
+        magic, version, slots, width, height, channels = (int(v) for v in header[:6])
+        del header
+        if magic != MAGIC or version != VERSION:
+            shm.close()
+            raise ValueError(f"shared memory '{name}' is not a version {VERSION} semantic frame ring")
+        self._map(shm, slots, width, height, channels)
+        self._last_sequence = 0
+
+    def latest(self) -> SemanticFrameView | None:
+        """
+        Returns the newest complete frame, or None if there is nothing newer
+        than the last frame returned.
+        """
+        sequence = int(self._header[_HEAD])
+        if sequence == 0 or sequence == self._last_sequence:
+            return None
+        slot = sequence % self.slots
+        slot_header = self._slot_headers[slot]
+        if int(slot_header[0]) != 2 * sequence:
+            # Lapped between reading head and the slot; the next call sees the newer frame
+            return None
+        pose = self._slot_poses[slot]
+        frame = SemanticFrameView(
+            sequence=sequence,
+            slot=slot,
+            frame_id=int(slot_header[1]),
+            timestamp=float(self._slot_timestamps[slot][0]),
+            pixels=self._slot_pixels[slot],
+            pose=None if math.isnan(pose[0]) else tuple(float(v) for v in pose),
+        )
+        if not self.is_valid(frame):
+            return None
+        self._last_sequence = sequence
+        return frame
+
+    def wait_latest(self, timeout: float | None = None, poll_interval: float = 0.001) -> SemanticFrameView | None:
+        """Like latest(), but polls until a new frame arrives or timeout expires."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            frame = self.latest()
+            if frame is not None:
+                return frame
+            if deadline is not None and time.monotonic() >= deadline:
+                return None
+            time.sleep(poll_interval)
+
+    def is_valid(self, frame: SemanticFrameView) -> bool:
+        """False once the writer has started overwriting the frame's slot."""
+        return int(self._slot_headers[frame.slot][0]) == 2 * frame.sequence
@@ -0,0 +1,58 @@
+"""
+Wire format of the ego vehicle state published over Zenoh once per tick.
+
+Speed, driver inputs and pose of one simulation frame travel together in a
+single fixed-size little-endian record, instead of one stringified float
+per signal on its own topic:
+
+    magic, version, reserved, frame id, sim time,
+    speed (km/h), throttle, steer, brake,
+    x, y, z (m), pitch, yaw, roll (degrees)
+
+Self-contained (standard library only) so it can be copied next to the CARLA
+example scripts, which don't have the tide packages on their path.
+"""
+
+import struct
+from dataclasses import dataclass
+
+VEHICLE_STATE_KEY = "vehicle/status/vehicle_state"
+
+MAGIC = b"TVST"
+VERSION = 1
+
+# magic, version, reserved, reserved, frame id, sim time, 10 float32 signals
+_RECORD = struct.Struct("<4sBBHQd10f")
+RECORD_SIZE = _RECORD.size
+
+
+@dataclass
+class VehicleState:
+    frame_id: int
+    sim_time: float
+    speed: float = 0.0
+    throttle: float = 0.0
+    steer: float = 0.0
+    brake: float = 0.0
+    x: float = 0.0
+    y: float = 0.0
+    z: float = 0.0
+    pitch: float = 0.0
+    yaw: float = 0.0
+    roll: float = 0.0
+
+
+def pack_vehicle_state(state: VehicleState) -> bytes:
+    return _RECORD.pack(MAGIC, VERSION, 0, 0, state.frame_id, state.sim_time,
+                        state.speed, state.throttle, state.steer, state.brake,
+                        state.x, state.y, state.z, state.pitch, state.yaw, state.roll)
+
+
+def unpack_vehicle_state(data) -> VehicleState:
+    """Decodes a vehicle state record, e.g. a Zenoh sample's payload bytes."""
+    if len(data) != _RECORD.size:
+        raise ValueError(f"vehicle state has {len(data)} bytes, expected {_RECORD.size}")
+    magic, version, _, _, frame_id, sim_time, *signals = _RECORD.unpack(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"not a version {VERSION} vehicle state")
+    return VehicleState(frame_id, sim_time, *signals)
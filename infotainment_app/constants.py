@@ -0,0 +1,23 @@
+# Only events within this distance of the ego vehicle are notified
+NOTIFICATION_RADIUS_METERS = 50.0
+
+# Edge length of the grid cells active events are bucketed into
+SPATIAL_CELL_SIZE_METERS = 50.0
+
+# At most one notification is pushed to the UI per interval
+NOTIFICATION_MIN_INTERVAL_SECONDS = 2.0
+
+# Notifications arriving within this window are merged into one UI update
+NOTIFICATION_COALESCE_WINDOW_SECONDS = 0.5
+
+# Messages spelled out in a merged update; the rest are summarised as a count
+MAX_MESSAGES_PER_NOTIFICATION = 3
+
+# Events further than this from the planned route are dropped
+ROUTE_CORRIDOR_BUFFER_METERS = 100.0
+
+# Edge length of the tiles the route corridor is indexed with
+ROUTE_CORRIDOR_TILE_SIZE_METERS = 50.0
+
+# Rings of regions subscribed around the one the ego vehicle is in
+REGION_SUBSCRIPTION_RINGS = 1
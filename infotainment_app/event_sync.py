@@ -0,0 +1,134 @@
+import json
+from typing import Dict
+from contract.adas_actor_event_sync import AdasActorEventDelta, AdasActorEventSnapshot
+from contract.mqtt.client import CLIENT
+from contract.mqtt.topics import Topics
+from contract.navigation_route import NavigationRoute
+from contract.regions import USE_REGION_TOPICS
+from infotainment_app import handlers, region_subscriptions
+from infotainment_app.constants import ROUTE_CORRIDOR_BUFFER_METERS, ROUTE_CORRIDOR_TILE_SIZE_METERS
+from infotainment_app.handlers import active_events, handle_actor_event_created, handle_actor_event_deleted, set_route_corridor
+from infotainment_app.route_corridor import RouteCorridor
+
+# Deltas received ahead of the next expected sequence number are kept here
+# until the gap is filled by a snapshot. Bounded so a long outage can't grow it.
+MAX_PENDING_DELTAS = 256
+
+# Sequence number of the last snapshot or delta applied to active_events,
+# and the nav_app epoch it belongs to. None until the first snapshot arrives.
+applied_epoch: str | None = None
+applied_sequence: int | None = None
+# Buffered deltas, all of the same (the newest seen) epoch
+pending_deltas: Dict[int, AdasActorEventDelta] = {}
+snapshot_requested = False
+
+
+def request_snapshot():
+    global snapshot_requested
+
+    if snapshot_requested:
+        return
+    snapshot_requested = True
+    print("Requesting event snapshot")
+    CLIENT.publish(Topics.VEHICLE_ADAS_ACTOR_EVENT_SNAPSHOT_REQUEST, json.dumps({}))
+
+
+def resync():
+    """
+    Forgets the applied sequence so the next snapshot is applied in full.
+    Deltas received meanwhile are buffered as during startup.
+    """
+    global applied_epoch, applied_sequence
+
+    applied_epoch = None
+    applied_sequence = None
+    request_snapshot()
+
+
+def _apply_delta(delta: AdasActorEventDelta):
+    global applied_sequence
+
+    for event in delta.created:
+        handle_actor_event_created(event)
+    for uuid in delta.deleted:
+        if uuid in active_events:
+            handle_actor_event_deleted(active_events[uuid])
+    applied_sequence = delta.sequence
+
+
+def _apply_pending_deltas():
+    while applied_sequence + 1 in pending_deltas:
+        _apply_delta(pending_deltas.pop(applied_sequence + 1))
+    # Anything at or below the applied sequence is already covered
+    for sequence in [s for s in pending_deltas if s <= applied_sequence]:
+        del pending_deltas[sequence]
+
+
+def handle_event_snapshot(payload: AdasActorEventSnapshot):
+    global applied_epoch, applied_sequence, snapshot_requested
+
+    same_epoch = payload.epoch == applied_epoch
+    if same_epoch and payload.sequence <= applied_sequence:
+        return
+    if not same_epoch and applied_epoch is not None:
+        print("nav_app restarted, resyncing")
+    print(f"Resyncing from snapshot #{payload.sequence} with {len(payload.events)} events")
+
+    snapshot_uuids = {event.UUID for event in payload.events}
+    for uuid in [uuid for uuid in active_events if uuid not in snapshot_uuids]:
+        handle_actor_event_deleted(active_events[uuid])
+    for event in payload.events:
+        handle_actor_event_created(event)
+
+    applied_epoch = payload.epoch
+    applied_sequence = payload.sequence
+    snapshot_requested = False
+    # Deltas of an earlier nav_app run don't apply on top of this snapshot
+    if any(delta.epoch != payload.epoch for delta in pending_deltas.values()):
+        pending_deltas.clear()
+    _apply_pending_deltas()
+    # Deltas left over are ahead of a gap the snapshot didn't fill
+    if pending_deltas:
+        print(f"Missed deltas {applied_sequence + 1}..{min(pending_deltas) - 1}")
+        request_snapshot()
+
+
+def handle_event_delta(payload: AdasActorEventDelta):
+    if applied_epoch is not None and payload.epoch != applied_epoch:
+        # nav_app restarted: its numbering starts over, the events we hold may be gone
+        print("nav_app restarted, resyncing")
+        resync()
+    elif applied_sequence is not None and payload.sequence <= applied_sequence:
+        return
+    elif applied_sequence is not None and payload.sequence == applied_sequence + 1:
+        _apply_delta(payload)
+        _apply_pending_deltas()
+        return
+
+    # Not synced yet, or a delta went missing: keep it for after the snapshot
+    if any(delta.epoch != payload.epoch for delta in pending_deltas.values()):
+        pending_deltas.clear()
+    if len(pending_deltas) >= MAX_PENDING_DELTAS:
+        del pending_deltas[min(pending_deltas)]
+    pending_deltas[payload.sequence] = payload
+    if applied_sequence is not None:
+        print(f"Missed deltas {applied_sequence + 1}..{payload.sequence - 1}")
+        request_snapshot()
+
+
+def handle_navigation_route(payload: NavigationRoute):
+    # An empty route means no route is planned, not a corridor nothing is in
+    if not payload.waypoints:
+        if handlers.route_corridor is None:
+            return
+        print("Route cleared")
+        set_route_corridor(None)
+    else:
+        print(f"New route with {len(payload.waypoints)} waypoints")
+        set_route_corridor(RouteCorridor(
+            payload.waypoints, ROUTE_CORRIDOR_BUFFER_METERS, ROUTE_CORRIDOR_TILE_SIZE_METERS))
+    # Events dropped for being off the old route may be on the new one
+    if USE_REGION_TOPICS:
+        region_subscriptions.resubscribe()
+    else:
+        resync()
@@ -1,37 +1,48 @@
 from typing import Dict
 from contract.adas_actor_event import AdasActorEvent
-import math
-from infotainment_app.notification_manager import update_notification_message
+from contract.ego_telemetry import EgoTelemetry
+from infotainment_app import notification_scheduler
+from infotainment_app.route_corridor import RouteCorridor
 
 # Dictionary to store currently active events
 active_events: Dict[str, AdasActorEvent] = {}
 
-def distance(loc1, loc2):
-    # Euclidean distance in 3D
-    return math.sqrt(
-        (loc1[0] - loc2[0]) ** 2 +
-        (loc1[1] - loc2[1]) ** 2 +
-        (loc1[2] - loc2[2]) ** 2
-    )
+# Corridor around the planned route. None until a route is received, in
+# which case every event is kept.
+route_corridor: RouteCorridor | None = None
 
 def handle_actor_event_created(payload: AdasActorEvent):
     global active_events
 
     if payload.UUID not in active_events:
+        if route_corridor is not None and not route_corridor.contains(payload.location):
+            print(f"Ignored event off the route: {payload.UUID}")
+            return
         active_events[payload.UUID] = payload
         print(f"Added new active event: {payload.UUID}")
-        # Check if the car is close enough to the event
-        car_location = payload.location
-        if distance(car_location, payload.location) <= 50:  # Threshold distance in meters
-            print("Event is in of range")
-            notification_message = f"Incident detected at: {payload.location}"
-            update_notification_message(notification_message)
-        else:
-            print("Event is out of range")
+        # The scheduler decides when, and whether, the driver is told about it
+        notification_scheduler.add_event(payload)
 
 def handle_actor_event_deleted(payload: AdasActorEvent):
     global active_events
 
     if payload.UUID in active_events:
         del active_events[payload.UUID]
-        print(f"Removed active event: {payload.UUID}")
\ No newline at end of file
+        notification_scheduler.remove_event(payload.UUID)
+        print(f"Removed active event: {payload.UUID}")
+
+def handle_ego_telemetry(payload: EgoTelemetry):
+    notification_scheduler.update_ego_telemetry(payload)
+
+def set_route_corridor(corridor: RouteCorridor | None):
+    """
+    Replaces the route corridor and drops the active events outside it.
+    None removes the corridor, so every event is kept again.
+    """
+    global route_corridor
+
+    route_corridor = corridor
+    if corridor is None:
+        return
+    for event in [ev for ev in active_events.values() if not corridor.contains(ev.location)]:
+        handle_actor_event_deleted(event)
@@ -1,15 +1,110 @@
 import json
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict
 from contract.mqtt.client import CLIENT
 from contract.mqtt.topics import Topics
+from infotainment_app.constants import MAX_MESSAGES_PER_NOTIFICATION, NOTIFICATION_COALESCE_WINDOW_SECONDS
 
-def update_notification_message(message: str):
+
+def publish_notification(message: str, count: int):
     """
     Sends a message to the frontend to update the notification UI.
 
     :param message: The notification message to display.
+    :param count: How many notifications the message stands for.
     """
     print(f"Publishing topic {Topics.FRONTEND_NOTIFICATION_UPDATE} with {message}")
     payload_str = json.dumps({
-        "notificationMessage": message
+        "notificationMessage": message,
+        "notificationCount": count
     })
-    CLIENT.publish(Topics.FRONTEND_NOTIFICATION_UPDATE, payload_str)
\ No newline at end of file
+    CLIENT.publish(Topics.FRONTEND_NOTIFICATION_UPDATE, payload_str)
+
+
+class NotificationAggregator:
+    """
+    Coalesces notifications into one UI update per window.
+
+    The first message opens a window of `window` seconds; everything
+    received until it closes goes out as a single update, in arrival order,
+    with at most `max_messages` spelled out and the rest counted. Messages
+    are keyed (by event UUID): a newer message with a pending key replaces
+    the older one in place, so an update never shows two states of one event.
+    """
+
+    def __init__(self, publish: Callable[[str, int], None], window: float, max_messages: int):
+        self.publish = publish
+        self.window = window
+        self.max_messages = max_messages
+        self._lock = threading.Lock()
+        self._pending: "OrderedDict[str, str]" = OrderedDict()
+        self._timer: threading.Timer | None = None
+        self._window_received = 0
+
+        self.received = 0    # messages handed in
+        self.sent = 0        # UI updates published
+        self.superseded = 0  # messages replaced by a newer one with the same key
+        self.suppressed = 0  # messages that did not get a UI update of their own
+
+    def add(self, message: str, key: str):
+        with self._lock:
+            self.received += 1
+            self._window_received += 1
+            if key in self._pending:
+                self.superseded += 1
+            self._pending[key] = message
+            if self._timer is None:
+                self._timer = threading.Timer(self.window, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self):
+        """
+        Publishes the pending messages as one update and closes the window.
+        """
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            messages = list(self._pending.values())
+            self._pending.clear()
+            if not messages:
+                return
+            self.sent += 1
+            self.suppressed += self._window_received - 1
+            self._window_received = 0
+
+        notification_message = "; ".join(messages[:self.max_messages])
+        if len(messages) > self.max_messages:
+            notification_message += f" (+{len(messages) - self.max_messages} more)"
+        self.publish(notification_message, len(messages))
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "received": self.received,
+                "sent": self.sent,
+                "superseded": self.superseded,
+                "suppressed": self.suppressed,
+            }
+
+
+_aggregator = NotificationAggregator(publish_notification, NOTIFICATION_COALESCE_WINDOW_SECONDS, MAX_MESSAGES_PER_NOTIFICATION)
+
+
+def update_notification_message(message: str, key: str | None = None):
+    """
+    Queues a message for the frontend notification UI. Messages received
+    within NOTIFICATION_COALESCE_WINDOW_SECONDS are sent as one update.
+
+    :param message: The notification message to display.
+    :param key: What the message is about, e.g. the event UUID. A newer
+                message with the same key supersedes a pending one.
+                Defaults to the message text.
+    """
+    _aggregator.add(message, message if key is None else key)
+
+
+def get_notification_stats() -> Dict[str, int]:
+    return _aggregator.stats()
@@ -0,0 +1,156 @@
+import math
+import threading
+import time
+from typing import Dict, List, Set, Tuple
+from contract.adas_actor_event import AdasActorEvent
+from contract.ego_telemetry import EgoTelemetry
+from infotainment_app.constants import (
+    NOTIFICATION_MIN_INTERVAL_SECONDS,
+    NOTIFICATION_RADIUS_METERS,
+    SPATIAL_CELL_SIZE_METERS,
+)
+from infotainment_app.notification_manager import update_notification_message
+
+
+def distance(loc1, loc2):
+    # Euclidean distance in 3D
+    return math.sqrt(
+        (loc1[0] - loc2[0]) ** 2 +
+        (loc1[1] - loc2[1]) ** 2 +
+        (loc1[2] - loc2[2]) ** 2
+    )
+
+
+class SpatialGrid:
+    """
+    Buckets events into square cells on the ground plane so a radius query
+    only looks at the cells around the ego vehicle instead of every event.
+    """
+
+    def __init__(self, cell_size: float):
+        self.cell_size = cell_size
+        self.cells: Dict[Tuple[int, int], Set[str]] = {}
+        self.cell_of: Dict[str, Tuple[int, int]] = {}
+
+    def _cell(self, location) -> Tuple[int, int]:
+        return (math.floor(location[0] / self.cell_size), math.floor(location[1] / self.cell_size))
+
+    def insert(self, uuid: str, location):
+        self.remove(uuid)
+        cell = self._cell(location)
+        self.cells.setdefault(cell, set()).add(uuid)
+        self.cell_of[uuid] = cell
+
+    def remove(self, uuid: str):
+        cell = self.cell_of.pop(uuid, None)
+        if cell is None:
+            return
+        bucket = self.cells[cell]
+        bucket.discard(uuid)
+        if not bucket:
+            del self.cells[cell]
+
+    def query(self, location, radius: float):
+        """Yields the UUIDs in every cell overlapping the radius around location."""
+        min_x, min_y = self._cell((location[0] - radius, location[1] - radius))
+        max_x, max_y = self._cell((location[0] + radius, location[1] + radius))
+        for x in range(min_x, max_x + 1):
+            for y in range(min_y, max_y + 1):
+                yield from self.cells.get((x, y), ())
+
+
+# Scheduler state. Handlers run on the MQTT thread and deferred dispatches on
+# a timer thread, so everything below is guarded by _lock.
+_lock = threading.RLock()
+_grid = SpatialGrid(SPATIAL_CELL_SIZE_METERS)
+_events: Dict[str, AdasActorEvent] = {}
+_notified: Set[str] = set()
+_last_notification_time = -math.inf
+_deferred_dispatch: threading.Timer | None = None
+
+ego_location: Tuple[float, float, float] | None = None
+
+
+def update_ego_telemetry(payload: EgoTelemetry):
+    global ego_location
+
+    with _lock:
+        ego_location = payload.location
+        dispatch_notifications()
+
+
+def add_event(event: AdasActorEvent):
+    with _lock:
+        _events[event.UUID] = event
+        _grid.insert(event.UUID, event.location)
+        dispatch_notifications()
+
+
+def remove_event(uuid: str):
+    with _lock:
+        _events.pop(uuid, None)
+        _grid.remove(uuid)
+        _notified.discard(uuid)
+
+
+def _pending_events() -> List[Tuple[AdasActorEvent, float | None]]:
+    """
+    Returns the not yet notified events within the notification radius,
+    nearest to the ego vehicle first, with their distance. Telemetry carries
+    no heading, so events behind the vehicle rank like those ahead. Without
+    a known ego position every pending event is returned in arrival order.
+    """
+    if ego_location is None:
+        pending = [ev for uuid, ev in _events.items() if uuid not in _notified]
+        return [(ev, None) for ev in sorted(pending, key=lambda ev: ev.timestamp)]
+
+    candidates = sorted(
+        (distance(ego_location, _events[uuid].location), uuid)
+        for uuid in _grid.query(ego_location, NOTIFICATION_RADIUS_METERS)
+        if uuid not in _notified
+    )
+    return [
+        (_events[uuid], event_distance)
+        for event_distance, uuid in candidates
+        if event_distance <= NOTIFICATION_RADIUS_METERS
+    ]
+
+
+def dispatch_notifications():
+    """
+    Hands every pending event to the notification manager, nearest first,
+    which merges them into one UI update. If a dispatch went out less than
+    NOTIFICATION_MIN_INTERVAL_SECONDS ago, one is scheduled for when the
+    interval has passed instead, so a burst of events waits for it.
+    """
+    global _last_notification_time, _deferred_dispatch
+
+    with _lock:
+        pending = _pending_events()
+        if not pending:
+            return
+
+        wait = _last_notification_time + NOTIFICATION_MIN_INTERVAL_SECONDS - time.monotonic()
+        if wait > 0:
+            if _deferred_dispatch is None:
+                _deferred_dispatch = threading.Timer(wait, _run_deferred_dispatch)
+                _deferred_dispatch.daemon = True
+                _deferred_dispatch.start()
+            return
+
+        _last_notification_time = time.monotonic()
+        for event, event_distance in pending:
+            _notified.add(event.UUID)
+            if event_distance is None:
+                notification_message = f"{event.actor_tag} detected at: {event.location}"
+            else:
+                notification_message = f"{event.actor_tag} detected {event_distance:.0f} m away"
+            update_notification_message(notification_message, key=event.UUID)
+
+
+def _run_deferred_dispatch():
+    global _deferred_dispatch
+
+    with _lock:
+        _deferred_dispatch = None
+        dispatch_notifications()
@@ -0,0 +1,77 @@
+from typing import Dict, Set
+from contract.adas_actor_event_sync import AdasActorEventSnapshot
+from contract.ego_telemetry import EgoTelemetry
+from contract.mqtt.client import CLIENT
+from contract.mqtt.topic_handlers import TOPIC_HANDLERS
+from contract.mqtt.topics import Topics
+from contract.regions import Region, regions_around, region_topic
+from infotainment_app.constants import REGION_SUBSCRIPTION_RINGS
+from infotainment_app.handlers import active_events, handle_actor_event_created, handle_actor_event_deleted, handle_ego_telemetry
+
+# Regions currently subscribed to, and the UUIDs of the events each one
+# contributed to active_events
+subscribed_regions: Set[Region] = set()
+region_events: Dict[Region, Set[str]] = {}
+
+
+def handle_region_snapshot(region: Region, payload: AdasActorEventSnapshot):
+    if region not in subscribed_regions:
+        return
+    known_uuids = region_events.setdefault(region, set())
+    snapshot_uuids = {event.UUID for event in payload.events}
+
+    for uuid in known_uuids - snapshot_uuids:
+        if uuid in active_events:
+            handle_actor_event_deleted(active_events[uuid])
+    for event in payload.events:
+        handle_actor_event_created(event)
+    # Events rejected by handle_actor_event_created (e.g. off the route) are
+    # not tracked, so they are not deleted later on behalf of this region
+    region_events[region] = {uuid for uuid in snapshot_uuids if uuid in active_events}
+
+
+def _subscribe(region: Region):
+    topic = region_topic(Topics.VEHICLE_ADAS_ACTOR_REGION_EVENT_SNAPSHOT, region)
+    TOPIC_HANDLERS[topic] = lambda payload: handle_region_snapshot(region, AdasActorEventSnapshot(
+        **payload))
+    subscribed_regions.add(region)
+    CLIENT.subscribe(topic)
+
+
+def _unsubscribe(region: Region):
+    topic = region_topic(Topics.VEHICLE_ADAS_ACTOR_REGION_EVENT_SNAPSHOT, region)
+    CLIENT.unsubscribe(topic)
+    TOPIC_HANDLERS.pop(topic, None)
+    subscribed_regions.discard(region)
+    for uuid in region_events.pop(region, set()):
+        if uuid in active_events:
+            handle_actor_event_deleted(active_events[uuid])
+
+
+def update_subscriptions(location):
+    """
+    Subscribes to the regions around location and drops the ones the vehicle
+    has moved away from, along with their events.
+    """
+    wanted = regions_around(location, REGION_SUBSCRIPTION_RINGS)
+    if wanted == subscribed_regions:
+        return
+    for region in subscribed_regions - wanted:
+        _unsubscribe(region)
+    for region in wanted - subscribed_regions:
+        _subscribe(region)
+    print(f"Subscribed to regions {sorted(subscribed_regions)}")
+
+
+def resubscribe():
+    """
+    Subscribes again to every current region. The broker re-sends the
+    retained snapshots, which brings back events dropped by a filter change.
+    """
+    for region in subscribed_regions:
+        CLIENT.subscribe(region_topic(Topics.VEHICLE_ADAS_ACTOR_REGION_EVENT_SNAPSHOT, region))
+
+
+def handle_ego_telemetry_for_regions(payload: EgoTelemetry):
+    handle_ego_telemetry(payload)
+    update_subscriptions(payload.location)
@@ -0,0 +1,81 @@
+import math
+from typing import Dict, List, Sequence, Set, Tuple
+
+
+def point_segment_distance(point, start, end) -> float:
+    # Distance on the ground plane from point to the segment start-end
+    seg_x = end[0] - start[0]
+    seg_y = end[1] - start[1]
+    length_sq = seg_x ** 2 + seg_y ** 2
+    if length_sq == 0.0:
+        return math.hypot(point[0] - start[0], point[1] - start[1])
+    t = ((point[0] - start[0]) * seg_x + (point[1] - start[1]) * seg_y) / length_sq
+    t = max(0.0, min(1.0, t))
+    return math.hypot(point[0] - (start[0] + t * seg_x), point[1] - (start[1] + t * seg_y))
+
+
+class RouteCorridor:
+    """
+    The area within `buffer` meters of a route polyline, indexed by square
+    tiles on the ground plane.
+
+    Every tile that the buffered bounding box of a segment touches stores the
+    segment index. Tiles that lie entirely within the buffer of one segment are
+    marked as covered, so most lookups are a single dict access and the rest
+    only test the handful of segments passing near that tile.
+    """
+
+    def __init__(self, waypoints: Sequence[Tuple[float, float, float]], buffer: float, tile_size: float):
+        self.waypoints = list(waypoints)
+        self.buffer = buffer
+        self.tile_size = tile_size
+        self.segments: List[Tuple[int, int]] = []
+        self.tiles: Dict[Tuple[int, int], List[int]] = {}
+        self.covered_tiles: Set[Tuple[int, int]] = set()
+
+        if len(self.waypoints) == 1:
+            self.waypoints.append(self.waypoints[0])
+        for index in range(len(self.waypoints) - 1):
+            self._add_segment(index, index + 1)
+
+    def _tile(self, x: float, y: float) -> Tuple[int, int]:
+        return (math.floor(x / self.tile_size), math.floor(y / self.tile_size))
+
+    def _add_segment(self, start_index: int, end_index: int):
+        segment = len(self.segments)
+        self.segments.append((start_index, end_index))
+        start = self.waypoints[start_index]
+        end = self.waypoints[end_index]
+
+        min_x, min_y = self._tile(min(start[0], end[0]) - self.buffer, min(start[1], end[1]) - self.buffer)
+        max_x, max_y = self._tile(max(start[0], end[0]) + self.buffer, max(start[1], end[1]) + self.buffer)
+        for tile_x in range(min_x, max_x + 1):
+            for tile_y in range(min_y, max_y + 1):
+                tile = (tile_x, tile_y)
+                if tile in self.covered_tiles:
+                    continue
+                corners = [
+                    ((tile_x + dx) * self.tile_size, (tile_y + dy) * self.tile_size)
+                    for dx in (0, 1) for dy in (0, 1)
+                ]
+                corner_distances = [point_segment_distance(corner, start, end) for corner in corners]
+                # The buffered segment is convex, so all four corners inside
+                # means the whole tile is inside
+                if max(corner_distances) <= self.buffer:
+                    self.covered_tiles.add(tile)
+                    self.tiles.pop(tile, None)
+                # Skip tiles the buffer can't reach: the closest point of the
+                # tile is at most half a diagonal from one of its corners
+                elif min(corner_distances) <= self.buffer + self.tile_size * math.sqrt(2) / 2:
+                    self.tiles.setdefault(tile, []).append(segment)
+
+    def contains(self, location) -> bool:
+        """True if location lies within the buffer distance of the route."""
+        tile = self._tile(location[0], location[1])
+        if tile in self.covered_tiles:
+            return True
+        for segment in self.tiles.get(tile, ()):
+            start_index, end_index = self.segments[segment]
+            if point_segment_distance(location, self.waypoints[start_index], self.waypoints[end_index]) <= self.buffer:
+                return True
+        return False
@@ -1,15 +1,36 @@
-import json
-from contract.adas_actor_event import AdasActorEvent
+from contract.adas_actor_event_sync import AdasActorEventDelta, AdasActorEventSnapshot
+from contract.ego_telemetry import EgoTelemetry
 from contract.mqtt.client import CLIENT
 from contract.mqtt.topic_handlers import TOPIC_HANDLERS
 from contract.mqtt.topics import Topics
-from infotainment_app.handlers import handle_actor_event_created, handle_actor_event_deleted
+from contract.navigation_route import NavigationRoute
+from contract.regions import USE_REGION_TOPICS
+from infotainment_app.event_sync import handle_event_delta, handle_event_snapshot, handle_navigation_route, request_snapshot
+from infotainment_app.handlers import handle_ego_telemetry
+from infotainment_app.region_subscriptions import handle_ego_telemetry_for_regions
 
 def start_listening_to_topics():
         print("Listening to topics for infotainment")
-        TOPIC_HANDLERS[Topics.VEHICLE_ADAS_ACTOR_EVENT_CREATED] = lambda payload: handle_actor_event_created(AdasActorEvent(
+        TOPIC_HANDLERS[Topics.VEHICLE_NAVIGATION_ROUTE] = lambda payload: handle_navigation_route(NavigationRoute(
                 **payload))
-        TOPIC_HANDLERS[Topics.VEHICLE_ADAS_ACTOR_EVENT_DELETED] = lambda payload: handle_actor_event_deleted(AdasActorEvent(
+        CLIENT.subscribe(Topics.VEHICLE_NAVIGATION_ROUTE)
+
+        if USE_REGION_TOPICS:
+                # Region topics are subscribed as the ego position comes in
+                TOPIC_HANDLERS[Topics.VEHICLE_EGO_TELEMETRY] = lambda payload: handle_ego_telemetry_for_regions(EgoTelemetry(
+                        **payload))
+                CLIENT.subscribe(Topics.VEHICLE_EGO_TELEMETRY)
+                return
+
+        TOPIC_HANDLERS[Topics.VEHICLE_ADAS_ACTOR_EVENT_SNAPSHOT] = lambda payload: handle_event_snapshot(AdasActorEventSnapshot(
+                **payload))
+        TOPIC_HANDLERS[Topics.VEHICLE_ADAS_ACTOR_EVENT_DELTA] = lambda payload: handle_event_delta(AdasActorEventDelta(
+                **payload))
+        TOPIC_HANDLERS[Topics.VEHICLE_EGO_TELEMETRY] = lambda payload: handle_ego_telemetry(EgoTelemetry(
                 **payload))
-        CLIENT.subscribe(Topics.VEHICLE_ADAS_ACTOR_EVENT_CREATED)
-        CLIENT.subscribe(Topics.VEHICLE_ADAS_ACTOR_EVENT_DELETED)
+        CLIENT.subscribe(Topics.VEHICLE_ADAS_ACTOR_EVENT_SNAPSHOT)
+        CLIENT.subscribe(Topics.VEHICLE_ADAS_ACTOR_EVENT_DELTA)
+        CLIENT.subscribe(Topics.VEHICLE_EGO_TELEMETRY)
+        # The broker hands out the retained snapshot on subscribe; asking
+        # explicitly covers a nav_app that has not published one yet
+        request_snapshot()
@@ -0,0 +1,34 @@
+import threading
+from contract.regions import USE_REGION_TOPICS
+from nav_app.publishers import publish_actor_event_snapshot
+
+SNAPSHOT_INTERVAL_SECONDS = 10.0
+
+_stop_snapshots = threading.Event()
+
+
+def handle_event_snapshot_request(payload):
+    print("Snapshot requested")
+    publish_actor_event_snapshot()
+
+
+def start_periodic_snapshots(interval: float = SNAPSHOT_INTERVAL_SECONDS):
+    """
+    Publishes a snapshot of the active events every `interval` seconds on a
+    background thread, so receivers that missed deltas can resync. Region
+    snapshots are self-contained, so with USE_REGION_TOPICS there is none.
+    """
+    if USE_REGION_TOPICS:
+        return
+
+    def run():
+        publish_actor_event_snapshot()
+        while not _stop_snapshots.wait(interval):
+            publish_actor_event_snapshot()
+
+    _stop_snapshots.clear()
+    threading.Thread(target=run, name="event-snapshots", daemon=True).start()
+
+
+def stop_periodic_snapshots():
+    _stop_snapshots.set()
@@ -1,9 +1,26 @@
 import json
+import threading
 import time
+import uuid
+from datetime import datetime
+from typing import Dict, Set
 from contract.adas_actor_event import AdasActorEvent
+from contract.adas_actor_event_sync import AdasActorEventDelta, AdasActorEventSnapshot
 from contract.adas_actor_monitor_event import AdasActorMonitorEvent
 from contract.mqtt.client import CLIENT
 from contract.mqtt.topics import Topics
+from contract.regions import USE_REGION_TOPICS, Region, region_of, region_topic
+
+# Sequence number of the last published delta, and the set of active events
+# it leads to. Both are updated under the same lock so a snapshot always
+# matches its sequence number exactly. Sequence numbers restart with every
+# run, so they go out with a boot id receivers can detect a restart by.
+_sync_lock = threading.Lock()
+_epoch = uuid.uuid4().hex
+_sequence = 0
+_published_events: Dict[str, AdasActorEvent] = {}
+# The same events bucketed by region, for the per-region snapshots
+_region_events: Dict[Region, Dict[str, AdasActorEvent]] = {}
 
 
 def publish_should_monitor_event():
@@ -21,6 +38,7 @@ def publish_actor_event_created(payload: AdasActorEvent):
     print()
     CLIENT.publish(Topics.VEHICLE_ADAS_ACTOR_EVENT_CREATED,
                    payload.model_dump_json())
+    publish_actor_event_delta(created=[payload])
 
 
 def publish_actor_event_deleted(payload: AdasActorEvent):
@@ -28,3 +46,85 @@ def publish_actor_event_deleted(payload: AdasActorEvent):
     print()
     CLIENT.publish(Topics.VEHICLE_ADAS_ACTOR_EVENT_DELETED,
                    payload.model_dump_json())
+    publish_actor_event_delta(deleted=[payload])
+
+
+def publish_actor_event_delta(created=(), deleted=()):
+    global _sequence
+
+    with _sync_lock:
+        _sequence += 1
+        changed_regions: Set[Region] = set()
+        for event in created:
+            _published_events[event.UUID] = event
+            region = region_of(event.location)
+            _region_events.setdefault(region, {})[event.UUID] = event
+            changed_regions.add(region)
+        for event in deleted:
+            published = _published_events.pop(event.UUID, None)
+            if published is None:
+                continue
+            region = region_of(published.location)
+            _region_events.get(region, {}).pop(event.UUID, None)
+            changed_regions.add(region)
+        # Only one stream goes out: the region snapshots, or the fleet-wide
+        # delta when region topics are off
+        if USE_REGION_TOPICS:
+            for region in changed_regions:
+                _publish_region_snapshot(region)
+            return
+
+        delta = AdasActorEventDelta(
+            epoch=_epoch,
+            sequence=_sequence,
+            created=list(created),
+            deleted=[event.UUID for event in deleted],
+        )
+        # Publish while holding the lock so deltas leave in sequence order
+        CLIENT.publish(Topics.VEHICLE_ADAS_ACTOR_EVENT_DELTA,
+                       delta.model_dump_json())
+
+
+def publish_actor_event_snapshot():
+    with _sync_lock:
+        snapshot = AdasActorEventSnapshot(
+            epoch=_epoch,
+            sequence=_sequence,
+            timestamp=datetime.utcnow(),
+            events=list(_published_events.values()),
+        )
+        # Retained, so a unit that connects late gets the latest snapshot
+        # straight from the broker without waiting for the next period
+        CLIENT.publish(Topics.VEHICLE_ADAS_ACTOR_EVENT_SNAPSHOT,
+                       snapshot.model_dump_json(), retain=True)
+    print(f"Published snapshot #{snapshot.sequence} with {len(snapshot.events)} events")
+    print()
+
+
+def _publish_region_snapshot(region: Region):
+    # Called with _sync_lock held. Only the events of one region go out, so a
+    # vehicle's downlink depends on the events around it, not on the fleet.
+    #
+    # Regions get a whole snapshot per change rather than deltas: a region
+    # holds the few events of one REGION_TILE_SIZE_METERS tile, and a
+    # self-contained retained message needs no per-region sequence numbers
+    # or gap recovery on the subscriber, which may join a region at any time.
+    topic = region_topic(Topics.VEHICLE_ADAS_ACTOR_REGION_EVENT_SNAPSHOT, region)
+    region_events = _region_events.get(region, {})
+    snapshot = AdasActorEventSnapshot(
+        epoch=_epoch,
+        sequence=_sequence,
+        timestamp=datetime.utcnow(),
+        events=list(region_events.values()),
+    )
+    if region_events:
+        # Retained, so subscribing to a region delivers its events immediately
+        CLIENT.publish(topic, snapshot.model_dump_json(), retain=True)
+        return
+
+    # The region emptied: current subscribers get the empty snapshot, then a
+    # zero-length retained message clears the broker's copy so no empty
+    # snapshot is kept for every region an event ever passed through
+    CLIENT.publish(topic, snapshot.model_dump_json())
+    CLIENT.publish(topic, b"", retain=True)
+    _region_events.pop(region, None)
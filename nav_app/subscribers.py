@@ -3,6 +3,8 @@ from contract.adas_actor_event import AdasActorEvent
 from contract.mqtt.client import CLIENT
 from contract.mqtt.topic_handlers import TOPIC_HANDLERS
 from contract.mqtt.topics import Topics
+from contract.regions import USE_REGION_TOPICS
+from nav_app.event_sync import handle_event_snapshot_request
 from nav_app.handlers import handle_vehicle_adas_actor_seen
 
 
@@ -10,3 +12,6 @@ def start_listening_to_topics():
     TOPIC_HANDLERS[Topics.VEHICLE_ADAS_ACTOR_SEEN] = lambda payload: handle_vehicle_adas_actor_seen(AdasActorEvent(
         **payload))
     CLIENT.subscribe(Topics.VEHICLE_ADAS_ACTOR_SEEN)
+    if not USE_REGION_TOPICS:
+        TOPIC_HANDLERS[Topics.VEHICLE_ADAS_ACTOR_EVENT_SNAPSHOT_REQUEST] = handle_event_snapshot_request
+        CLIENT.subscribe(Topics.VEHICLE_ADAS_ACTOR_EVENT_SNAPSHOT_REQUEST)
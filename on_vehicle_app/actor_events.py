@@ -3,37 +3,54 @@ from typing import Tuple
 import numpy as np
 from contract.adas_actor_event import AdasActorEvent
 
+def class_plane_of(
+    raw_data: bytes | memoryview | np.ndarray,
+    width: int,
+    height: int,
+) -> np.ndarray:
+    """
+    The (height, width) semantic class IDs of a frame, without copying.
+    - raw_data: flattened 32-bit BGRA bytes (len == width*height*4), or any
+      buffer holding them, e.g. a frame in the shared-memory ring.
+      A decoded class plane (len == width*height) is accepted as well.
+    """
+    img = np.frombuffer(raw_data, dtype=np.uint8)
+    if img.size == width * height:
+        return img.reshape((height, width))
+    expected = width * height * 4
+    if img.size != expected:
+        raise ValueError(f"raw_data length {img.size} != {expected} (width*height*4)")
+    img = img.reshape((height, width, 4))
+    return img[..., 2]  # In BGRA, index 2 is Red (semantic class ID)
+
 # Detect pixels by semantic ID in the Red channel
 def detect_actor(
-    raw_data: bytes,
+    raw_data: bytes | memoryview | np.ndarray,
     width: int,
     height: int,
     class_id: int,
 ) -> bool:
     """
     Returns True if any pixel is tagged with the given class_id in a semantic-segmentation frame.
-    - raw_data: flattened 32-bit BGRA bytes (len == width*height*4)
+    - raw_data: see class_plane_of
     - class_id: semantic tag ID to check (12 for pedestrian)
     """
-    expected = width * height * 4
-    if len(raw_data) != expected:
-        raise ValueError(f"raw_data length {len(raw_data)} != {expected} (width*height*4)")
-
-    img = np.frombuffer(raw_data, dtype=np.uint8).reshape((height, width, 4))
-    red_channel = img[..., 2]  # In BGRA, index 2 is Red (semantic class ID)
-
+    red_channel = class_plane_of(raw_data, width, height)
     return np.any(red_channel == class_id)
 
 # Build AdasActorEvent
 def make_brand_new_actor_event(
-    raw_data: bytes,
+    raw_data: bytes | memoryview | np.ndarray,
     width: int,
     height: int,
     location: Tuple[float, float, float],
     class_id: int,
     actor_tag: str,
+    visible: bool | None = None,
 ) -> AdasActorEvent:
-    visible = detect_actor(raw_data, width, height, class_id)
+    # Callers that already know, e.g. from TileDetectionCache counts, pass visible
+    if visible is None:
+        visible = detect_actor(raw_data, width, height, class_id)
     return AdasActorEvent(
         UUID=None,
         actor_tag=actor_tag,
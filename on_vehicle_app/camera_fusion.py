@@ -0,0 +1,181 @@
+import math
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+from on_vehicle_app.parallel_detector import ClassStats
+
+
+@dataclass
+class CameraConfig:
+    """
+    A camera mounted on the ego vehicle, in CARLA's vehicle frame: x forward,
+    y right, z up, in meters; yaw in degrees, positive turning right.
+    """
+    name: str
+    x: float
+    y: float
+    z: float
+    yaw: float = 0.0
+    pitch: float = 0.0
+    fov: float = 90.0  # horizontal, degrees
+
+    def focal_length(self, width: int) -> float:
+        """Focal length in pixels for an image `width` pixels wide."""
+        return width / (2.0 * math.tan(math.radians(self.fov) / 2.0))
+
+    def azimuth_of_column(self, column: float, width: int) -> float:
+        """Vehicle-frame azimuth in degrees of the ray through an image column."""
+        return self.yaw + math.degrees(math.atan((column + 0.5 - width / 2.0) / self.focal_length(width)))
+
+
+@dataclass
+class CameraDetection:
+    """The pixels of one class in one camera's frame, as an azimuth interval."""
+    camera: str
+    class_id: int
+    pixel_count: int
+    azimuth_min: float
+    azimuth_max: float
+
+
+@dataclass
+class FusedActor:
+    """
+    One physical actor, possibly seen by several cameras. Fused by bearing it
+    has an azimuth interval, fused by position (with depth) a world location.
+    """
+    class_id: int
+    azimuth_min: float | None = None
+    azimuth_max: float | None = None
+    location: Tuple[float, float, float] | None = None
+    pixel_count: int = 0
+    cameras: List[str] = field(default_factory=list)
+
+    @property
+    def azimuth(self) -> float | None:
+        if self.azimuth_min is None:
+            return None
+        return _wrap((self.azimuth_min + self.azimuth_max) / 2.0)
+
+
+def _wrap(angle: float) -> float:
+    # To [-180, 180)
+    return (angle + 180.0) % 360.0 - 180.0
+
+
+def camera_detection(camera: CameraConfig, width: int, class_id: int, stats: ClassStats) -> CameraDetection | None:
+    """The detection of a class in a camera frame, None if the class isn't in it."""
+    if stats.count == 0:
+        return None
+    return CameraDetection(
+        camera=camera.name,
+        class_id=class_id,
+        pixel_count=stats.count,
+        azimuth_min=camera.azimuth_of_column(stats.min_col - 0.5, width),
+        azimuth_max=camera.azimuth_of_column(stats.max_col + 0.5, width),
+    )
+
+
+def fuse_detections(detections: Iterable[CameraDetection], tolerance: float) -> List[FusedActor]:
+    """
+    Merges detections of the same class whose azimuth intervals overlap (or
+    are less than `tolerance` degrees apart) into one actor, so an actor in
+    the overlap of two cameras is reported once. Azimuths wrap around behind
+    the vehicle.
+    """
+    by_class: Dict[int, List[CameraDetection]] = {}
+    for detection in detections:
+        by_class.setdefault(detection.class_id, []).append(detection)
+
+    actors = []
+    for class_id, class_detections in by_class.items():
+        # Intervals as (start, end) with start in [-180, 180) and end >= start
+        intervals = sorted(
+            (_wrap(d.azimuth_min), _wrap(d.azimuth_min) + (d.azimuth_max - d.azimuth_min), d)
+            for d in class_detections
+        )
+        clusters: List[FusedActor] = []
+        for start, end, detection in intervals:
+            if clusters and start <= clusters[-1].azimuth_max + tolerance:
+                _add(clusters[-1], end, detection)
+            else:
+                clusters.append(FusedActor(class_id=class_id, azimuth_min=start, azimuth_max=end))
+                _add(clusters[-1], end, detection)
+        # The last cluster may run past 180 into the first one
+        if len(clusters) > 1 and clusters[-1].azimuth_max + tolerance >= clusters[0].azimuth_min + 360.0:
+            last = clusters.pop()
+            first = clusters[0]
+            first.azimuth_max = max(first.azimuth_max + 360.0, last.azimuth_max)
+            first.azimuth_min = last.azimuth_min
+            first.pixel_count += last.pixel_count
+            first.cameras = last.cameras + [c for c in first.cameras if c not in last.cameras]
+        actors.extend(clusters)
+    return actors
+
+
+def _add(actor: FusedActor, end: float, detection: CameraDetection):
+    actor.azimuth_max = max(actor.azimuth_max, end)
+    actor.pixel_count += detection.pixel_count
+    if detection.camera not in actor.cameras:
+        actor.cameras.append(detection.camera)
+
+
+def fuse_positions(
+    class_id: int,
+    points_by_camera: Dict[str, np.ndarray],
+    cell_size: float,
+    min_pixels: int = 1,
+) -> List[FusedActor]:
+    """
+    Clusters the world positions of one class's pixels, from every camera,
+    into actors. Points are binned into square cells on the ground plane and
+    touching occupied cells (8-neighbourhood) form one actor, located at the
+    median of its points. Clusters of fewer than min_pixels points, typically
+    mask edges picking up the depth of the background, are dropped.
+    """
+    names = [name for name, points in points_by_camera.items() if len(points)]
+    if not names:
+        return []
+    points = np.concatenate([points_by_camera[name] for name in names])
+    owners = np.repeat(np.arange(len(names)), [len(points_by_camera[name]) for name in names])
+
+    cells = np.floor(points[:, :2] / cell_size).astype(np.int64)
+    occupied, point_cell = np.unique(cells, axis=0, return_inverse=True)
+    point_cell = point_cell.ravel()
+    occupied = [tuple(cell) for cell in occupied.tolist()]
+    cell_index = {cell: i for i, cell in enumerate(occupied)}
+
+    # Connected components over the occupied cells, usually a handful
+    component = [-1] * len(occupied)
+    components = 0
+    for start in range(len(occupied)):
+        if component[start] >= 0:
+            continue
+        component[start] = components
+        stack = [start]
+        while stack:
+            x, y = occupied[stack.pop()]
+            for dx in (-1, 0, 1):
+                for dy in (-1, 0, 1):
+                    neighbour = cell_index.get((x + dx, y + dy))
+                    if neighbour is not None and component[neighbour] < 0:
+                        component[neighbour] = components
+                        stack.append(neighbour)
+        components += 1
+
+    labels = np.asarray(component)[point_cell]
+    actors = []
+    for label in range(components):
+        members = labels == label
+        pixel_count = int(np.count_nonzero(members))
+        if pixel_count < min_pixels:
+            continue
+        actors.append(FusedActor(
+            class_id=class_id,
+            location=tuple(float(v) for v in np.median(points[members], axis=0)),
+            pixel_count=pixel_count,
+            cameras=[names[owner] for owner in np.unique(owners[members])],
+        ))
+    return actors
@@ -1,9 +1,54 @@
 from typing import List
 
+from on_vehicle_app.camera_fusion import CameraConfig
+
 ONLY_PRINT = False
 
 ACTORS_BEING_MONITORED: List[int] = []
 
+# Name of the shared-memory ring the CARLA client writes semantic frames into
+SEMANTIC_FRAME_RING_NAME = "tide_semantic_frames"
+
+# Semantic cameras around the ego vehicle, mounted like the --shm-rig cameras of
+# the CARLA client (manual_control_sensors.py). The front camera writes into
+# SEMANTIC_FRAME_RING_NAME, the others into SEMANTIC_FRAME_RING_NAME + "_" + name,
+# and their depth cameras (--shm-depth) into the same name + "_depth".
+CAMERA_RIG: List[CameraConfig] = [
+    CameraConfig("front", x=2.3, y=0.0, z=1.7, yaw=0.0),
+    CameraConfig("rear", x=-2.3, y=0.0, z=1.7, yaw=180.0),
+    CameraConfig("left", x=0.0, y=-1.5, z=1.7, yaw=-90.0),
+    CameraConfig("right", x=0.0, y=1.5, z=1.7, yaw=90.0),
+]
+
+# Detections of one class less than this many degrees apart, seen from the
+# vehicle, are taken to be the same actor
+FUSION_AZIMUTH_TOLERANCE_DEGREES = 2.0
+
+# With depth frames, actors are clustered by position instead: pixels of one
+# class whose ground positions fall in touching cells of this size are one actor
+FUSION_CLUSTER_CELL_METERS = 1.0
+FUSION_MIN_CLUSTER_PIXELS = 10
+
+# Frames of the rig cameras belong together if their frame ids are at most this far apart
+FUSION_MAX_FRAME_SKEW = 1
+
+# Semantic classes the on-vehicle detector looks for in every frame
+DETECTED_CLASS_IDS: List[int] = [12]
+
+# Upper bound on how often "actor seen" events are published per class
+ACTOR_SEEN_PUBLISH_INTERVAL_SECONDS = 0.1
+
+# Reuse per-class pixel counts of frame tiles that did not change, see
+# detection_cache. Off: comparing a frame with the previous one reads every
+# pixel, which already costs about what detect_actor does for one class.
+USE_DETECTION_CACHE = False
+DETECTION_TILE_SIZE = 32
+
+# Frames with at least this many pixels are detected on a thread pool, see
+# parallel_detector. None means one worker per CPU core.
+PARALLEL_DETECTION_MIN_PIXELS = 1920 * 1080
+PARALLEL_DETECTION_WORKERS: int | None = None
+
 CARLA_CLASS_LABELS = {
     0: "Unlabeled",
     1: "Roads",
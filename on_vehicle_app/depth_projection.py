@@ -0,0 +1,94 @@
+import math
+from typing import Tuple
+
+import numpy as np
+
+from on_vehicle_app.camera_fusion import CameraConfig
+
+# CARLA encodes depth in 24 bits over 1 km; anything this far is sky
+MAX_DEPTH_METERS = 1000.0
+
+
+def depth_at(raw_data, width: int, height: int, rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+    """
+    Depth in meters at the given pixels of a raw BGRA CARLA depth frame,
+    decoding only those pixels: (R + G*256 + B*256^2) / (256^3 - 1) * 1000.
+    """
+    bgra = np.frombuffer(raw_data, dtype=np.uint8).reshape((height, width, 4))
+    pixels = bgra[rows, cols].astype(np.float32)
+    encoded = pixels[:, 2] + pixels[:, 1] * 256.0 + pixels[:, 0] * 65536.0
+    return encoded * np.float32(MAX_DEPTH_METERS / (256 ** 3 - 1))
+
+
+def rotation_matrix(yaw: float, pitch: float = 0.0, roll: float = 0.0) -> np.ndarray:
+    """
+    Rotation from a frame turned by yaw, pitch and roll (degrees, CARLA
+    convention, as in carla.Transform.get_matrix) to its parent frame.
+    """
+    cy, sy = math.cos(math.radians(yaw)), math.sin(math.radians(yaw))
+    cp, sp = math.cos(math.radians(pitch)), math.sin(math.radians(pitch))
+    cr, sr = math.cos(math.radians(roll)), math.sin(math.radians(roll))
+    return np.array([
+        [cp * cy, cy * sp * sr - sy * cr, -cy * sp * cr - sy * sr],
+        [cp * sy, sy * sp * sr + cy * cr, -sy * sp * cr + cy * sr],
+        [sp, -cp * sr, cp * cr],
+    ])
+
+
+def pixels_to_camera(
+    camera: CameraConfig,
+    width: int,
+    height: int,
+    rows: np.ndarray,
+    cols: np.ndarray,
+    depth: np.ndarray,
+) -> np.ndarray:
+    """
+    Back-projects pixels with known depth to (n, 3) points in the camera
+    frame (x forward, y right, z up). CARLA depth is measured along x.
+    """
+    focal = camera.focal_length(width)
+    points = np.empty((depth.size, 3), dtype=np.float64)
+    points[:, 0] = depth
+    points[:, 1] = (cols + 0.5 - width / 2.0) / focal * depth
+    points[:, 2] = -(rows + 0.5 - height / 2.0) / focal * depth
+    return points
+
+
+def transform_points(points: np.ndarray, location, yaw: float, pitch: float = 0.0, roll: float = 0.0) -> np.ndarray:
+    """Points in a frame at `location` turned by yaw, pitch, roll, to its parent frame."""
+    return points @ rotation_matrix(yaw, pitch, roll).T + np.asarray(location, dtype=np.float64)
+
+
+def project_mask(
+    camera: CameraConfig,
+    width: int,
+    height: int,
+    mask: np.ndarray,
+    raw_depth,
+    ego_location: Tuple[float, float, float],
+    ego_yaw: float,
+    first_row: int = 0,
+    first_col: int = 0,
+    camera_pose: Tuple[float, float, float, float, float, float] | None = None,
+) -> np.ndarray:
+    """
+    (n, 3) world positions of the pixels set in `mask`, a boolean window of
+    the frame starting at (first_row, first_col), looked up in the camera's
+    depth frame. Pixels at the depth limit (sky, nothing hit) are dropped.
+
+    With the camera's world pose (x, y, z, pitch, yaw, roll) as reported by
+    CARLA the points are placed with it directly; otherwise through the
+    camera's mounting and the ego pose, ignoring the vehicle's pitch and roll.
+    """
+    rows, cols = np.nonzero(mask)
+    rows += first_row
+    cols += first_col
+    depth = depth_at(raw_depth, width, height, rows, cols)
+    hit = depth < MAX_DEPTH_METERS * 0.999
+    points = pixels_to_camera(camera, width, height, rows[hit], cols[hit], depth[hit])
+    if camera_pose is not None:
+        x, y, z, pitch, yaw, roll = camera_pose
+        return transform_points(points, (x, y, z), yaw, pitch, roll)
+    points = transform_points(points, (camera.x, camera.y, camera.z), camera.yaw, camera.pitch)
+    return transform_points(points, ego_location, ego_yaw)
@@ -0,0 +1,71 @@
+import numpy as np
+
+# Pixels added to pad a frame to whole tiles; not a CARLA class, removed from the totals
+PAD_CLASS = 255
+
+
+class TileDetectionCache:
+    """
+    Per-class pixel counts of semantic frames, computed tile by tile.
+
+    Each frame is compared with the previous one, pixel for pixel, and only
+    the tiles with a changed pixel are counted again; the others keep their
+    counts from the previous frame. The comparison is exact and cheaper than
+    counting, so in a frame from a stationary vehicle, where most tiles are
+    unchanged, most of the counting is skipped.
+    """
+
+    def __init__(self, tile_size: int = 32):
+        self.tile_size = tile_size
+        self._last_plane: np.ndarray | None = None
+        self._tile_counts: np.ndarray | None = None
+        self._totals: np.ndarray | None = None
+        self.hits = 0
+        self.misses = 0
+
+    def _pad(self, plane: np.ndarray) -> np.ndarray:
+        height, width = plane.shape
+        pad_y = -height % self.tile_size
+        pad_x = -width % self.tile_size
+        if pad_y == 0 and pad_x == 0:
+            return plane
+        return np.pad(plane, ((0, pad_y), (0, pad_x)), constant_values=PAD_CLASS)
+
+    def _tiled(self, plane: np.ndarray) -> np.ndarray:
+        """A padded class plane viewed as (tile row, y, tile column, x)."""
+        height, width = plane.shape
+        size = self.tile_size
+        return plane.reshape(height // size, size, width // size, size)
+
+    def class_counts(self, plane: np.ndarray) -> np.ndarray:
+        """Number of pixels of each class (index = class id) in a (height, width) class plane."""
+        padded = self._pad(plane)
+        tiled = self._tiled(padded)
+        if self._last_plane is None or self._last_plane.shape != padded.shape:
+            self._last_plane = np.empty(padded.shape, dtype=np.uint8)
+            self._tile_counts = np.zeros((tiled.shape[0], tiled.shape[2], 256), dtype=np.int64)
+            self._totals = np.zeros(256, dtype=np.int64)
+            dirty = np.ones((tiled.shape[0], tiled.shape[2]), dtype=bool)
+        else:
+            dirty = (tiled != self._tiled(self._last_plane)).any(axis=(1, 3))
+
+        rows, cols = np.nonzero(dirty)
+        self.hits += dirty.size - len(rows)
+        self.misses += len(rows)
+        if len(rows):
+            # One bincount for all dirty tiles, each offset into its own 256 bins
+            tiles = tiled[rows, :, cols, :].reshape(len(rows), -1)
+            offsets = np.arange(0, len(rows) * 256, 256)[:, None]
+            counts = np.bincount((tiles + offsets).ravel(), minlength=len(rows) * 256).reshape(-1, 256)
+            self._totals += counts.sum(axis=0) - self._tile_counts[rows, cols].sum(axis=0)
+            self._tile_counts[rows, cols] = counts
+            np.copyto(self._last_plane, padded)
+
+        totals = self._totals.copy()
+        totals[PAD_CLASS] -= padded.size - plane.size
+        return totals
+
+    def clear(self):
+        self._last_plane = None
+        self._tile_counts = None
+        self._totals = None
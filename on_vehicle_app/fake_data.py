@@ -9,6 +9,21 @@ def get_ego_location() -> tuple[float, float, float]:
     return (0.0, 0.0, 0.0)
 
 
+def get_ego_yaw() -> float:
+    # Placeholder for actual ego vehicle heading retrieval logic (degrees, CARLA convention)
+    return 0.0
+
+
+def get_ego_speed() -> float:
+    # Placeholder for actual ego vehicle speed retrieval logic (m/s)
+    return 0.0
+
+
+def get_navigation_route() -> list[tuple[float, float, float]]:
+    # Placeholder for the planned route's waypoints; empty when no route is planned
+    return []
+
+
 def create_fake_semantic_segmentation_sensor_data() -> AdasActorEvent:
     # Example of datas from Carla
     # BGRA tuples: (B, G, R, A). Only Red holds the class ID.
@@ -0,0 +1,84 @@
+import json
+import threading
+import time
+
+import numpy as np
+
+from contract.mqtt.topics import Topics
+from contract.semantic_frame_codec import decode_class_plane
+from contract.semantic_frame_message import ENCODING_CLASS_PLANE, ENCODING_RAW, SemanticFrameHeader, unpack_frame_header
+
+try:
+    import zenoh
+except ImportError:
+    raise RuntimeError('cannot import zenoh, make sure eclipse-zenoh package is installed')
+
+
+def _payload_buffer(payload: "zenoh.ZBytes"):
+    # A payload in Zenoh shared memory (or received in one piece) can be viewed
+    # without copying; anything else is gathered into a bytes object
+    try:
+        return memoryview(payload)
+    except TypeError:
+        return payload.to_bytes()
+
+
+class ZenohFrameSubscriber:
+    """
+    Receives the semantic frames published by the CARLA client and keeps only
+    the newest one. Detection runs slower than the camera at times, so frames
+    that arrive in the meantime are dropped rather than queued.
+    """
+
+    def __init__(self, router: str, key: str = Topics.VEHICLE_SENSORS_SEMANTIC_SEGMENTATION):
+        zenoh_config = zenoh.Config()
+        zenoh_config.insert_json5("mode", json.dumps("peer"))
+        zenoh_config.insert_json5("connect/endpoints", json.dumps([f"tcp/{router}:7447"]))
+        zenoh_config.insert_json5("transport/shared_memory/enabled", json.dumps(True))
+        self._session = zenoh.open(zenoh_config)
+
+        self._condition = threading.Condition()
+        self._latest: "zenoh.Sample | None" = None
+        self.received = 0
+        self.dropped = 0
+        self._subscriber = self._session.declare_subscriber(key, self._on_sample)
+
+    def _on_sample(self, sample: "zenoh.Sample"):
+        # Runs on a Zenoh thread; keep the sample (and its shared-memory buffer) alive until used
+        with self._condition:
+            if self._latest is not None:
+                self.dropped += 1
+            self._latest = sample
+            self.received += 1
+            self._condition.notify()
+
+    def wait_latest(self, timeout: float | None = None) -> tuple[SemanticFrameHeader, np.ndarray] | None:
+        """
+        Blocks until a frame newer than the last one returned arrives, or timeout
+        expires. Returns its header and its pixels: a (height, width, channels)
+        array for raw frames, the (height, width) class plane for encoded ones.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while self._latest is None:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self._condition.wait(remaining)
+            sample, self._latest = self._latest, None
+
+        if sample.attachment is None:
+            print("Dropping semantic frame without header")
+            return None
+        header = unpack_frame_header(sample.attachment.to_bytes())
+        if header.encoding == ENCODING_CLASS_PLANE:
+            return header, decode_class_plane(_payload_buffer(sample.payload))
+        if header.encoding != ENCODING_RAW:
+            print(f"Dropping semantic frame with unsupported encoding {header.encoding}")
+            return None
+        pixels = np.frombuffer(_payload_buffer(sample.payload), dtype=np.uint8)
+        return header, pixels.reshape((header.height, header.width, header.channels))
+
+    def close(self):
+        self._subscriber.undeclare()
+        self._session.close()
@@ -0,0 +1,132 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Iterable, List
+
+import numpy as np
+
+
+@dataclass
+class ClassStats:
+    """Pixels of one class in a frame: how many, their bounding box and centroid."""
+    count: int = 0
+    min_row: int = -1
+    max_row: int = -1
+    min_col: int = -1
+    max_col: int = -1
+    row_sum: int = 0
+    col_sum: int = 0
+
+    @property
+    def centroid(self):
+        """(row, col) of the class's pixels, None if there are none."""
+        if self.count == 0:
+            return None
+        return (self.row_sum / self.count, self.col_sum / self.count)
+
+    def merge(self, other: "ClassStats"):
+        if other.count == 0:
+            return
+        if self.count == 0:
+            self.min_row, self.max_row = other.min_row, other.max_row
+            self.min_col, self.max_col = other.min_col, other.max_col
+        else:
+            self.min_row = min(self.min_row, other.min_row)
+            self.max_row = max(self.max_row, other.max_row)
+            self.min_col = min(self.min_col, other.min_col)
+            self.max_col = max(self.max_col, other.max_col)
+        self.count += other.count
+        self.row_sum += other.row_sum
+        self.col_sum += other.col_sum
+
+
+class _Scratch(threading.local):
+    # Per worker thread, reused for every band the thread processes; sized
+    # for the tallest band seen so far, shorter bands use the leading rows
+    band = None
+    mask = None
+
+
+class ParallelTileDetector:
+    """
+    Per-class statistics of semantic class planes, computed on a thread pool.
+
+    The plane is split into bands of rows, one task per band. Each task only
+    runs NumPy ufuncs and reductions, which release the GIL, into scratch
+    buffers owned by its worker thread, so bands of one frame (or frames of
+    several cameras submitted at once) really run on separate cores. Band
+    results are merged into one ClassStats per class.
+    """
+
+    def __init__(self, workers: int | None = None, min_band_rows: int = 64):
+        self.workers = workers or os.cpu_count() or 1
+        self.min_band_rows = min_band_rows
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="tile-detector")
+        self._scratch = _Scratch()
+        self._columns: Dict[int, np.ndarray] = {}
+
+    def _column_index(self, width: int) -> np.ndarray:
+        columns = self._columns.get(width)
+        if columns is None:
+            columns = np.arange(width, dtype=np.int64)
+            self._columns[width] = columns
+        return columns
+
+    def _detect_band(self, band: np.ndarray, first_row: int, class_ids: List[int]) -> Dict[int, ClassStats]:
+        scratch = self._scratch
+        rows, width = band.shape
+        if scratch.band is None or scratch.band.shape[1] != width or scratch.band.shape[0] < rows:
+            scratch.band = np.empty(band.shape, dtype=np.uint8)
+            scratch.mask = np.empty(band.shape, dtype=bool)
+        mask = scratch.mask[:rows]
+        if not band.flags.c_contiguous:
+            # The red channel of a BGRA frame is strided; compare against a packed copy
+            packed = scratch.band[:rows]
+            np.copyto(packed, band)
+            band = packed
+
+        stats = {}
+        for class_id in class_ids:
+            np.equal(band, class_id, out=mask)
+            if not mask.any():
+                stats[class_id] = ClassStats()
+                continue
+            # Count and locate within the rows the class shows up in only
+            hit_rows = np.flatnonzero(mask.any(axis=1))
+            hits = mask[hit_rows[0]:hit_rows[-1] + 1]
+            row_counts = np.count_nonzero(hits, axis=1)
+            col_counts = np.count_nonzero(hits, axis=0)
+            cols = np.flatnonzero(col_counts)
+            count = int(row_counts.sum())
+            stats[class_id] = ClassStats(
+                count=count,
+                min_row=first_row + int(hit_rows[0]),
+                max_row=first_row + int(hit_rows[-1]),
+                min_col=int(cols[0]),
+                max_col=int(cols[-1]),
+                row_sum=int(row_counts @ np.arange(row_counts.size)) + (first_row + int(hit_rows[0])) * count,
+                col_sum=int(col_counts @ self._column_index(width)),
+            )
+        return stats
+
+    def _bands(self, height: int) -> List[int]:
+        band_rows = max(self.min_band_rows, -(-height // self.workers))
+        return list(range(0, height, band_rows)) + [height]
+
+    def detect(self, plane: np.ndarray, class_ids: Iterable[int]) -> Dict[int, ClassStats]:
+        """ClassStats for each of class_ids in a (height, width) class plane."""
+        class_ids = list(class_ids)
+        bounds = self._bands(plane.shape[0])
+        futures = [
+            self._pool.submit(self._detect_band, plane[start:end], start, class_ids)
+            for start, end in zip(bounds[:-1], bounds[1:])
+        ]
+        merged = {class_id: ClassStats() for class_id in class_ids}
+        for future in futures:
+            for class_id, stats in future.result().items():
+                merged[class_id].merge(stats)
+        return merged
+
+    def close(self):
+        self._pool.shutdown()
@@ -1,19 +1,21 @@
 import json
 from contract.adas_actor_event import AdasActorEvent
+from contract.ego_telemetry import EgoTelemetry
 from contract.mqtt.client import CLIENT, initialize_mqtt_client
 from contract.mqtt.topics import Topics
+from contract.navigation_route import NavigationRoute
 from contract.passenger_leaving_event import PassengerLeftEvent
 from on_vehicle_app.constants import ONLY_PRINT
 
 
-def publish(topic: str, payload: str):
+def publish(topic: str, payload: str, retain: bool = False):
     if ONLY_PRINT:
         print(payload)
         print()
         return
 
     print("Publishing topic '{}' with data {}".format(topic, payload))
-    CLIENT.publish(topic, payload)
+    CLIENT.publish(topic, payload, retain=retain)
 
 
 def publish_actor_seen_event(adas_actor_seen_event: AdasActorEvent):
@@ -24,3 +26,14 @@ def publish_actor_seen_event(adas_actor_seen_event: AdasActorEvent):
 def publish_passenger_left_vehicle_event(passenger_left_event: PassengerLeftEvent):
     payload: str = passenger_left_event.model_dump_json()
     publish(Topics.VEHICLE_PASSENGER_LEFT, payload)
+
+
+def publish_ego_telemetry(ego_telemetry: EgoTelemetry):
+    payload: str = ego_telemetry.model_dump_json()
+    publish(Topics.VEHICLE_EGO_TELEMETRY, payload)
+
+
+def publish_navigation_route(navigation_route: NavigationRoute):
+    payload: str = navigation_route.model_dump_json()
+    # Retained, so infotainment gets the current route whenever it connects
+    publish(Topics.VEHICLE_NAVIGATION_ROUTE, payload, retain=True)
@@ -1,13 +1,50 @@
 import time
+from datetime import datetime
 
+from contract.adas_actor_event import AdasActorEvent
+from contract.ego_telemetry import EgoTelemetry
+from contract.navigation_route import NavigationRoute
 from contract.passenger_leaving_event import PassengerLeftEvent
-from on_vehicle_app.fake_data import create_fake_semantic_segmentation_sensor_data, get_ego_location
+from contract.semantic_frame_codec import read_recording
+from contract.semantic_frame_ring import SemanticFrameRingReader, SemanticFrameView
+from on_vehicle_app.actor_events import class_plane_of, make_brand_new_actor_event
+from on_vehicle_app.camera_fusion import CameraConfig, camera_detection, fuse_detections, fuse_positions
+from on_vehicle_app.constants import (
+    ACTOR_SEEN_PUBLISH_INTERVAL_SECONDS,
+    CAMERA_RIG,
+    CARLA_CLASS_LABELS,
+    DETECTED_CLASS_IDS,
+    DETECTION_TILE_SIZE,
+    FUSION_AZIMUTH_TOLERANCE_DEGREES,
+    FUSION_CLUSTER_CELL_METERS,
+    FUSION_MAX_FRAME_SKEW,
+    FUSION_MIN_CLUSTER_PIXELS,
+    PARALLEL_DETECTION_MIN_PIXELS,
+    PARALLEL_DETECTION_WORKERS,
+    USE_DETECTION_CACHE,
+)
+from on_vehicle_app.depth_projection import project_mask
+from on_vehicle_app.detection_cache import TileDetectionCache
+from on_vehicle_app.parallel_detector import ParallelTileDetector
+from on_vehicle_app.fake_data import create_fake_semantic_segmentation_sensor_data, get_ego_location, get_ego_speed, get_ego_yaw, get_navigation_route
 from on_vehicle_app.passenger_events import should_passenger_leave_vehicle
-from on_vehicle_app.publishers import publish_actor_seen_event, publish_passenger_left_vehicle_event
+from on_vehicle_app.publishers import publish_actor_seen_event, publish_ego_telemetry, publish_navigation_route, publish_passenger_left_vehicle_event
 
 
 def run_fake_carla_sensor_loop():
+    published_route = None
     while True:
+        # The route only goes out when it changes: every new one makes
+        # infotainment rebuild its corridor and resync its events
+        route = get_navigation_route()
+        if route != published_route:
+            publish_navigation_route(NavigationRoute(timestamp=datetime.utcnow(), waypoints=route))
+            published_route = route
+        publish_ego_telemetry(EgoTelemetry(
+            timestamp=datetime.utcnow(),
+            location=get_ego_location(),
+            speed=get_ego_speed()
+        ))
         event = create_fake_semantic_segmentation_sensor_data()
         publish_actor_seen_event(event)
         time.sleep(0.1)
@@ -21,3 +58,225 @@ def run_fake_carla_sensor_loop():
             publish_passenger_left_vehicle_event(passenger_left_vehicle)
         time.sleep(1)
 
+
+_detection_cache = TileDetectionCache(DETECTION_TILE_SIZE) if USE_DETECTION_CACHE else None
+_parallel_detector = ParallelTileDetector(PARALLEL_DETECTION_WORKERS)
+
+
+def _due_class_ids(last_published: dict[int, float]) -> list[int]:
+    now = time.monotonic()
+    return [
+        class_id for class_id in DETECTED_CLASS_IDS
+        if now - last_published.get(class_id, 0.0) >= ACTOR_SEEN_PUBLISH_INTERVAL_SECONDS
+    ]
+
+
+def _detect_actors(pixels, width: int, height: int, last_published: dict[int, float]) -> dict[int, list[AdasActorEvent]]:
+    """
+    Runs the detector for every monitored class, publishing at most one event
+    per class every ACTOR_SEEN_PUBLISH_INTERVAL_SECONDS. The events are handed
+    back unpublished so the caller can check the frame is still intact first.
+    """
+    due = _due_class_ids(last_published)
+    if not due:
+        return {}
+
+    # Large frames are split across cores; smaller ones go through the tile cache
+    class_counts = None
+    if width * height >= PARALLEL_DETECTION_MIN_PIXELS:
+        stats = _parallel_detector.detect(class_plane_of(pixels, width, height), due)
+        class_counts = {class_id: stats[class_id].count for class_id in due}
+    elif _detection_cache is not None:
+        class_counts = _detection_cache.class_counts(class_plane_of(pixels, width, height))
+    events = {}
+    for class_id in due:
+        events[class_id] = [make_brand_new_actor_event(
+            raw_data=pixels,
+            width=width,
+            height=height,
+            location=get_ego_location(),
+            class_id=class_id,
+            actor_tag=CARLA_CLASS_LABELS[class_id],
+            visible=None if class_counts is None else bool(class_counts[class_id]),
+        )]
+    return events
+
+
+def _publish_detections(events: dict[int, list[AdasActorEvent]], last_published: dict[int, float]):
+    now = time.monotonic()
+    for class_id, class_events in events.items():
+        for event in class_events:
+            publish_actor_seen_event(event)
+        last_published[class_id] = now
+
+
+def run_shared_memory_sensor_loop(ring_name: str):
+    """
+    Runs the detector on the semantic frames the CARLA client writes into the
+    shared-memory ring. Frames are read in place, one frame behind the camera.
+    """
+    ring = SemanticFrameRingReader(ring_name)
+    print(f"Reading {ring.width}x{ring.height} semantic frames from shared memory '{ring_name}'")
+    last_published = {}
+    try:
+        while True:
+            frame = ring.wait_latest()
+            events = _detect_actors(frame.pixels, ring.width, ring.height, last_published)
+            # The writer lapped us while we were looking at the pixels
+            if ring.is_valid(frame):
+                _publish_detections(events, last_published)
+    finally:
+        ring.close()
+
+
+def run_zenoh_sensor_loop(router: str):
+    """Runs the detector on the semantic frames the CARLA client publishes over Zenoh."""
+    # Only this loop needs zenoh installed
+    from on_vehicle_app.frame_subscriber import ZenohFrameSubscriber
+
+    subscriber = ZenohFrameSubscriber(router)
+    print(f"Receiving semantic frames over Zenoh from {router}")
+    last_published = {}
+    try:
+        while True:
+            frame = subscriber.wait_latest()
+            if frame is None:
+                continue
+            header, pixels = frame
+            events = _detect_actors(pixels, header.width, header.height, last_published)
+            _publish_detections(events, last_published)
+    finally:
+        subscriber.close()
+
+
+def run_recorded_sensor_loop(path: str, speed: float = 1.0):
+    """
+    Replays a semantic frame recording through the detector, paced by the
+    recorded timestamps (speed 2.0 replays twice as fast, 0 as fast as possible).
+    """
+    print(f"Replaying semantic frames from {path} at {speed}x")
+    last_published = {}
+    replay_start = None
+    for frame_id, timestamp, plane in read_recording(path):
+        if replay_start is None:
+            replay_start = (time.monotonic(), timestamp)
+        if speed > 0:
+            wait = replay_start[0] + (timestamp - replay_start[1]) / speed - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+        height, width = plane.shape
+        events = _detect_actors(plane, width, height, last_published)
+        _publish_detections(events, last_published)
+
+
+def _read_synchronized_frames(rings: dict[str, SemanticFrameRingReader]) -> dict[str, SemanticFrameView]:
+    """Waits until every ring has a frame and their frame ids are at most FUSION_MAX_FRAME_SKEW apart."""
+    frames = {}
+    while True:
+        for name, ring in rings.items():
+            frame = ring.latest()
+            if frame is not None:
+                frames[name] = frame
+        if len(frames) == len(rings):
+            frame_ids = [frame.frame_id for frame in frames.values()]
+            if max(frame_ids) - min(frame_ids) <= FUSION_MAX_FRAME_SKEW:
+                return frames
+        time.sleep(0.001)
+
+
+def _detect_fused_actors(
+    cameras: list[CameraConfig],
+    rings: dict[str, SemanticFrameRingReader],
+    frames: dict[str, SemanticFrameView],
+    last_published: dict[int, float],
+) -> dict[int, list[AdasActorEvent]]:
+    """
+    Detects the monitored classes in every camera and fuses them into one
+    event per actor, plus one "not visible" event per class no camera sees,
+    however many cameras there are. Cameras with a depth frame (rings and
+    frames keyed "<camera>_depth") give each actor its world position and
+    actors are clustered by position; otherwise by bearing, at the ego location.
+    """
+    due = _due_class_ids(last_published)
+    if not due:
+        return {}
+
+    use_depth = all(f"{camera.name}_depth" in frames for camera in cameras)
+    ego_location = get_ego_location()
+    ego_yaw = get_ego_yaw()
+    detections = []
+    points = {class_id: {} for class_id in due}
+    for camera in cameras:
+        ring = rings[camera.name]
+        plane = class_plane_of(frames[camera.name].pixels, ring.width, ring.height)
+        stats = _parallel_detector.detect(plane, due)
+        for class_id in due:
+            class_stats = stats[class_id]
+            if class_stats.count == 0:
+                continue
+            if not use_depth:
+                detections.append(camera_detection(camera, ring.width, class_id, class_stats))
+                continue
+            # Only the bounding box of the class needs looking at
+            window = plane[class_stats.min_row:class_stats.max_row + 1, class_stats.min_col:class_stats.max_col + 1]
+            depth_frame = frames[f"{camera.name}_depth"]
+            points[class_id][camera.name] = project_mask(
+                camera, ring.width, ring.height, window == class_id, depth_frame.pixels,
+                ego_location, ego_yaw, class_stats.min_row, class_stats.min_col, depth_frame.pose,
+            )
+
+    if use_depth:
+        actors = [
+            actor for class_id in due
+            for actor in fuse_positions(class_id, points[class_id], FUSION_CLUSTER_CELL_METERS, FUSION_MIN_CLUSTER_PIXELS)
+        ]
+    else:
+        actors = fuse_detections(detections, FUSION_AZIMUTH_TOLERANCE_DEGREES)
+
+    events = {class_id: [] for class_id in due}
+    for actor in actors:
+        events[actor.class_id].append(AdasActorEvent(
+            UUID=None,
+            actor_tag=CARLA_CLASS_LABELS[actor.class_id],
+            is_visible=True,
+            timestamp=datetime.utcnow(),
+            location=actor.location if actor.location is not None else ego_location,
+        ))
+    for class_id, class_events in events.items():
+        if not class_events:
+            class_events.append(AdasActorEvent(
+                UUID=None,
+                actor_tag=CARLA_CLASS_LABELS[class_id],
+                is_visible=False,
+                timestamp=datetime.utcnow(),
+                location=ego_location,
+            ))
+    return events
+
+
+def _camera_ring_name(ring_name: str, camera: str) -> str:
+    return ring_name if camera == "front" else f"{ring_name}_{camera}"
+
+
+def run_multi_camera_sensor_loop(ring_name: str, cameras: list[CameraConfig] = CAMERA_RIG, use_depth: bool = False):
+    """
+    Runs the detector on several cameras, each streaming into its own
+    shared-memory ring, and publishes the fused detections. With use_depth,
+    each camera's depth frames are read as well to locate the actors.
+    """
+    rings = {camera.name: SemanticFrameRingReader(_camera_ring_name(ring_name, camera.name)) for camera in cameras}
+    if use_depth:
+        for camera in cameras:
+            rings[f"{camera.name}_depth"] = SemanticFrameRingReader(f"{_camera_ring_name(ring_name, camera.name)}_depth")
+    print(f"Reading frames of {', '.join(rings)} from shared memory '{ring_name}'")
+    last_published = {}
+    try:
+        while True:
+            frames = _read_synchronized_frames(rings)
+            events = _detect_fused_actors(cameras, rings, frames, last_published)
+            # Drop the whole set if a writer lapped us on any camera
+            if all(rings[name].is_valid(frame) for name, frame in frames.items()):
+                _publish_detections(events, last_published)
+    finally:
+        for ring in rings.values():
+            ring.close()
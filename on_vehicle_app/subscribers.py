@@ -3,4 +3,3 @@ from contract.mqtt.topics import Topics
 
 def start_listening_to_topics():
     CLIENT.subscribe(Topics.VEHICLE_ADAS_ACTOR_SHOULD_MONITOR)
-    CLIENT.subscribe(Topics.VEHICLE_SENSORS_SEMANTIC_SEGMENTATION)
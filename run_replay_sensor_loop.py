@@ -0,0 +1,13 @@
+import sys
+
+from contract.mqtt.client import initialize_mqtt_client
+from on_vehicle_app.sensor_loop import run_recorded_sensor_loop
+
+if len(sys.argv) < 2:
+    print("usage: run_replay_sensor_loop.py RECORDING [SPEED]")
+    sys.exit(1)
+speed = float(sys.argv[2]) if len(sys.argv) > 2 else 1.0
+
+print("Starting recorded Carla sensor loop...")
+initialize_mqtt_client()
+run_recorded_sensor_loop(sys.argv[1], speed)
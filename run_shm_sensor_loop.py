@@ -0,0 +1,19 @@
+import sys
+
+from contract.mqtt.client import initialize_mqtt_client
+from on_vehicle_app.constants import CAMERA_RIG, SEMANTIC_FRAME_RING_NAME
+from on_vehicle_app.sensor_loop import run_multi_camera_sensor_loop, run_shared_memory_sensor_loop
+
+# --rig: fuse the front, rear, left and right cameras of the CARLA client's --shm-rig
+# --depth: locate actors with the depth cameras of the CARLA client's --shm-depth
+flags = {arg for arg in sys.argv[1:] if arg.startswith("--")}
+args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+ring_name = args[0] if args else SEMANTIC_FRAME_RING_NAME
+
+print("Starting shared-memory Carla sensor loop...")
+initialize_mqtt_client()
+if "--rig" in flags or "--depth" in flags:
+    cameras = CAMERA_RIG if "--rig" in flags else CAMERA_RIG[:1]
+    run_multi_camera_sensor_loop(ring_name, cameras, use_depth="--depth" in flags)
+else:
+    run_shared_memory_sensor_loop(ring_name)
@@ -0,0 +1,10 @@
+import sys
+
+from contract.mqtt.client import initialize_mqtt_client
+from on_vehicle_app.sensor_loop import run_zenoh_sensor_loop
+
+router = sys.argv[1] if len(sys.argv) > 1 else "127.0.0.1"
+
+print("Starting Zenoh Carla sensor loop...")
+initialize_mqtt_client()
+run_zenoh_sensor_loop(router)
@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+
+#
+#  Copyright (c) 2025 The X-Verse <https://github.com/The-Xverse>
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+# ==============================================================================
+# -- Imports -------------------------------------------------------------------
+# ==============================================================================
+
+import fnmatch
+
+import numpy as np
+
+
+# ==============================================================================
+# -- ActorRegistry -------------------------------------------------------------
+# ==============================================================================
+
+class ActorRegistry(object):
+    """
+    The world's actors of one type pattern (CARLA wildcards, as in
+    ActorList.filter) with their positions, for spatial queries.
+
+    Each refresh reads positions from a world snapshot, which the client
+    already holds, instead of asking the server for every actor's location.
+    Actors are only fetched from the server when they first show up in a
+    snapshot, all new ones in a single call, and forgotten once they are gone.
+    Positions are kept in an (n, 3) NumPy array, so radius and nearest-k
+    queries are vectorized.
+    """
+
+    def __init__(self, world, pattern='vehicle.*'):
+        self._world = world
+        self._pattern = pattern
+        self._actors = {}  # actor id -> carla.Actor matching the pattern
+        self._ignored = set()  # ids of actors known not to match
+        self._frame = None
+        self.ids = np.empty(0, dtype=np.int64)
+        self.positions = np.empty((0, 3), dtype=np.float64)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def refresh(self, snapshot=None):
+        """Updates actors and positions to a world snapshot, the latest one by default."""
+        if snapshot is None:
+            snapshot = self._world.get_snapshot()
+        if snapshot.frame == self._frame:
+            return
+        self._frame = snapshot.frame
+
+        ids = []
+        positions = []
+        unknown = []
+        for actor_snapshot in snapshot:
+            actor_id = actor_snapshot.id
+            if actor_id in self._actors:
+                location = actor_snapshot.get_transform().location
+                ids.append(actor_id)
+                positions.append((location.x, location.y, location.z))
+            elif actor_id not in self._ignored:
+                unknown.append(actor_id)
+
+        if unknown:
+            for actor in self._world.get_actors(unknown):
+                if not fnmatch.fnmatchcase(actor.type_id, self._pattern):
+                    self._ignored.add(actor.id)
+                    continue
+                self._actors[actor.id] = actor
+                location = snapshot.find(actor.id).get_transform().location
+                ids.append(actor.id)
+                positions.append((location.x, location.y, location.z))
+
+        if len(ids) < len(self._actors):
+            present = set(ids)
+            for actor_id in [i for i in self._actors if i not in present]:
+                del self._actors[actor_id]
+        self.ids = np.array(ids, dtype=np.int64)
+        self.positions = np.array(positions, dtype=np.float64).reshape((-1, 3))
+
+    def _distances(self, location):
+        return np.linalg.norm(self.positions - (location.x, location.y, location.z), axis=1)
+
+    def within(self, location, radius, exclude=None):
+        """[(distance, actor)] of the actors within `radius` meters of a carla.Location, nearest first."""
+        return self.nearest(location, len(self.ids), radius, exclude)
+
+    def nearest(self, location, k, radius=None, exclude=None):
+        """
+        [(distance, actor)] of the `k` actors nearest to a carla.Location,
+        nearest first, optionally only those within `radius` meters and
+        leaving out the actor with id `exclude`.
+        """
+        distances = self._distances(location)
+        candidates = np.ones(len(distances), dtype=bool)
+        if radius is not None:
+            candidates &= distances <= radius
+        if exclude is not None:
+            candidates &= self.ids != exclude
+        candidates = np.flatnonzero(candidates)
+        if k < len(candidates):
+            candidates = candidates[np.argpartition(distances[candidates], k)[:k]]
+        candidates = candidates[np.argsort(distances[candidates])]
+        return [(float(distances[i]), self._actors[int(self.ids[i])]) for i in candidates]
@@ -11,7 +11,6 @@
 from __future__ import print_function
 
 import argparse
-import collections
 import datetime
 import glob
 import logging
@@ -32,10 +31,14 @@ except ImportError:
     raise RuntimeError('cannot import pygame, make sure pygame package is installed')
 
 try:
-    import numpy as np
-except ImportError:
-    raise RuntimeError(
-        'cannot import numpy, make sure numpy package is installed')
+    # Copied next to this script
+    from actor_registry import ActorRegistry
+    from frame_history import FrameHistory
+    from sample_envelope import pack_envelope
+    from sensor_surface import SensorSurface
+    from zenoh_vehicle import VehicleStatePublisher
+except ImportError as error:
+    raise RuntimeError('cannot import %s, copy it next to this script' % error.name)
 
 # ==============================================================================
 # -- Find CARLA module ---------------------------------------------------------
@@ -130,6 +133,7 @@ class World(object):
         self.lane_invasion_sensor = None
         self.gnss_sensor = None
         self.camera_manager = None
+        self.actor_registry = ActorRegistry(self.world)
         self._weather_presets = find_weather_presets()
         self._weather_index = 0
         self._actor_filter = args.filter
@@ -264,7 +268,7 @@ class KeyboardControl(object):
 class HUD(object):
     """Class for HUD text"""
 
-    def __init__(self, width, height, session, key):
+    def __init__(self, width, height, session, key, legacy_topics=False):
         """Constructor method"""
         self.dim = (width, height)
         font = pygame.font.Font(pygame.font.get_default_font(), 20)
@@ -282,7 +286,15 @@ class HUD(object):
         self._show_info = True
         self._info_text = []
         self._server_clock = pygame.time.Clock()
-        self._pub = session.declare_publisher(key)
+        self._info_surface = pygame.Surface((220, self.dim[1]))
+        self._info_surface.set_alpha(100)
+        # Rendered info lines by position, re-rendered only when their text changes
+        self._line_cache = []
+        # Fields that only change with the player, formatted once per player
+        self._player_id = None
+        self._player_text = []
+        self._pub = session.declare_publisher(key) if legacy_topics else None
+        self._state_publisher = VehicleStatePublisher(session)
 
     def on_world_tick(self, timestamp):
         """Gets informations from the world at every tick"""
@@ -294,30 +306,28 @@ class HUD(object):
     def tick(self, world, clock):
         """HUD method for every tick"""
         self._notifications.tick(world, clock)
-        if not self._show_info:
-            return
         transform = world.player.get_transform()
         vel = world.player.get_velocity()
         control = world.player.get_control()
+        self._state_publisher.publish(self.frame, self.simulation_time, vel, control, transform)
+        if not self._show_info:
+            return
         speed = int(3.6 * math.sqrt(vel.x**2 + vel.y**2 + vel.z**2))
-        buf = f"{speed}"
-        self._pub.put(buf)
+        if self._pub is not None:
+            self._pub.put(f"{speed}", attachment=pack_envelope(self.frame, self.simulation_time))
         heading = 'N' if abs(transform.rotation.yaw) < 89.5 else ''
         heading += 'S' if abs(transform.rotation.yaw) > 90.5 else ''
         heading += 'E' if 179.5 > transform.rotation.yaw > 0.5 else ''
         heading += 'W' if -0.5 > transform.rotation.yaw > -179.5 else ''
-        colhist = world.collision_sensor.get_collision_history()
-        collision = [colhist[x + self.frame - 200] for x in range(0, 200)]
-        max_col = max(1.0, max(collision))
-        collision = [x / max_col for x in collision]
-        vehicles = world.world.get_actors().filter('vehicle.*')
+        collision = world.collision_sensor.get_collision_history(self.frame - 200, 200)
+        collision = (collision / max(1.0, collision.max())).tolist()
+        world.actor_registry.refresh()
 
         self._info_text = [
             'Server:  % 16.0f FPS' % self.server_fps,
             'Client:  % 16.0f FPS' % clock.get_fps(),
             '',
-            'Vehicle: % 20s' % get_actor_display_name(world.player, truncate=20),
-            'Map:     % 20s' % world.map.name.split('/')[-1],
+            *self._player_info(world),
             'Simulation time: % 12s' % datetime.timedelta(seconds=int(self.simulation_time)),
             '',
             'Speed:   % 15.0f km/h' % speed,
@@ -344,21 +354,34 @@ class HUD(object):
             'Collision:',
             collision,
             '',
-            'Number of vehicles: % 8d' % len(vehicles)]
+            'Number of vehicles: % 8d' % len(world.actor_registry)]
 
-        if len(vehicles) > 1:
+        if len(world.actor_registry) > 1:
             self._info_text += ['Nearby vehicles:']
-
-        def dist(l):
-            return math.sqrt((l.x - transform.location.x)**2 + (l.y - transform.location.y)
-                             ** 2 + (l.z - transform.location.z)**2)
-        vehicles = [(dist(x.get_location()), x) for x in vehicles if x.id != world.player.id]
-
-        for dist, vehicle in sorted(vehicles):
-            if dist > 200.0:
-                break
-            vehicle_type = get_actor_display_name(vehicle, truncate=22)
-            self._info_text.append('% 4dm %s' % (dist, vehicle_type))
+            # Only as many as there are lines left on screen
+            lines = max(0, (self.dim[1] - 4) // 18 - len(self._info_text))
+            for dist, vehicle in world.actor_registry.nearest(transform.location, lines, 200.0, world.player.id):
+                vehicle_type = get_actor_display_name(vehicle, truncate=22)
+                self._info_text.append('% 4dm %s' % (dist, vehicle_type))
+
+    def _player_info(self, world):
+        """Vehicle and map lines, formatted again only for a new player"""
+        if world.player.id != self._player_id:
+            self._player_id = world.player.id
+            self._player_text = [
+                'Vehicle: % 20s' % get_actor_display_name(world.player, truncate=20),
+                'Map:     % 20s' % world.map.name.split('/')[-1]]
+        return self._player_text
+
+    def _line_surface(self, line, text):
+        """Rendered text of an info line, from the cache while the text is unchanged"""
+        if line >= len(self._line_cache):
+            self._line_cache.extend([(None, None)] * (line + 1 - len(self._line_cache)))
+        cached_text, surface = self._line_cache[line]
+        if cached_text != text:
+            surface = self._font_mono.render(text, True, (255, 255, 255))
+            self._line_cache[line] = (text, surface)
+        return surface
 
     def toggle_info(self):
         """Toggle info on or off"""
@@ -375,13 +398,11 @@ class HUD(object):
     def render(self, display):
         """Render for HUD class"""
         if self._show_info:
-            info_surface = pygame.Surface((220, self.dim[1]))
-            info_surface.set_alpha(100)
-            display.blit(info_surface, (0, 0))
+            display.blit(self._info_surface, (0, 0))
             v_offset = 4
             bar_h_offset = 100
             bar_width = 106
-            for item in self._info_text:
+            for line, item in enumerate(self._info_text):
                 if v_offset + 18 > self.dim[1]:
                     break
                 if isinstance(item, list):
@@ -406,8 +427,7 @@ class HUD(object):
                         pygame.draw.rect(display, (255, 255, 255), rect)
                     item = item[0]
                 if item:  # At this point has to be a str.
-                    surface = self._font_mono.render(item, True, (255, 255, 255))
-                    display.blit(surface, (8, v_offset))
+                    display.blit(self._line_surface(line, item), (8, v_offset))
                 v_offset += 18
         self._notifications.render(display)
         self.help.render(display)
@@ -489,7 +509,7 @@ class CollisionSensor(object):
     def __init__(self, parent_actor, hud):
         """Constructor method"""
         self.sensor = None
-        self.history = []
+        self.history = FrameHistory(4000)
         self._parent = parent_actor
         self.hud = hud
         world = self._parent.get_world()
@@ -500,12 +520,9 @@ class CollisionSensor(object):
         weak_self = weakref.ref(self)
         self.sensor.listen(lambda event: CollisionSensor._on_collision(weak_self, event))
 
-    def get_collision_history(self):
-        """Gets the history of collisions"""
-        history = collections.defaultdict(int)
-        for frame, intensity in self.history:
-            history[frame] += intensity
-        return history
+    def get_collision_history(self, first_frame, frames):
+        """Gets the summed collision intensity of each frame in a span of frames"""
+        return self.history.sums(first_frame, frames)
 
     @staticmethod
     def _on_collision(weak_self, event):
@@ -517,9 +534,7 @@ class CollisionSensor(object):
         self.hud.notification('Collision with %r' % actor_type)
         impulse = event.normal_impulse
         intensity = math.sqrt(impulse.x ** 2 + impulse.y ** 2 + impulse.z ** 2)
-        self.history.append((event.frame, intensity))
-        if len(self.history) > 4000:
-            self.history.pop(0)
+        self.history.append(event.frame, intensity)
 
 # ==============================================================================
 # -- LaneInvasionSensor --------------------------------------------------------
@@ -596,6 +611,7 @@ class CameraManager(object):
         """Constructor method"""
         self.sensor = None
         self.surface = None
+        self._sensor_surfaces = {}
         self._parent = parent_actor
         self.hud = hud
         self.recording = False
@@ -672,33 +688,28 @@ class CameraManager(object):
     def render(self, display):
         """Render method"""
         if self.surface is not None:
-            display.blit(self.surface, (0, 0))
+            self.surface.render(display)
+
+    def _sensor_surface(self):
+        # One per sensor, kept across sensor switches, so frames never allocate surfaces
+        surface = self._sensor_surfaces.get(self.index)
+        if surface is None:
+            surface = SensorSurface(self.hud.dim[0], self.hud.dim[1])
+            self._sensor_surfaces[self.index] = surface
+        return surface
 
     @staticmethod
     def _parse_image(weak_self, image):
         self = weak_self()
         if not self:
             return
+        surface = self._sensor_surface()
         if self.sensors[self.index][0].startswith('sensor.lidar'):
-            points = np.frombuffer(image.raw_data, dtype=np.dtype('f4'))
-            points = np.reshape(points, (int(points.shape[0] / 4), 4))
-            lidar_data = np.array(points[:, :2])
-            lidar_data *= min(self.hud.dim) / 100.0
-            lidar_data += (0.5 * self.hud.dim[0], 0.5 * self.hud.dim[1])
-            lidar_data = np.fabs(lidar_data)  # pylint: disable=assignment-from-no-return
-            lidar_data = lidar_data.astype(np.int32)
-            lidar_data = np.reshape(lidar_data, (-1, 2))
-            lidar_img_size = (self.hud.dim[0], self.hud.dim[1], 3)
-            lidar_img = np.zeros(lidar_img_size)
-            lidar_img[tuple(lidar_data.T)] = (255, 255, 255)
-            self.surface = pygame.surfarray.make_surface(lidar_img)
+            surface.draw_lidar(image.raw_data, min(self.hud.dim) / 100.0)
         else:
             image.convert(self.sensors[self.index][1])
-            array = np.frombuffer(image.raw_data, dtype=np.dtype("uint8"))
-            array = np.reshape(array, (image.height, image.width, 4))
-            array = array[:, :, :3]
-            array = array[:, :, ::-1]
-            self.surface = pygame.surfarray.make_surface(array.swapaxes(0, 1))
+            surface.draw_image(image.raw_data, image.width, image.height)
+        self.surface = surface
         if self.recording:
             image.save_to_disk('_out/%08d' % image.frame)
 
@@ -741,7 +752,7 @@ def game_loop(args):
 
         key = "vehicle/status/velocity_status"
         session = zenoh.open(zenoh.Config())
-        hud = HUD(args.width, args.height, session, key)
+        hud = HUD(args.width, args.height, session, key, args.legacy_topics)
         world = World(client.get_world(), hud, args)
         controller = KeyboardControl(world)
         if args.agent == "Basic":
@@ -868,6 +879,10 @@ def main():
         help='Set seed for repeating executions (default: None)',
         default=None,
         type=int)
+    argparser.add_argument(
+        '--legacy-topics',
+        action='store_true',
+        help='also publish the velocity topic, next to the packed vehicle state')
 
     args = argparser.parse_args()
 
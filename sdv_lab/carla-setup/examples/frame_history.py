@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+
+#
+#  Copyright (c) 2025 The X-Verse <https://github.com/The-Xverse>
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+# ==============================================================================
+# -- Imports -------------------------------------------------------------------
+# ==============================================================================
+
+import numpy as np
+
+
+# ==============================================================================
+# -- FrameHistory --------------------------------------------------------------
+# ==============================================================================
+
+class FrameHistory(object):
+    """
+    The last `capacity` events of a sensor, each a frame number, a value and
+    any extra `fields`, in a fixed-size NumPy ring: appending overwrites the
+    oldest event instead of shifting the others.
+
+    Alongside, the events' values are aggregated per frame (sum, count and
+    minimum) in a second ring indexed by frame number modulo `window`. Its
+    slots are reset when a newer frame claims them, so querying any span of
+    up to `window` recent frames reads just those slots, however many events
+    there are.
+    """
+
+    def __init__(self, capacity, fields=(), window=256):
+        self.capacity = int(capacity)
+        self.window = int(window)
+        self.dtype = np.dtype([('frame', np.int64), ('value', np.float64)] + list(fields))
+        self._events = np.zeros(self.capacity, dtype=self.dtype)
+        self._head = 0
+        self._count = 0
+        self._frames = np.full(self.window, -1, dtype=np.int64)
+        self._sums = np.zeros(self.window, dtype=np.float64)
+        self._counts = np.zeros(self.window, dtype=np.int64)
+        self._minimums = np.full(self.window, np.inf, dtype=np.float64)
+
+    def __len__(self):
+        return self._count
+
+    def append(self, frame, value, *fields):
+        self._events[self._head] = (frame, value) + fields
+        self._head = (self._head + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+
+        slot = frame % self.window
+        if self._frames[slot] != frame:
+            self._frames[slot] = frame
+            self._sums[slot] = 0.0
+            self._counts[slot] = 0
+            self._minimums[slot] = np.inf
+        self._sums[slot] += value
+        self._counts[slot] += 1
+        if value < self._minimums[slot]:
+            self._minimums[slot] = value
+
+    def events(self):
+        """The events, oldest first, as a structured array."""
+        if self._count < self.capacity:
+            return self._events[:self._count].copy()
+        return np.concatenate((self._events[self._head:], self._events[:self._head]))
+
+    def _slots(self, first_frame, frames):
+        if frames > self.window:
+            raise ValueError('cannot query %d frames, the window is %d' % (frames, self.window))
+        wanted = np.arange(first_frame, first_frame + frames, dtype=np.int64)
+        slots = wanted % self.window
+        return slots, self._frames[slots] == wanted
+
+    def sums(self, first_frame, frames):
+        """Sum of the values of each frame in [first_frame, first_frame + frames), 0 without events."""
+        slots, current = self._slots(first_frame, frames)
+        return np.where(current, self._sums[slots], 0.0)
+
+    def counts(self, first_frame, frames):
+        """Number of events of each frame in [first_frame, first_frame + frames)."""
+        slots, current = self._slots(first_frame, frames)
+        return np.where(current, self._counts[slots], 0)
+
+    def minimums(self, first_frame, frames):
+        """Smallest value of each frame in [first_frame, first_frame + frames), inf without events."""
+        slots, current = self._slots(first_frame, frames)
+        return np.where(current, self._minimums[slots], np.inf)
@@ -86,7 +86,6 @@ import carla
 from carla import ColorConverter as cc
 
 import argparse
-import collections
 import datetime
 import logging
 import math
@@ -146,6 +145,16 @@ try:
 except ImportError:
     raise RuntimeError('cannot import numpy, make sure numpy package is installed')
 
+try:
+    # Copied next to this script
+    from actor_registry import ActorRegistry
+    from frame_history import FrameHistory
+    from sample_envelope import pack_envelope
+    from sensor_surface import SensorSurface
+    from zenoh_vehicle import VehicleStatePublisher
+except ImportError as error:
+    raise RuntimeError('cannot import %s, copy it next to this script' % error.name)
+
 
 # ==============================================================================
 # -- Global functions ----------------------------------------------------------
@@ -213,6 +222,7 @@ class World(object):
         self.imu_sensor = None
         self.radar_sensor = None
         self.camera_manager = None
+        self.actor_registry = ActorRegistry(self.world)
         self._weather_presets = find_weather_presets()
         self._weather_index = 0
         self._actor_filter = args.filter
@@ -376,7 +386,7 @@ class World(object):
 
 class KeyboardControl(object):
     """Class that handles keyboard input."""
-    def __init__(self, world, start_in_autopilot, router):
+    def __init__(self, world, start_in_autopilot, router, legacy_topics=False):
         self._autopilot_enabled = start_in_autopilot
         self._ackermann_enabled = False
         self._ackermann_reverse = 1
@@ -408,6 +418,9 @@ class KeyboardControl(object):
         self._throttle_publisher = self._session.declare_publisher("vehicle/status/throttle_status")
         self._steering_publisher = self._session.declare_publisher("vehicle/status/steering_status")
         self._braking_publisher  = self._session.declare_publisher("vehicle/status/braking_status")
+        self._state_publisher = VehicleStatePublisher(self._session)
+        # Per-signal string topics, for consumers not reading the packed vehicle state yet
+        self._legacy_topics = legacy_topics
 
     def _engage_listener(self, sample):
         """
@@ -422,14 +435,20 @@ class KeyboardControl(object):
         except Exception as e:
             print(f"[ERROR] Engage processing failed: {e}")
 
-    def _publish_throttle(self, throttle: float):
-        self._throttle_publisher.put(f"{throttle}")
+    def _publish_throttle(self, throttle: float, envelope: bytes):
+        self._throttle_publisher.put(f"{throttle}", attachment=envelope)
+
+    def _publish_steering(self, steer: float, envelope: bytes):
+        self._steering_publisher.put(f"{steer}", attachment=envelope)
 
-    def _publish_steering(self, steer: float):
-        self._steering_publisher.put(f"{steer}")
+    def _publish_braking(self, brake: float, envelope: bytes):
+        self._braking_publisher.put(f"{brake}", attachment=envelope)
 
-    def _publish_braking(self, brake: float):
-        self._braking_publisher.put(f"{brake}")
+    def publish_state(self, world):
+        player = world.player
+        self._state_publisher.publish(
+            world.hud.frame, world.hud.simulation_time,
+            player.get_velocity(), player.get_control(), player.get_transform())
 
     def parse_events(self, client, world, clock, sync_mode):
         if isinstance(self._control, carla.VehicleControl):
@@ -439,6 +458,7 @@ class KeyboardControl(object):
                 self._throttle_publisher.undeclare()
                 self._steering_publisher.undeclare()
                 self._braking_publisher.undeclare()
+                self._state_publisher.undeclare()
                 self._session.close()
                 return True
             elif event.type == pygame.KEYUP:
@@ -611,7 +631,7 @@ class KeyboardControl(object):
 
         if not self._autopilot_enabled:
             if isinstance(self._control, carla.VehicleControl):
-                self._parse_vehicle_keys(pygame.key.get_pressed(), clock.get_time())
+                self._parse_vehicle_keys(pygame.key.get_pressed(), clock.get_time(), world)
                 self._control.reverse = self._control.gear < 0
                 # Set automatic control-related vehicle lights
                 if self._control.brake:
@@ -639,7 +659,7 @@ class KeyboardControl(object):
                 self._parse_walker_keys(pygame.key.get_pressed(), clock.get_time(), world)
                 world.player.apply_control(self._control)
 
-    def _parse_vehicle_keys(self, keys, milliseconds):
+    def _parse_vehicle_keys(self, keys, milliseconds, world):
         if keys[K_UP] or keys[K_w]:
             if not self._ackermann_enabled:
                 self._control.throttle = min(self._control.throttle + 0.1, 1.00)
@@ -679,9 +699,12 @@ class KeyboardControl(object):
         else:
             self._ackermann_control.steer = round(self._steer_cache, 1)
 
-        self._publish_throttle(self._control.throttle)
-        self._publish_steering(self._control.steer)
-        self._publish_braking(self._control.brake)
+        if self._legacy_topics:
+            # Stamped with the frame these inputs were read on, so subscribers can align them
+            envelope = pack_envelope(world.hud.frame, world.hud.simulation_time)
+            self._publish_throttle(self._control.throttle, envelope)
+            self._publish_steering(self._control.steer, envelope)
+            self._publish_braking(self._control.brake, envelope)
         # For debugging purposes, you can uncomment the following line
         # print(f"Throttle: {self._control.throttle}, Steer: {self._control.steer}, Brake: {self._control.brake}")
 
@@ -729,6 +752,13 @@ class HUD(object):
         self._show_info = True
         self._info_text = []
         self._server_clock = pygame.time.Clock()
+        self._info_surface = pygame.Surface((220, self.dim[1]))
+        self._info_surface.set_alpha(100)
+        # Rendered info lines by position, re-rendered only when their text changes
+        self._line_cache = []
+        # Fields that only change with the player, formatted once per player
+        self._player_id = None
+        self._player_text = []
 
         self._show_ackermann_info = False
         self._ackermann_control = carla.VehicleAckermannControl()
@@ -751,17 +781,14 @@ class HUD(object):
         heading += 'S' if 90.5 < compass < 269.5 else ''
         heading += 'E' if 0.5 < compass < 179.5 else ''
         heading += 'W' if 180.5 < compass < 359.5 else ''
-        colhist = world.collision_sensor.get_collision_history()
-        collision = [colhist[x + self.frame - 200] for x in range(0, 200)]
-        max_col = max(1.0, max(collision))
-        collision = [x / max_col for x in collision]
-        vehicles = world.world.get_actors().filter('vehicle.*')
+        collision = world.collision_sensor.get_collision_history(self.frame - 200, 200)
+        collision = (collision / max(1.0, collision.max())).tolist()
+        world.actor_registry.refresh()
         self._info_text = [
             'Server:  % 16.0f FPS' % self.server_fps,
             'Client:  % 16.0f FPS' % clock.get_fps(),
             '',
-            'Vehicle: % 20s' % get_actor_display_name(world.player, truncate=20),
-            'Map:     % 20s' % world.map.name.split('/')[-1],
+            *self._player_info(world),
             'Simulation time: % 12s' % datetime.timedelta(seconds=int(self.simulation_time)),
             '',
             'Speed:   % 15.0f km/h' % (3.6 * math.sqrt(v.x**2 + v.y**2 + v.z**2)),
@@ -796,14 +823,12 @@ class HUD(object):
             'Collision:',
             collision,
             '',
-            'Number of vehicles: % 8d' % len(vehicles)]
-        if len(vehicles) > 1:
+            'Number of vehicles: % 8d' % len(world.actor_registry)]
+        if len(world.actor_registry) > 1:
             self._info_text += ['Nearby vehicles:']
-            distance = lambda l: math.sqrt((l.x - t.location.x)**2 + (l.y - t.location.y)**2 + (l.z - t.location.z)**2)
-            vehicles = [(distance(x.get_location()), x) for x in vehicles if x.id != world.player.id]
-            for d, vehicle in sorted(vehicles, key=lambda vehicles: vehicles[0]):
-                if d > 200.0:
-                    break
+            # Only as many as there are lines left on screen
+            lines = max(0, (self.dim[1] - 4) // 18 - len(self._info_text))
+            for d, vehicle in world.actor_registry.nearest(t.location, lines, 200.0, world.player.id):
                 vehicle_type = get_actor_display_name(vehicle, truncate=22)
                 self._info_text.append('% 4dm %s' % (d, vehicle_type))
 
@@ -813,6 +838,23 @@ class HUD(object):
     def update_ackermann_control(self, ackermann_control):
         self._ackermann_control = ackermann_control
 
+    def _player_info(self, world):
+        if world.player.id != self._player_id:
+            self._player_id = world.player.id
+            self._player_text = [
+                'Vehicle: % 20s' % get_actor_display_name(world.player, truncate=20),
+                'Map:     % 20s' % world.map.name.split('/')[-1]]
+        return self._player_text
+
+    def _line_surface(self, line, text):
+        if line >= len(self._line_cache):
+            self._line_cache.extend([(None, None)] * (line + 1 - len(self._line_cache)))
+        cached_text, surface = self._line_cache[line]
+        if cached_text != text:
+            surface = self._font_mono.render(text, True, (255, 255, 255))
+            self._line_cache[line] = (text, surface)
+        return surface
+
     def toggle_info(self):
         self._show_info = not self._show_info
 
@@ -824,13 +866,11 @@ class HUD(object):
 
     def render(self, display):
         if self._show_info:
-            info_surface = pygame.Surface((220, self.dim[1]))
-            info_surface.set_alpha(100)
-            display.blit(info_surface, (0, 0))
+            display.blit(self._info_surface, (0, 0))
             v_offset = 4
             bar_h_offset = 100
             bar_width = 106
-            for item in self._info_text:
+            for line, item in enumerate(self._info_text):
                 if v_offset + 18 > self.dim[1]:
                     break
                 if isinstance(item, list):
@@ -854,8 +894,7 @@ class HUD(object):
                         pygame.draw.rect(display, (255, 255, 255), rect)
                     item = item[0]
                 if item:  # At this point has to be a str.
-                    surface = self._font_mono.render(item, True, (255, 255, 255))
-                    display.blit(surface, (8, v_offset))
+                    display.blit(self._line_surface(line, item), (8, v_offset))
                 v_offset += 18
         self._notifications.render(display)
         self.help.render(display)
@@ -928,7 +967,7 @@ class HelpText(object):
 class CollisionSensor(object):
     def __init__(self, parent_actor, hud):
         self.sensor = None
-        self.history = []
+        self.history = FrameHistory(4000)
         self._parent = parent_actor
         self.hud = hud
         world = self._parent.get_world()
@@ -939,11 +978,9 @@ class CollisionSensor(object):
         weak_self = weakref.ref(self)
         self.sensor.listen(lambda event: CollisionSensor._on_collision(weak_self, event))
 
-    def get_collision_history(self):
-        history = collections.defaultdict(int)
-        for frame, intensity in self.history:
-            history[frame] += intensity
-        return history
+    def get_collision_history(self, first_frame, frames):
+        # Summed collision intensity of each frame in the span
+        return self.history.sums(first_frame, frames)
 
     @staticmethod
     def _on_collision(weak_self, event):
@@ -954,9 +991,7 @@ class CollisionSensor(object):
         self.hud.notification('Collision with %r' % actor_type)
         impulse = event.normal_impulse
         intensity = math.sqrt(impulse.x**2 + impulse.y**2 + impulse.z**2)
-        self.history.append((event.frame, intensity))
-        if len(self.history) > 4000:
-            self.history.pop(0)
+        self.history.append(event.frame, intensity)
 
 
 # ==============================================================================
@@ -1063,8 +1098,21 @@ class IMUSensor(object):
 
 
 class RadarSensor(object):
-    def __init__(self, parent_actor):
+    """
+    Front radar. Every sweep is kept in `points`, one record per detection
+    with its world position, and optionally drawn in the world as dots
+    colored by velocity: white static, red approaching, blue receding.
+    """
+
+    # Layout of carla.RadarMeasurement.raw_data, one record per detection
+    RAW_DTYPE = np.dtype([('velocity', np.float32), ('azimuth', np.float32),
+                          ('altitude', np.float32), ('depth', np.float32)])
+    POINT_DTYPE = np.dtype(RAW_DTYPE.descr + [('x', np.float32), ('y', np.float32), ('z', np.float32)])
+
+    def __init__(self, parent_actor, draw=True):
         self.sensor = None
+        self.draw = draw
+        self.points = np.empty(0, dtype=self.POINT_DTYPE)
         self._parent = parent_actor
         bound_x = 0.5 + self._parent.bounding_box.extent.x
         bound_y = 0.5 + self._parent.bounding_box.extent.y
@@ -1092,33 +1140,38 @@ class RadarSensor(object):
         self = weak_self()
         if not self:
             return
-        # To get a numpy [[vel, altitude, azimuth, depth],...[,,,]]:
-        # points = np.frombuffer(radar_data.raw_data, dtype=np.dtype('f4'))
-        # points = np.reshape(points, (len(radar_data), 4))
-
-        current_rot = radar_data.transform.rotation
-        for detect in radar_data:
-            azi = math.degrees(detect.azimuth)
-            alt = math.degrees(detect.altitude)
-            # The 0.25 adjusts a bit the distance so the dots can
-            # be properly seen
-            fw_vec = carla.Vector3D(x=detect.depth - 0.25)
-            carla.Transform(
-                carla.Location(),
-                carla.Rotation(
-                    pitch=current_rot.pitch + alt,
-                    yaw=current_rot.yaw + azi,
-                    roll=current_rot.roll)).transform(fw_vec)
-
-            def clamp(min_v, max_v, value):
-                return max(min_v, min(value, max_v))
-
-            norm_velocity = detect.velocity / self.velocity_range # range [-1, 1]
-            r = int(clamp(0.0, 1.0, 1.0 - norm_velocity) * 255.0)
-            g = int(clamp(0.0, 1.0, 1.0 - abs(norm_velocity)) * 255.0)
-            b = int(abs(clamp(- 1.0, 0.0, - 1.0 - norm_velocity)) * 255.0)
+        raw = np.frombuffer(radar_data.raw_data, dtype=self.RAW_DTYPE)
+        transform = radar_data.transform
+        points = np.empty(raw.shape[0], dtype=self.POINT_DTYPE)
+        for name in self.RAW_DTYPE.names:
+            points[name] = raw[name]
+
+        # Forward vector of each detection's ray, scaled by its depth
+        pitch = np.radians(transform.rotation.pitch) + raw['altitude']
+        yaw = np.radians(transform.rotation.yaw) + raw['azimuth']
+        cos_pitch = np.cos(pitch)
+        points['x'] = transform.location.x + raw['depth'] * cos_pitch * np.cos(yaw)
+        points['y'] = transform.location.y + raw['depth'] * cos_pitch * np.sin(yaw)
+        points['z'] = transform.location.z + raw['depth'] * np.sin(pitch)
+        self.points = points
+        if self.draw:
+            self._draw(points, pitch, yaw)
+
+    def _draw(self, points, pitch, yaw):
+        # The 0.25 adjusts a bit the distance so the dots can
+        # be properly seen
+        shift = 0.25 * np.cos(pitch)
+        xs = (points['x'] - shift * np.cos(yaw)).tolist()
+        ys = (points['y'] - shift * np.sin(yaw)).tolist()
+        zs = (points['z'] - 0.25 * np.sin(pitch)).tolist()
+        norm_velocity = points['velocity'] / self.velocity_range  # range [-1, 1]
+        rs = (np.clip(1.0 - norm_velocity, 0.0, 1.0) * 255.0).astype(np.int32).tolist()
+        gs = (np.clip(1.0 - np.abs(norm_velocity), 0.0, 1.0) * 255.0).astype(np.int32).tolist()
+        bs = (np.abs(np.clip(-1.0 - norm_velocity, -1.0, 0.0)) * 255.0).astype(np.int32).tolist()
+        # CARLA's debug helper has no batch call, one draw per point is left
+        for x, y, z, r, g, b in zip(xs, ys, zs, rs, gs, bs):
             self.debug.draw_point(
-                radar_data.transform.location + fw_vec,
+                carla.Location(x, y, z),
                 size=0.075,
                 life_time=0.06,
                 persistent_lines=False,
@@ -1133,6 +1186,7 @@ class CameraManager(object):
     def __init__(self, parent_actor, hud, gamma_correction):
         self.sensor = None
         self.surface = None
+        self._sensor_surfaces = {}
         self._parent = parent_actor
         self.hud = hud
         self.recording = False
@@ -1232,49 +1286,34 @@ class CameraManager(object):
 
     def render(self, display):
         if self.surface is not None:
-            display.blit(self.surface, (0, 0))
+            self.surface.render(display)
+
+    def _sensor_surface(self):
+        # One per sensor, kept across sensor switches, so frames never allocate surfaces
+        surface = self._sensor_surfaces.get(self.index)
+        if surface is None:
+            surface = SensorSurface(self.hud.dim[0], self.hud.dim[1])
+            self._sensor_surfaces[self.index] = surface
+        return surface
 
     @staticmethod
     def _parse_image(weak_self, image):
         self = weak_self()
         if not self:
             return
+        surface = self._sensor_surface()
         if self.sensors[self.index][0].startswith('sensor.lidar'):
-            points = np.frombuffer(image.raw_data, dtype=np.dtype('f4'))
-            points = np.reshape(points, (int(points.shape[0] / 4), 4))
-            lidar_data = np.array(points[:, :2])
-            lidar_data *= min(self.hud.dim) / (2.0 * self.lidar_range)
-            lidar_data += (0.5 * self.hud.dim[0], 0.5 * self.hud.dim[1])
-            lidar_data = np.fabs(lidar_data)  # pylint: disable=E1111
-            lidar_data = lidar_data.astype(np.int32)
-            lidar_data = np.reshape(lidar_data, (-1, 2))
-            lidar_img_size = (self.hud.dim[0], self.hud.dim[1], 3)
-            lidar_img = np.zeros((lidar_img_size), dtype=np.uint8)
-            lidar_img[tuple(lidar_data.T)] = (255, 255, 255)
-            self.surface = pygame.surfarray.make_surface(lidar_img)
+            surface.draw_lidar(image.raw_data, min(self.hud.dim) / (2.0 * self.lidar_range))
         elif self.sensors[self.index][0].startswith('sensor.camera.dvs'):
-            # Example of converting the raw_data from a carla.DVSEventArray
-            # sensor into a NumPy array and using it as an image
-            dvs_events = np.frombuffer(image.raw_data, dtype=np.dtype([
-                ('x', np.uint16), ('y', np.uint16), ('t', np.int64), ('pol', np.bool)]))
-            dvs_img = np.zeros((image.height, image.width, 3), dtype=np.uint8)
-            # Blue is positive, red is negative
-            dvs_img[dvs_events[:]['y'], dvs_events[:]['x'], dvs_events[:]['pol'] * 2] = 255
-            self.surface = pygame.surfarray.make_surface(dvs_img.swapaxes(0, 1))
+            # A carla.DVSEventArray drawn as an image
+            surface.draw_dvs(image.raw_data)
         elif self.sensors[self.index][0].startswith('sensor.camera.optical_flow'):
             image = image.get_color_coded_flow()
-            array = np.frombuffer(image.raw_data, dtype=np.dtype("uint8"))
-            array = np.reshape(array, (image.height, image.width, 4))
-            array = array[:, :, :3]
-            array = array[:, :, ::-1]
-            self.surface = pygame.surfarray.make_surface(array.swapaxes(0, 1))
+            surface.draw_image(image.raw_data, image.width, image.height)
         else:
             image.convert(self.sensors[self.index][1])
-            array = np.frombuffer(image.raw_data, dtype=np.dtype("uint8"))
-            array = np.reshape(array, (image.height, image.width, 4))
-            array = array[:, :, :3]
-            array = array[:, :, ::-1]
-            self.surface = pygame.surfarray.make_surface(array.swapaxes(0, 1))
+            surface.draw_image(image.raw_data, image.width, image.height)
+        self.surface = surface
         if self.recording:
             image.save_to_disk('_out/%08d' % image.frame)
 
@@ -1318,7 +1357,7 @@ def game_loop(args):
 
         hud = HUD(args.width, args.height)
         world = World(sim_world, hud, args)
-        controller = KeyboardControl(world, args.autopilot, args.router)
+        controller = KeyboardControl(world, args.autopilot, args.router, args.legacy_topics)
 
         if args.sync:
             sim_world.tick()
@@ -1333,6 +1372,7 @@ def game_loop(args):
             if controller.parse_events(client, world, clock, args.sync):
                 return
             world.tick(clock)
+            controller.publish_state(world)
             world.render(display)
             pygame.display.flip()
 
@@ -1412,6 +1452,10 @@ def main():
         default='127.0.0.1',
         type=str,
         help='IP address of the Zenoh router (default: 127.0.0.1)')
+    argparser.add_argument(
+        '--legacy-topics',
+        action='store_true',
+        help='also publish the per-signal throttle, steering and braking topics, next to the packed vehicle state')
     args = argparser.parse_args()
 
     args.width, args.height = [int(x) for x in args.res.split('x')]
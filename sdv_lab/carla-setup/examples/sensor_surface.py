@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+
+#
+#  Copyright (c) 2025 The X-Verse <https://github.com/The-Xverse>
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+# ==============================================================================
+# -- Imports -------------------------------------------------------------------
+# ==============================================================================
+
+import sys
+import threading
+
+import numpy as np
+import pygame
+
+
+# ==============================================================================
+# -- SensorSurface -------------------------------------------------------------
+# ==============================================================================
+
+class SensorSurface(object):
+    """
+    A persistent pygame surface a sensor's frames are drawn into, with the
+    scratch buffers drawing needs allocated once and reused for every frame.
+
+    Camera frames are copied straight from CARLA's BGRA buffer: when the
+    surface stores its pixels as BGRX (the usual 32-bit format on little
+    endian hosts) the buffer is blitted as 32-bit words, otherwise through a
+    strided RGB view of it. Neither copies the frame on the way.
+
+    Frames are drawn on CARLA's sensor thread and the surface is blitted on
+    the main thread, so both hold `lock` while touching the surface.
+    """
+
+    DVS_DTYPE = np.dtype([('x', np.uint16), ('y', np.uint16), ('t', np.int64), ('pol', np.bool_)])
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.lock = threading.Lock()
+        self.surface = pygame.Surface((width, height), 0, 32)
+        self._direct = sys.byteorder == 'little' and self.surface.get_masks()[:3] == (0xFF0000, 0x00FF00, 0x0000FF)
+        # Mapped pixel values in surface (x, y) order, for lidar and DVS frames
+        self._pixels = np.zeros((width, height), dtype=np.uint32)
+        self._white = self.surface.map_rgb((255, 255, 255))
+        self._red = self.surface.map_rgb((255, 0, 0))
+        self._blue = self.surface.map_rgb((0, 0, 255))
+        # Lidar points projected to pixels, grown to the largest point cloud seen
+        self._points = np.empty((0, 2), dtype=np.float32)
+        self._indices = np.empty((0, 2), dtype=np.intp)
+
+    def draw_image(self, raw_data, width, height):
+        """Draws a raw BGRA camera frame."""
+        if (width, height) != (self.width, self.height):
+            raise ValueError('frame is %dx%d, surface is %dx%d' % (width, height, self.width, self.height))
+        if self._direct:
+            # One 32-bit word per pixel, transposed to (x, y) as a view
+            frame = np.frombuffer(raw_data, dtype=np.uint32).reshape((height, width)).T
+        else:
+            frame = np.frombuffer(raw_data, dtype=np.uint8).reshape((height, width, 4))[:, :, 2::-1].swapaxes(0, 1)
+        with self.lock:
+            pygame.surfarray.blit_array(self.surface, frame)
+
+    def draw_lidar(self, raw_data, scale):
+        """
+        Draws a lidar point cloud seen from above, `scale` pixels per meter,
+        centered on the surface.
+        """
+        points = np.frombuffer(raw_data, dtype=np.float32).reshape((-1, 4))
+        count = points.shape[0]
+        if count > self._points.shape[0]:
+            self._points = np.empty((count, 2), dtype=np.float32)
+            self._indices = np.empty((count, 2), dtype=np.intp)
+        projected = self._points[:count]
+        indices = self._indices[:count]
+        np.multiply(points[:, :2], scale, out=projected)
+        projected += (0.5 * self.width, 0.5 * self.height)
+        np.fabs(projected, out=projected)
+        np.copyto(indices, projected, casting='unsafe')
+        self._pixels.fill(0)
+        self._pixels[indices[:, 0], indices[:, 1]] = self._white
+        with self.lock:
+            pygame.surfarray.blit_array(self.surface, self._pixels)
+
+    def draw_dvs(self, raw_data):
+        """Draws a carla.DVSEventArray, positive events in blue and negative in red."""
+        events = np.frombuffer(raw_data, dtype=self.DVS_DTYPE)
+        positive = events['pol']
+        self._pixels.fill(0)
+        self._pixels[events['x'][positive], events['y'][positive]] = self._blue
+        negative = ~positive
+        self._pixels[events['x'][negative], events['y'][negative]] |= self._red
+        with self.lock:
+            pygame.surfarray.blit_array(self.surface, self._pixels)
+
+    def render(self, display, position=(0, 0)):
+        with self.lock:
+            display.blit(self.surface, position)
@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+
+#
+#  Copyright (c) 2025 The X-Verse <https://github.com/The-Xverse>
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+# ==============================================================================
+# -- Imports -------------------------------------------------------------------
+# ==============================================================================
+
+import json
+
+import zenoh
+
+# Copied next to this script from tide's contract package
+from semantic_frame_codec import encode_frame
+from semantic_frame_message import (
+    ENCODING_CLASS_PLANE, ENCODING_RAW, SEMANTIC_FRAMES_KEY, SemanticFrameHeader, pack_frame_header)
+
+
+# ==============================================================================
+# -- ZenohFramePublisher -------------------------------------------------------
+# ==============================================================================
+
+class ZenohFramePublisher(object):
+    """
+    Publishes raw camera frames over Zenoh. When the Zenoh build supports it,
+    frames are written straight into a Zenoh shared-memory buffer, so peers on
+    the same host receive them without the payload being copied or sent over
+    the network; otherwise the raw buffer is published as is.
+
+    With `encode` set, only the class plane is sent, compressed with
+    semantic_frame_codec, for subscribers on other hosts.
+    """
+
+    # Frames in flight before the oldest buffer has to be reclaimed
+    SHM_FRAMES = 4
+
+    def __init__(self, router: str, width: int, height: int, channels: int = 4,
+                 key: str = SEMANTIC_FRAMES_KEY, encode: bool = False):
+        self._encode = encode
+        self._width = width
+        self._height = height
+        self._channels = channels
+        self._frame_size = width * height * channels
+
+        # Session
+        zenoh_config = zenoh.Config()
+        zenoh_config.insert_json5("mode", json.dumps("peer"))
+        zenoh_config.insert_json5("connect/endpoints", json.dumps([f"tcp/{router}:7447"]))
+        zenoh_config.insert_json5("transport/shared_memory/enabled", json.dumps(True))
+        self._session = zenoh.open(zenoh_config)
+
+        # Publishers - a late frame is worthless, drop it rather than block the sensor thread
+        self._frame_publisher = self._session.declare_publisher(
+            key, congestion_control=zenoh.CongestionControl.DROP)
+
+        # Shared memory - encoded frames are small enough to send as they are
+        self._shm_provider = None
+        if encode:
+            return
+        try:
+            self._shm_provider = zenoh.shm.ShmProvider.default_backend(self._frame_size * self.SHM_FRAMES)
+        except AttributeError:
+            print("[WARN] Zenoh was built without shared memory support, publishing frames as regular payloads")
+
+    def _shm_payload(self, raw_data):
+        try:
+            # Reclaim buffers peers are done with instead of blocking on them
+            buffer = self._shm_provider.alloc(self._frame_size, policy=zenoh.shm.GarbageCollect())
+        except zenoh.ZError:
+            return None
+        memoryview(buffer)[:] = raw_data
+        return buffer
+
+    def write(self, raw_data, frame_id: int, timestamp: float, pose=None):
+        """
+        Publishes one frame; raw_data must hold width*height*channels bytes.
+        The frame header has no room for the sensor pose, so `pose` is not sent.
+        """
+        if len(raw_data) != self._frame_size:
+            raise ValueError(f"frame has {len(raw_data)} bytes, expected {self._frame_size}")
+        header = pack_frame_header(SemanticFrameHeader(
+            frame_id=frame_id,
+            timestamp=timestamp,
+            width=self._width,
+            height=self._height,
+            channels=self._channels,
+            encoding=ENCODING_CLASS_PLANE if self._encode else ENCODING_RAW,
+        ))
+        payload = None
+        if self._encode:
+            payload = encode_frame(raw_data, self._width, self._height, self._channels)
+        elif self._shm_provider is not None:
+            payload = self._shm_payload(raw_data)
+        if payload is None:
+            payload = bytes(raw_data)
+        self._frame_publisher.put(payload, attachment=header)
+
+    def close(self):
+        self._frame_publisher.undeclare()
+        self._session.close()
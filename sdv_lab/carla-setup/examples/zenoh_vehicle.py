@@ -20,9 +20,15 @@
 # -- Imports -------------------------------------------------------------------
 # ==============================================================================
 
+import math
+
 import zenoh
 import numpy as np
 
+# Copied next to this script from tide's contract package
+from sample_envelope import pack_envelope
+from vehicle_state_message import VEHICLE_STATE_KEY, VehicleState, pack_vehicle_state
+
 
 # ==============================================================================
 # -- CarlaUtils ----------------------------------------------------------------
@@ -51,6 +57,13 @@ class CarlaUtils(object):
         return np.fmax(np.fmin(brake, CarlaUtils.MAX_BRAKE), CarlaUtils.MIN_BRAKE)
 
 
+def _envelope(frame_id, sim_time):
+    """Sample envelope of a simulation frame, None (no attachment) when the frame isn't known"""
+    if frame_id is None:
+        return None
+    return pack_envelope(frame_id, sim_time)
+
+
 # ==============================================================================
 # -- ZenohVehicle --------------------------------------------------------------
 # ==============================================================================
@@ -100,10 +113,46 @@ class ZenohVehicle(object):
 
         return (self._throttle, self._brake)
 
-    def publish_brake(self, brake: float):
+    def publish_brake(self, brake: float, frame_id: int = None, sim_time: float = None):
         self._brake = brake
-        self._brake_publisher.put(f"{self._brake}")
+        self._brake_publisher.put(f"{self._brake}", attachment=_envelope(frame_id, sim_time))
 
-    def publish_speed(self, speed: float):
+    def publish_speed(self, speed: float, frame_id: int = None, sim_time: float = None):
         self._speed = speed
-        self._speed_publisher.put(f"{self._speed}")
+        self._speed_publisher.put(f"{self._speed}", attachment=_envelope(frame_id, sim_time))
+
+
+# ==============================================================================
+# -- VehicleStatePublisher -----------------------------------------------------
+# ==============================================================================
+
+class VehicleStatePublisher(object):
+    """
+    Publishes the ego vehicle's speed, driver inputs and pose of a simulation
+    frame as one packed record (see contract/vehicle_state_message.py), one
+    put per tick instead of one stringified float per signal. The record is
+    also stamped with the frame's sample envelope, like the string topics.
+    """
+
+    def __init__(self, session, key: str = VEHICLE_STATE_KEY):
+        self._publisher = session.declare_publisher(key)
+
+    def publish(self, frame_id: int, sim_time: float, velocity, control, transform):
+        # Walkers have no throttle, steer or brake
+        state = VehicleState(
+            frame_id=frame_id,
+            sim_time=sim_time,
+            speed=3.6 * math.sqrt(velocity.x**2 + velocity.y**2 + velocity.z**2),
+            throttle=getattr(control, 'throttle', 0.0),
+            steer=getattr(control, 'steer', 0.0),
+            brake=getattr(control, 'brake', 0.0),
+            x=transform.location.x,
+            y=transform.location.y,
+            z=transform.location.z,
+            pitch=transform.rotation.pitch,
+            yaw=transform.rotation.yaw,
+            roll=transform.rotation.roll)
+        self._publisher.put(pack_vehicle_state(state), attachment=pack_envelope(frame_id, sim_time))
+
+    def undeclare(self):
+        self._publisher.undeclare()
@@ -0,0 +1,96 @@
+# Fixed-Rate Control Loop
+import math
+import threading
+import time
+
+
+class FixedRateLoop:
+    """
+    Runs a step function on its own thread at a fixed rate.
+
+    Deadlines are multiples of the period from the loop start on the
+    monotonic clock, so sleeping and step time don't make the loop drift.
+    When a step overruns past later deadlines, those deadlines are counted
+    as missed and skipped instead of being caught up in a burst. The wake-up
+    lateness against each deadline is kept as jitter statistics.
+    """
+
+    def __init__(self, rate, step, name="control-loop"):
+        """
+        Initialize the loop.
+
+        Args:
+            rate (float): Loop rate in Hz
+            step (callable): Called with the deadline (monotonic seconds) of each tick
+            name (str): Thread name
+        """
+        if rate <= 0.0:
+            raise ValueError("rate must be positive and higher than 0.")
+        self.period = 1.0 / rate
+        self.step = step
+
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+
+        self.ticks = 0
+        self.misses = 0
+        self._jitter_sum = 0.0
+        self._jitter_sum_sq = 0.0
+        self._jitter_max = 0.0
+
+    def start(self):
+        """Start the loop thread."""
+        self._thread.start()
+
+    def stop(self):
+        """Stop the loop thread and wait for the current tick to finish."""
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def _run(self):
+        start = time.monotonic()
+        tick = 0
+        while True:
+            deadline = start + tick * self.period
+            delay = deadline - time.monotonic()
+            if delay > 0.0 and self._stop.wait(delay):
+                return
+            if self._stop.is_set():
+                return
+
+            lateness = time.monotonic() - deadline
+            self.ticks += 1
+            self._jitter_sum += lateness
+            self._jitter_sum_sq += lateness * lateness
+            self._jitter_max = max(self._jitter_max, lateness)
+
+            try:
+                self.step(deadline)
+            except Exception as e:
+                print(f"[ERROR] Control step failed: {e}")
+
+            # Next deadline still ahead; the ones already passed are missed
+            next_tick = math.floor((time.monotonic() - start) / self.period) + 1
+            self.misses += max(0, next_tick - tick - 1)
+            tick = max(tick + 1, next_tick)
+
+    def stats(self):
+        """
+        Report deadline misses and wake-up jitter.
+
+        Returns:
+            dict: Ticks run, deadlines missed, and mean, standard deviation and
+            maximum lateness against the deadline in milliseconds
+        """
+        ticks = max(1, self.ticks)
+        mean = self._jitter_sum / ticks
+        variance = max(0.0, self._jitter_sum_sq / ticks - mean * mean)
+        return {
+            'rate_hz': 1.0 / self.period,
+            'ticks': self.ticks,
+            'misses': self.misses,
+            'jitter_mean_ms': mean * 1e3,
+            'jitter_std_ms': math.sqrt(variance) * 1e3,
+            'jitter_max_ms': self._jitter_max * 1e3
+        }
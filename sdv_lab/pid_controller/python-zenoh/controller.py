@@ -3,9 +3,22 @@ class PIDController:
     """
     PIDController implements a Proportional-Integral-Derivative controller to compute
     the control output (acceleration) based on error terms.
+
+    Optional modes, all off by default (the classical PID):
+
+    - Anti-windup: 'clamp' bounds the integral term to `integral_limit`;
+      'back-calculation' bleeds the integral off while the output is
+      limited, with time constant `tracking_time` (needs `output_limits`)
+    - Derivative filter: first-order low-pass on the derivative term with
+      time constant `derivative_filter`
+    - Output limits: clamp the output to (low, high)
+    - Rate limit: bound the output change to `rate_limit` per second
     """
 
-    def __init__(self, kp, ki, kd):
+    ANTI_WINDUP_MODES = ('none', 'clamp', 'back-calculation')
+
+    def __init__(self, kp, ki, kd, anti_windup='none', integral_limit=None, tracking_time=None,
+                 derivative_filter=None, output_limits=None, rate_limit=None):
         """
         Initialize the PID controller with specified gain values.
 
@@ -13,15 +26,42 @@ class PIDController:
             kp (float): Proportional gain
             ki (float): Integral gain
             kd (float): Derivative gain
+            anti_windup (str): One of ANTI_WINDUP_MODES
+            integral_limit (float, optional): Bound of the integral term for 'clamp'
+            tracking_time (float, optional): Back-calculation time constant (s), sqrt(Kd/Ki) or 1 s by default
+            derivative_filter (float, optional): Derivative low-pass time constant (s)
+            output_limits (tuple, optional): (low, high) bounds of the output
+            rate_limit (float, optional): Largest output change per second
+
+        Raises:
+            ValueError: If a mode is unknown or misses its parameter
         """
+        if anti_windup not in self.ANTI_WINDUP_MODES:
+            raise ValueError(f"anti_windup must be one of {self.ANTI_WINDUP_MODES}.")
+        if anti_windup == 'clamp' and integral_limit is None:
+            raise ValueError("'clamp' anti-windup needs an integral_limit.")
+        if anti_windup == 'back-calculation' and output_limits is None:
+            raise ValueError("'back-calculation' anti-windup needs output_limits.")
+
         self.kp = kp
         self.ki = ki
         self.kd = kd
 
+        self.anti_windup = anti_windup
+        self.integral_limit = integral_limit
+        if tracking_time is None:
+            tracking_time = (kd / ki) ** 0.5 if ki > 0.0 and kd > 0.0 else 1.0
+        self.tracking_time = tracking_time
+        self.derivative_filter = derivative_filter
+        self.output_limits = output_limits
+        self.rate_limit = rate_limit
+
         self.velocity_error = 0.0
         self.previous_error = 0.0
         self.accumulated_error = 0.0
         self.previous_time = 0.0
+        self.derivative_error = 0.0
+        self.previous_output = 0.0
 
 
     def compute(self, desired_velocity, current_velocity, current_time):
@@ -41,6 +81,7 @@ class PIDController:
         """
         if self.previous_time == 0.0:
             self.previous_time = current_time
+            self.previous_output = 0.0
             return 0.0
 
         delta_time = current_time - self.previous_time
@@ -53,14 +94,38 @@ class PIDController:
         self.previous_error = self.velocity_error
         self.velocity_error = desired_velocity - current_velocity
         self.accumulated_error = self.accumulated_error + (self.velocity_error * delta_time)
-        self.derivative_error = (self.velocity_error - self.previous_error) / delta_time
+        derivative_error = (self.velocity_error - self.previous_error) / delta_time
+        if self.derivative_filter:
+            # First-order low-pass: noisy velocity doesn't reach the output through the derivative
+            derivative_error = self.derivative_error + (derivative_error - self.derivative_error) * (
+                delta_time / (self.derivative_filter + delta_time))
+        self.derivative_error = derivative_error
+
+        # Anti-windup: clamping
+        if self.anti_windup == 'clamp' and self.ki > 0.0:
+            bound = self.integral_limit / self.ki
+            self.accumulated_error = min(max(self.accumulated_error, -bound), bound)
+
         acceleration = (
             (self.kp * self.velocity_error) +
             (self.ki * self.accumulated_error) +
             (self.kd * self.derivative_error)
         )
 
-        return acceleration
+        # Output and rate limits
+        limited = acceleration
+        if self.output_limits is not None:
+            limited = min(max(limited, self.output_limits[0]), self.output_limits[1])
+        if self.rate_limit is not None:
+            step = self.rate_limit * delta_time
+            limited = min(max(limited, self.previous_output - step), self.previous_output + step)
+
+        # Anti-windup: back-calculation, the integral tracks the limited output
+        if self.anti_windup == 'back-calculation' and self.ki > 0.0:
+            self.accumulated_error += (limited - acceleration) / (self.ki * self.tracking_time) * delta_time
+
+        self.previous_output = limited
+        return limited
 
     # ------------------------------------------------------------------
     # Reset internal state so the controller restarts after 
@@ -73,3 +138,79 @@ class PIDController:
         self.previous_error    = 0.0
         self.accumulated_error = 0.0
         self.previous_time     = 0.0
+        self.derivative_error  = 0.0
+        self.previous_output   = 0.0
+
+
+def add_mode_arguments(parser):
+    """
+    Add the command-line options of the controller modes.
+
+    Args:
+        parser (argparse.ArgumentParser): Parser to add them to
+    """
+    parser.add_argument(
+        '--anti-windup',
+        choices=PIDController.ANTI_WINDUP_MODES,
+        default='none',
+        help="integrator anti-windup: clamp (needs --integral-limit) or back-calculation (needs --output-limit)")
+    parser.add_argument(
+        '--integral-limit',
+        type=float,
+        default=None,
+        help="bound of the integral term for --anti-windup clamp")
+    parser.add_argument(
+        '--derivative-filter',
+        metavar='TAU',
+        type=float,
+        default=None,
+        help="low-pass the derivative term with this time constant in seconds (e.g. 0.2)")
+    parser.add_argument(
+        '--output-limit',
+        type=float,
+        default=None,
+        help="clamp the output to [-limit, limit] (e.g. 1.0, the actuation range)")
+    parser.add_argument(
+        '--rate-limit',
+        type=float,
+        default=None,
+        help="largest output change per second (e.g. 2.0)")
+
+
+def controller_from_args(parser, args, kp, ki, kd):
+    """
+    Build a PIDController from the options of add_mode_arguments. Invalid
+    combinations are reported through the parser, which exits.
+
+    Args:
+        parser (argparse.ArgumentParser): Parser the options were added to
+        args (argparse.Namespace): Parsed options
+        kp (float): Proportional gain
+        ki (float): Integral gain
+        kd (float): Derivative gain
+
+    Returns:
+        PIDController: Controller with the requested modes
+    """
+    if args.anti_windup == 'clamp' and args.integral_limit is None:
+        parser.error("--anti-windup clamp needs --integral-limit")
+    if args.anti_windup == 'back-calculation' and args.output_limit is None:
+        parser.error("--anti-windup back-calculation needs --output-limit")
+    if args.integral_limit is not None and args.anti_windup != 'clamp':
+        parser.error("--integral-limit only applies to --anti-windup clamp")
+    for option, value in (('--integral-limit', args.integral_limit), ('--output-limit', args.output_limit),
+                          ('--rate-limit', args.rate_limit), ('--derivative-filter', args.derivative_filter)):
+        if value is not None and value <= 0.0:
+            parser.error(f"{option} must be positive")
+
+    try:
+        return PIDController(
+            kp=kp, ki=ki, kd=kd,
+            anti_windup=args.anti_windup,
+            integral_limit=args.integral_limit,
+            derivative_filter=args.derivative_filter,
+            output_limits=None if args.output_limit is None else (-args.output_limit, args.output_limit),
+            rate_limit=args.rate_limit
+        )
+    except ValueError as e:
+        parser.error(str(e))
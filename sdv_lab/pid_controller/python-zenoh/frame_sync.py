@@ -0,0 +1,65 @@
+# Frame Ordering
+class FrameGate:
+    """
+    Passes enveloped samples of one input in simulation frame order.
+
+    Only the velocity samples of the CARLA clients carry an envelope, so
+    there is nothing to align them with; the gate makes sure each frame
+    reaches the controller once and in order. A sample of a frame at or
+    before the last passed one, by at most `max_late_frames`, is late and
+    dropped.
+
+    A frame further back than that, or a simulation time going backwards,
+    means the simulator restarted: the gate forgets the old session and
+    passes the sample as the first of a new one, instead of dropping every
+    sample of the new session as late.
+    """
+
+    def __init__(self, max_late_frames=32):
+        """
+        Initialize the gate.
+
+        Args:
+            max_late_frames (int): Largest backwards frame jump still taken as a late sample
+        """
+        self.max_late_frames = max_late_frames
+        self.last_frame = None
+        self.last_sim_time = None
+
+        self.passed = 0
+        self.late = 0
+        self.restarts = 0
+
+    def accept(self, frame, sim_time):
+        """
+        Check one sample's envelope.
+
+        Args:
+            frame (int): Simulation frame from the sample envelope
+            sim_time (float): Simulation time from the sample envelope
+
+        Returns:
+            str: 'pass' for the next frame of the session, 'restart' for the
+            first frame of a new session, 'late' for a sample to drop
+        """
+        result = 'pass'
+        if self.last_frame is not None:
+            if frame < self.last_frame - self.max_late_frames or (frame > self.last_frame and sim_time < self.last_sim_time):
+                self.reset()
+                self.restarts += 1
+                result = 'restart'
+            elif frame <= self.last_frame:
+                self.late += 1
+                return 'late'
+
+        self.last_frame = frame
+        self.last_sim_time = sim_time
+        self.passed += 1
+        return result
+
+    def reset(self):
+        """
+        Start passing from any frame again, e.g. when the control is re-engaged.
+        """
+        self.last_frame = None
+        self.last_sim_time = None
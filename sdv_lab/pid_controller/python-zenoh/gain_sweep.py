@@ -0,0 +1,249 @@
+# Offline Gain Sweep
+import argparse
+import itertools
+import os
+import time
+
+import numpy as np
+
+
+class LongitudinalModel:
+    """
+    Point-mass longitudinal vehicle model driven by the PID actuation.
+
+    The actuation is split like ZenohVehicle.get_actuation: positive values
+    are throttle, negative ones brake, both clamped to [0, 1]. The applied
+    actuation follows the command with a first-order lag. Aerodynamic drag
+    and rolling resistance slow the vehicle; it never rolls backwards.
+    """
+
+    def __init__(self, max_accel=3.5, max_brake=8.0, drag=0.0004, rolling=0.15, lag=0.2):
+        """
+        Initialize the model.
+
+        Args:
+            max_accel (float): Acceleration at full throttle (m/s²)
+            max_brake (float): Deceleration at full brake (m/s²)
+            drag (float): Aerodynamic drag coefficient (1/m), times speed squared
+            rolling (float): Rolling resistance deceleration (m/s²)
+            lag (float): Actuator time constant (s), 0 for none
+        """
+        self.max_accel = max_accel
+        self.max_brake = max_brake
+        self.drag = drag
+        self.rolling = rolling
+        self.lag = lag
+
+    def step(self, velocity, applied, actuation, delta_time):
+        """
+        Advance all candidates by one step, in place.
+
+        Args:
+            velocity (numpy.ndarray): Speed of each candidate (km/h)
+            applied (numpy.ndarray): Actuation currently applied by each candidate
+            actuation (numpy.ndarray): Actuation commanded by each candidate
+            delta_time (float): Step length (s)
+        """
+        if self.lag > 0.0:
+            applied += (actuation - applied) * min(1.0, delta_time / self.lag)
+        else:
+            applied[:] = actuation
+        throttle = np.clip(applied, 0.0, 1.0)
+        brake = np.clip(-applied, 0.0, 1.0)
+
+        speed = velocity / 3.6
+        accel = throttle * self.max_accel - brake * self.max_brake - self.drag * speed * speed
+        accel -= np.where(speed > 0.0, self.rolling, 0.0)
+        np.maximum(speed + accel * delta_time, 0.0, out=speed)
+        velocity[:] = speed * 3.6
+
+
+def sweep(kp, ki, kd, times, targets, model, initial_velocity=0.0, settle_fraction=0.1):
+    """
+    Run the PID of PIDController.compute for many gain candidates at once,
+    in closed loop with the model, and measure each step response.
+
+    The control law matches PIDController step by step (the first call only
+    starts the clock and returns 0), so the best gains here can go straight
+    into main.py. Metrics are accumulated while stepping, so memory doesn't
+    grow with the horizon.
+
+    Args:
+        kp (numpy.ndarray): Proportional gain of each candidate
+        ki (numpy.ndarray): Integral gain of each candidate
+        kd (numpy.ndarray): Derivative gain of each candidate
+        times (numpy.ndarray): Controller time of each step (s), increasing
+        targets (numpy.ndarray): Desired velocity at each step (km/h)
+        model (LongitudinalModel): Vehicle model
+        initial_velocity (float): Speed at the first step (km/h)
+        settle_fraction (float): Final fraction of the horizon the steady-state error is measured over
+
+    Returns:
+        dict: Per-candidate arrays: 'rise_time' (s from 10% to 90% of the way
+        from the initial velocity to the final target, NaN if not reached),
+        'overshoot' (% of that span), 'steady_state_error' (mean absolute
+        error over the final fraction, km/h), 'iae' (integrated absolute
+        error, km/h·s) and 'final_velocity' (km/h)
+    """
+    n = kp.shape[0]
+    velocity = np.full(n, float(initial_velocity))
+    applied = np.zeros(n)
+    velocity_error = np.zeros(n)
+    accumulated_error = np.zeros(n)
+
+    final_target = float(targets[-1])
+    span = final_target - initial_velocity
+    direction = 1.0 if span >= 0.0 else -1.0
+    low = initial_velocity + 0.1 * span
+    high = initial_velocity + 0.9 * span
+    time_low = np.full(n, np.nan)
+    time_high = np.full(n, np.nan)
+    peak = velocity.copy()
+
+    settle_start = times[0] + (times[-1] - times[0]) * (1.0 - settle_fraction)
+    settle_error = np.zeros(n)
+    settle_time = 0.0
+    iae = np.zeros(n)
+
+    actuation = np.zeros(n)
+    for step in range(1, len(times)):
+        delta_time = float(times[step] - times[step - 1])
+        if delta_time <= 0.0:
+            raise ValueError("delta_time must be positive and higher than 0.")
+
+        # The model moves over the step with the actuation computed at its start
+        model.step(velocity, applied, actuation, delta_time)
+
+        # PID Calculations, as PIDController.compute
+        previous_error = velocity_error
+        velocity_error = targets[step] - velocity
+        accumulated_error += velocity_error * delta_time
+        derivative_error = (velocity_error - previous_error) / delta_time
+        actuation = kp * velocity_error + ki * accumulated_error + kd * derivative_error
+
+        # Metrics
+        progress = direction * velocity
+        time_low[np.isnan(time_low) & (progress >= direction * low)] = times[step]
+        time_high[np.isnan(time_high) & (progress >= direction * high)] = times[step]
+        np.maximum(peak, progress, out=peak)
+        iae += np.abs(velocity_error) * delta_time
+        if times[step] >= settle_start:
+            settle_error += np.abs(final_target - velocity) * delta_time
+            settle_time += delta_time
+
+    overshoot = np.maximum(peak - direction * final_target, 0.0)
+    return {
+        'rise_time': time_high - time_low,
+        'overshoot': 100.0 * overshoot / abs(span) if span else overshoot,
+        'steady_state_error': settle_error / settle_time if settle_time else np.abs(final_target - velocity),
+        'iae': iae,
+        'final_velocity': velocity
+    }
+
+
+def step_profile(target, duration, rate, step_time=1.0):
+    """
+    Times and targets of a step from standstill to a set speed.
+
+    Args:
+        target (float): Set speed after the step (km/h)
+        duration (float): Horizon (s)
+        rate (float): Control rate (Hz)
+        step_time (float): Time of the step (s)
+
+    Returns:
+        tuple: (times, targets) arrays
+    """
+    times = np.arange(0.0, duration, 1.0 / rate) + 1.0 / rate
+    targets = np.where(times >= step_time, target, 0.0)
+    return times, targets
+
+
+def load_trace(directory):
+    """
+    Times, targets and initial velocity of a recorded run, from the .log files
+    ZenohHandler.store_results writes.
+
+    Args:
+        directory (str): Directory holding current_time.log, desired_velocity.log and current_velocity.log
+
+    Returns:
+        tuple: (times, targets, initial velocity)
+    """
+    def column(name):
+        return np.loadtxt(os.path.join(directory, f"{name}.log"), ndmin=1)
+
+    times = column('current_time')
+    targets = column('desired_velocity')
+    velocities = column('current_velocity')
+    # Drop repeated timestamps, which the controller would reject
+    keep = np.concatenate(([True], np.diff(times) > 0.0))
+    return times[keep], targets[keep], float(velocities[0])
+
+
+def parse_range(spec):
+    """
+    Gain values from 'start:stop:count' (inclusive linspace) or a single value.
+
+    Args:
+        spec (str): Range specification
+
+    Returns:
+        numpy.ndarray: Values
+    """
+    parts = spec.split(':')
+    if len(parts) == 1:
+        return np.array([float(parts[0])])
+    if len(parts) != 3:
+        raise argparse.ArgumentTypeError(f"expected start:stop:count or a value, got '{spec}'")
+    return np.linspace(float(parts[0]), float(parts[1]), int(parts[2]))
+
+
+def main():
+    """
+    Sweep a grid of PID gains offline and print the best candidates.
+    """
+    parser = argparse.ArgumentParser(description="Offline PID gain sweep")
+    parser.add_argument('--kp', type=parse_range, default=parse_range('0.02:0.5:20'), help="start:stop:count or value")
+    parser.add_argument('--ki', type=parse_range, default=parse_range('0:0.1:20'), help="start:stop:count or value")
+    parser.add_argument('--kd', type=parse_range, default=parse_range('0:0.05:10'), help="start:stop:count or value")
+    parser.add_argument('--target', type=float, default=70.0, help="step target speed (km/h)")
+    parser.add_argument('--duration', type=float, default=60.0, help="step horizon (s)")
+    parser.add_argument('--rate', type=float, default=20.0, help="control rate (Hz), CARLA's 0.05 s tick by default")
+    parser.add_argument('--trace', metavar='DIR', default=None,
+                        help="follow the target profile of a recorded run (its .log files) instead of a step")
+    parser.add_argument('--max-overshoot', type=float, default=None, help="leave out candidates overshooting more (%%)")
+    parser.add_argument('--sort', choices=('iae', 'rise_time', 'overshoot', 'steady_state_error'), default='iae')
+    parser.add_argument('--top', type=int, default=10, help="candidates to print")
+    args = parser.parse_args()
+
+    if args.trace:
+        times, targets, initial_velocity = load_trace(args.trace)
+    else:
+        times, targets = step_profile(args.target, args.duration, args.rate)
+        initial_velocity = 0.0
+
+    # main.py's gains first, for reference
+    Kp = 0.125
+    grid = [(Kp, Kp / 8, Kp / 10)] + list(itertools.product(args.kp, args.ki, args.kd))
+    kp, ki, kd = (np.array(gains) for gains in zip(*grid))
+
+    start = time.perf_counter()
+    metrics = sweep(kp, ki, kd, times, targets, LongitudinalModel(), initial_velocity)
+    elapsed = time.perf_counter() - start
+    print(f"{len(kp) - 1} candidates x {len(times)} steps in {elapsed:.2f} s")
+
+    candidates = np.arange(1, len(kp))
+    if args.max_overshoot is not None:
+        candidates = candidates[metrics['overshoot'][candidates] <= args.max_overshoot]
+    key = metrics[args.sort][candidates]
+    candidates = candidates[np.argsort(np.where(np.isnan(key), np.inf, key), kind='stable')][:args.top]
+
+    print(f"{'':>9} {'Kp':>8} {'Ki':>8} {'Kd':>8} {'rise s':>8} {'overshoot %':>12} {'ss error':>9} {'IAE':>9}")
+    for label, i in [("main.py", 0)] + [(f"#{rank + 1}", i) for rank, i in enumerate(candidates)]:
+        print(f"{label:>9} {kp[i]:>8.4f} {ki[i]:>8.4f} {kd[i]:>8.4f} {metrics['rise_time'][i]:>8.2f} "
+              f"{metrics['overshoot'][i]:>12.2f} {metrics['steady_state_error'][i]:>9.3f} {metrics['iae'][i]:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
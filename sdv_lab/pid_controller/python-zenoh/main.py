@@ -1,5 +1,5 @@
-import zenoh, time
-from controller import PIDController
+import zenoh, time, argparse
+from controller import add_mode_arguments, controller_from_args
 from zenoh_handler import ZenohHandler
 
 def main():
@@ -7,6 +7,42 @@ def main():
     Main entry point for the PID control system.
     Sets up PID controller, Zenoh session and starts event loop.
     """
+    parser = argparse.ArgumentParser(description="PID controller over Zenoh")
+    parser.add_argument(
+        '--rate',
+        type=float,
+        default=None,
+        help="run the control law on its own thread at this rate in Hz (e.g. 100) "
+             "instead of on every velocity sample")
+    parser.add_argument(
+        '--quiet',
+        dest='verbose',
+        action='store_false',
+        help="don't print every received sample and published acceleration")
+    parser.add_argument(
+        '--legacy-topics',
+        action='store_true',
+        help="read the current velocity from the velocity_status and clock_status string topics "
+             "(Rust bridge, z_put) instead of the packed vehicle state")
+    # A file recording is already bounded in memory
+    recording = parser.add_mutually_exclusive_group()
+    recording.add_argument(
+        '--record',
+        metavar='FILE',
+        default=None,
+        help="flush results to FILE while running (CSV if it ends in .csv, raw float64 rows otherwise) "
+             "instead of keeping them in memory")
+    recording.add_argument(
+        '--record-capacity',
+        metavar='N',
+        type=int,
+        default=None,
+        help="keep only the newest N results in memory")
+    add_mode_arguments(parser)
+    args = parser.parse_args()
+    if args.rate is not None and args.rate <= 0:
+        parser.error("--rate must be positive")
+
     # Fine-tuning
     Kp = 0.125
     Ki = Kp / 8
@@ -14,7 +50,7 @@ def main():
     print(f"PID => Kp={Kp}, Ki={Ki}, Kd={Kd}")
 
     # Create PID controller with tuning parameters
-    pid = PIDController(kp=Kp, ki=Ki, kd=Kd)
+    pid = controller_from_args(parser, args, Kp, Ki, Kd)
 
     # Create Zenoh session
     config = zenoh.Config()
@@ -28,7 +64,12 @@ def main():
         sub_current='vehicle/status/velocity_status',
         sub_desired='adas/cruise_control/target_speed',
 		sub_enable='adas/cruise_control/engage',
-        pub_acc='control/command/actuation_cmd'
+        sub_state=None if args.legacy_topics else 'vehicle/status/vehicle_state',
+        pub_acc='control/command/actuation_cmd',
+        rate=args.rate,
+        verbose=args.verbose,
+        record_path=args.record,
+        record_capacity=args.record_capacity
     )
 
     handler.start()
@@ -41,6 +82,13 @@ def main():
     except KeyboardInterrupt:
         print("KeyboardInterrupt")
     finally:
+        handler.stop()
+        if args.rate:
+            stats = handler.loop_stats()
+            print(f"Control loop: {stats['ticks']} ticks at {stats['rate_hz']:g} Hz, "
+                  f"{stats['misses']} deadlines missed, {stats['stale']} skipped on stale input, "
+                  f"jitter mean {stats['jitter_mean_ms']:.3f} ms, "
+                  f"std {stats['jitter_std_ms']:.3f} ms, max {stats['jitter_max_ms']:.3f} ms")
         handler.store_results()
         handler.show_results()
         session.close()
@@ -0,0 +1,128 @@
+# PID Modes Benchmark
+import argparse
+
+import numpy as np
+
+from controller import PIDController
+from gain_sweep import LongitudinalModel
+
+
+def run(controller, times, targets, noise, seed, model):
+    """
+    Drive the model in closed loop with one controller, measuring the
+    velocity with Gaussian noise.
+
+    Args:
+        controller (PIDController): Controller under test
+        times (numpy.ndarray): Controller time of each step (s)
+        targets (numpy.ndarray): Desired velocity at each step (km/h)
+        noise (float): Standard deviation of the velocity measurement noise (km/h)
+        seed (int): Noise seed, the same for every controller
+        model (LongitudinalModel): Vehicle model
+
+    Returns:
+        tuple: (true velocity, actuation) arrays, one value per step
+    """
+    rng = np.random.default_rng(seed)
+    measurement_noise = rng.normal(0.0, noise, len(times))
+    velocity = np.zeros(1)
+    applied = np.zeros(1)
+    velocities = np.empty(len(times))
+    actuations = np.empty(len(times))
+    actuation = 0.0
+    for step, current_time in enumerate(times):
+        if step:
+            model.step(velocity, applied, np.array([actuation]), times[step] - times[step - 1])
+        actuation = controller.compute(targets[step], velocity[0] + measurement_noise[step], current_time)
+        velocities[step] = velocity[0]
+        actuations[step] = actuation
+    return velocities, actuations
+
+
+def settling_times(times, targets, velocities, band):
+    """
+    Time from each target change until the velocity stays within the band
+    around the target, up to the next change.
+
+    Args:
+        times (numpy.ndarray): Step times (s)
+        targets (numpy.ndarray): Desired velocity at each step (km/h)
+        velocities (numpy.ndarray): True velocity at each step (km/h)
+        band (float): Settling band around the target (km/h)
+
+    Returns:
+        list: Settling time of each target change (s), NaN if it never settles
+    """
+    changes = np.flatnonzero(np.diff(targets)) + 1
+    ends = list(changes[1:]) + [len(times)]
+    result = []
+    for start, end in zip(changes, ends):
+        outside = np.flatnonzero(np.abs(velocities[start:end] - targets[start:end]) > band)
+        if len(outside) == 0:
+            result.append(0.0)
+        elif outside[-1] == end - start - 1:
+            result.append(float('nan'))
+        else:
+            result.append(float(times[start + outside[-1] + 1] - times[start]))
+    return result
+
+
+def main():
+    """
+    Compare the PIDController modes on a noisy two-step drive: settling time,
+    and how much actuation traffic each mode produces over Zenoh.
+    """
+    parser = argparse.ArgumentParser(description="PID controller modes benchmark")
+    parser.add_argument('--noise', type=float, default=0.5, help="velocity measurement noise std (km/h)")
+    parser.add_argument('--rate', type=float, default=20.0, help="control rate (Hz)")
+    parser.add_argument('--band', type=float, default=1.0, help="settling band around the target (km/h)")
+    parser.add_argument('--deadband', type=float, default=0.01,
+                        help="actuation change worth a message, for the deadband message count")
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    # 0 -> 70 km/h, then down to 50 km/h
+    times = np.arange(0.0, 80.0, 1.0 / args.rate) + 1.0 / args.rate
+    targets = np.where(times >= 1.0, 70.0, 0.0)
+    targets[times >= 40.0] = 50.0
+
+    # main.py's gains; the actuation ZenohVehicle applies is within [-1, 1]
+    Kp = 0.125
+    gains = dict(kp=Kp, ki=Kp / 8, kd=Kp / 10)
+    limits = (-1.0, 1.0)
+    modes = [
+        ("classic", {}),
+        ("clamp", dict(anti_windup='clamp', integral_limit=0.5)),
+        ("back-calculation", dict(anti_windup='back-calculation', output_limits=limits)),
+        ("derivative filter", dict(derivative_filter=0.2)),
+        ("output limits", dict(output_limits=limits)),
+        ("rate limit", dict(output_limits=limits, rate_limit=2.0)),
+        ("all", dict(anti_windup='back-calculation', output_limits=limits, derivative_filter=0.2, rate_limit=2.0)),
+    ]
+
+    print(f"{len(times)} steps at {args.rate:g} Hz, velocity noise {args.noise:g} km/h, "
+          f"settling band {args.band:g} km/h")
+    print(f"{'mode':<18} {'settle 70 s':>11} {'settle 50 s':>11} {'overshoot':>10} "
+          f"{'|du| sum':>9} {'|du|>0.05':>10} {'msgs w/ deadband':>17}")
+    for name, options in modes:
+        controller = PIDController(**gains, **options)
+        velocities, actuations = run(controller, times, targets, args.noise, args.seed, LongitudinalModel())
+        settle = settling_times(times, targets, velocities, args.band)
+        overshoot = np.max(velocities[times < 40.0]) - 70.0
+        changes = np.abs(np.diff(actuations))
+
+        # Messages a publisher sending only changes beyond the deadband would
+        # put; ZenohHandler has no deadband and publishes every computed value
+        messages, last = 0, None
+        for value in actuations:
+            if last is None or abs(value - last) >= args.deadband:
+                messages += 1
+                last = value
+        print(f"{name:<18} {settle[0]:>11.2f} {settle[1]:>11.2f} {overshoot:>10.2f} "
+              f"{changes.sum():>9.1f} {int((changes > 0.05).sum()):>10} {messages:>17}")
+    print(f"msgs w/ deadband: messages a publisher skipping changes under {args.deadband:g} would send. "
+          f"ZenohHandler has no deadband: it publishes all {len(times)} values.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+# Result Recording
+import collections
+import itertools
+import queue
+import threading
+
+import numpy as np
+
+
+class ResultRecorder:
+    """
+    Records rows of float fields into preallocated NumPy chunks.
+
+    In memory, full chunks are kept, or with a `capacity` only the newest
+    ones holding at least that many rows (a ring at chunk granularity).
+    With a `path`, a background thread appends every full chunk to the file
+    and drops it, and every `flush_interval` seconds also writes the rows of
+    the chunk being filled, so memory stays flat however long the run. The
+    file holds little-endian float64 rows, or CSV with a header line when
+    the path ends in `.csv`.
+
+    Rows are expected to be appended from one thread at a time.
+    """
+
+    def __init__(self, fields, chunk_size=4096, capacity=None, path=None, flush_interval=5.0):
+        """
+        Initialize the recorder.
+
+        Args:
+            fields (iterable of str): Names of the recorded fields, in row order
+            chunk_size (int): Rows per preallocated chunk
+            capacity (int, optional): Newest rows kept in memory, None to keep all
+            path (str, optional): File the rows are flushed to instead of kept in memory
+            flush_interval (float): Seconds between flushes of a partly filled chunk
+
+        Raises:
+            ValueError: If both a capacity and a path are given
+        """
+        if capacity is not None and path is not None:
+            raise ValueError("capacity and path are exclusive: a file recording is already bounded in memory.")
+        self.fields = tuple(fields)
+        self.chunk_size = chunk_size
+        self.capacity = capacity
+        self.path = path
+        self._index = {name: i for i, name in enumerate(self.fields)}
+
+        maxlen = None if capacity is None else -(-capacity // chunk_size) + 1
+        self._chunks = collections.deque(maxlen=maxlen)  # full chunks kept in memory
+        self._chunk = self._new_chunk()
+        self._rows = 0      # rows filled in the current chunk
+        self._written = 0   # rows of the current chunk already queued for the file
+        self._count = 0
+        self._lock = threading.Lock()
+
+        self._file = None
+        if path is not None:
+            self._csv = path.endswith('.csv')
+            self._file = open(path, 'w' if self._csv else 'wb')
+            if self._csv:
+                self._file.write(','.join(self.fields) + '\n')
+            self._flush_interval = flush_interval
+            self._queue = queue.Queue()
+            self._writer = threading.Thread(target=self._write_loop, name="result-recorder", daemon=True)
+            self._writer.start()
+
+    def _new_chunk(self):
+        return np.empty((self.chunk_size, len(self.fields)), dtype=np.float64)
+
+    def __len__(self):
+        """Number of rows appended so far."""
+        return self._count
+
+    def append(self, *values):
+        """
+        Append one row.
+
+        Args:
+            *values (float): One value per field, in field order
+        """
+        with self._lock:
+            self._chunk[self._rows] = values
+            self._rows += 1
+            self._count += 1
+            if self._rows < self.chunk_size:
+                return
+            if self._file is None:
+                self._chunks.append(self._chunk)
+            else:
+                self._queue.put(self._chunk[self._written:])
+            self._chunk = self._new_chunk()
+            self._rows = 0
+            self._written = 0
+
+    def _queue_partial(self):
+        """Queue the rows of the current chunk not written yet."""
+        with self._lock:
+            if self._written < self._rows:
+                self._queue.put(self._chunk[self._written:self._rows].copy())
+                self._written = self._rows
+
+    def _write_loop(self):
+        while True:
+            try:
+                rows = self._queue.get(timeout=self._flush_interval)
+            except queue.Empty:
+                self._queue_partial()
+                continue
+            if rows is None:
+                return
+            if self._csv:
+                np.savetxt(self._file, rows, fmt='%.17g', delimiter=',')
+            else:
+                rows.astype('<f8', copy=False).tofile(self._file)
+            self._file.flush()
+
+    def close(self):
+        """
+        Write the remaining rows and close the file, if recording to one.
+        """
+        if self._file is None or self._file.closed:
+            return
+        self._queue_partial()
+        self._queue.put(None)
+        self._writer.join()
+        self._file.close()
+
+    def data(self):
+        """
+        All recorded rows (the newest `capacity` in ring mode). When recording
+        to a file, this closes it and reads the rows back.
+
+        Returns:
+            numpy.ndarray: (rows, fields) float64 array
+        """
+        if self._file is not None:
+            self.close()
+            if self._csv:
+                return np.loadtxt(self.path, delimiter=',', skiprows=1, ndmin=2).reshape((-1, len(self.fields)))
+            return np.fromfile(self.path, dtype='<f8').reshape((-1, len(self.fields)))
+
+        with self._lock:
+            rows = np.concatenate(list(self._chunks) + [self._chunk[:self._rows]])
+        if self.capacity is not None:
+            rows = rows[-self.capacity:]
+        return rows
+
+    def chunks(self):
+        """
+        All recorded rows (the newest `capacity` in ring mode), at most
+        `chunk_size` at a time. When recording to a file, this closes it and
+        reads the rows back chunk by chunk, so the whole run is never loaded.
+
+        Yields:
+            numpy.ndarray: (rows, fields) float64 array
+        """
+        if self._file is None:
+            rows = self.data()
+            for start in range(0, rows.shape[0], self.chunk_size):
+                yield rows[start:start + self.chunk_size]
+            return
+
+        self.close()
+        with open(self.path, 'r' if self._csv else 'rb') as recording:
+            if self._csv:
+                recording.readline()
+            while True:
+                if self._csv:
+                    lines = list(itertools.islice(recording, self.chunk_size))
+                    rows = np.loadtxt(lines, delimiter=',', ndmin=2) if lines else np.empty((0, len(self.fields)))
+                else:
+                    rows = np.fromfile(recording, dtype='<f8', count=self.chunk_size * len(self.fields))
+                if rows.size == 0:
+                    return
+                yield rows.reshape((-1, len(self.fields)))
+
+    def __getitem__(self, field):
+        """
+        One field of all recorded rows, see data().
+
+        Args:
+            field (str): Field name
+
+        Returns:
+            numpy.ndarray: float64 column
+        """
+        return self.data()[:, self._index[field]]
@@ -0,0 +1,362 @@
+# Topic Recording and Replay
+import argparse
+import math
+import struct
+import threading
+import time
+
+from controller import add_mode_arguments, controller_from_args
+from zenoh_handler import ZenohHandler
+
+# Topics of main.py: what ZenohHandler subscribes to, and what it publishes
+INPUT_TOPICS = {
+    'sub_stamp': 'vehicle/status/clock_status',
+    'sub_current': 'vehicle/status/velocity_status',
+    'sub_desired': 'adas/cruise_control/target_speed',
+    'sub_enable': 'adas/cruise_control/engage',
+    'sub_state': 'vehicle/status/vehicle_state'
+}
+OUTPUT_TOPIC = 'control/command/actuation_cmd'
+TOPICS = tuple(INPUT_TOPICS.values()) + (OUTPUT_TOPIC,)
+
+# Log file: magic, version, topic count, then each topic as length + UTF-8,
+# then records: receive time (s since start), topic index, payload length,
+# attachment length, payload, attachment
+MAGIC = b"TLOG"
+VERSION = 1
+_HEADER = struct.Struct("<4sBB")
+_TOPIC = struct.Struct("<H")
+_RECORD = struct.Struct("<dBIH")
+
+
+class TopicLogWriter:
+    """
+    Appends timestamped Zenoh samples of a fixed set of topics to a log file.
+    Safe to call from several Zenoh callbacks at once.
+    """
+
+    def __init__(self, path, topics=TOPICS):
+        """
+        Initialize the writer.
+
+        Args:
+            path (str): Log file to create
+            topics (tuple of str): Topics that can be recorded
+        """
+        self.topics = tuple(topics)
+        self._index = {topic: i for i, topic in enumerate(self.topics)}
+        self._lock = threading.Lock()
+        self._start = time.monotonic()
+        self.count = 0
+
+        self._file = open(path, 'wb')
+        self._file.write(_HEADER.pack(MAGIC, VERSION, len(self.topics)))
+        for topic in self.topics:
+            encoded = topic.encode()
+            self._file.write(_TOPIC.pack(len(encoded)) + encoded)
+
+    def write(self, topic, payload, attachment=None):
+        """
+        Record one sample, stamped with the time since the writer was created.
+
+        Args:
+            topic (str): One of the writer's topics
+            payload (bytes): Sample payload
+            attachment (bytes, optional): Sample attachment
+        """
+        attachment = attachment or b""
+        record = _RECORD.pack(time.monotonic() - self._start, self._index[topic], len(payload), len(attachment))
+        with self._lock:
+            self._file.write(record + payload + attachment)
+            self.count += 1
+
+    def close(self):
+        """Close the log file."""
+        with self._lock:
+            self._file.close()
+
+
+def read_log(path):
+    """
+    Read a topic log.
+
+    Args:
+        path (str): Log file
+
+    Returns:
+        list: (time, topic, payload bytes, attachment bytes or None) in recording order
+    """
+    with open(path, 'rb') as log:
+        data = log.read()
+
+    magic, version, count = _HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path} is not a version {VERSION} topic log")
+    offset = _HEADER.size
+    topics = []
+    for _ in range(count):
+        (length,) = _TOPIC.unpack_from(data, offset)
+        offset += _TOPIC.size
+        topics.append(data[offset:offset + length].decode())
+        offset += length
+
+    samples = []
+    while offset < len(data):
+        stamp, index, payload_length, attachment_length = _RECORD.unpack_from(data, offset)
+        offset += _RECORD.size
+        payload = data[offset:offset + payload_length]
+        offset += payload_length
+        attachment = data[offset:offset + attachment_length] or None
+        offset += attachment_length
+        samples.append((stamp, topics[index], payload, attachment))
+    return samples
+
+
+# ------------------------------------------------------------------
+# In-process session stand-in
+# ------------------------------------------------------------------
+class _Bytes:
+    """Minimal zenoh.ZBytes: the payload and attachment accessors ZenohHandler uses."""
+
+    def __init__(self, data):
+        self._data = data
+
+    def to_bytes(self):
+        return self._data
+
+    def to_string(self):
+        return self._data.decode()
+
+
+class ReplaySample:
+    """Minimal zenoh.Sample carrying a recorded payload and attachment."""
+
+    def __init__(self, key, payload, attachment=None):
+        self.key_expr = key
+        self.payload = _Bytes(payload)
+        self.attachment = None if attachment is None else _Bytes(attachment)
+
+
+class _ReplayPublisher:
+    def __init__(self, session, key):
+        self._session = session
+        self._key = key
+
+    def put(self, payload, attachment=None):
+        if isinstance(payload, str):
+            payload = payload.encode()
+        self._session.published.append((self._key, payload, attachment))
+
+    def undeclare(self):
+        pass
+
+
+class ReplaySession:
+    """
+    In-process stand-in for a zenoh.Session: subscribers are called directly
+    with the samples handed to deliver(), and puts are collected in
+    `published` as (key, payload bytes, attachment).
+    """
+
+    def __init__(self):
+        self._subscribers = {}
+        self.published = []
+
+    def declare_subscriber(self, key, callback):
+        self._subscribers.setdefault(key, []).append(callback)
+
+    def declare_publisher(self, key):
+        return _ReplayPublisher(self, key)
+
+    def deliver(self, sample):
+        """
+        Call the subscribers of the sample's key.
+
+        Args:
+            sample (ReplaySample): Sample to deliver
+        """
+        for callback in self._subscribers.get(sample.key_expr, ()):
+            callback(sample)
+
+    def close(self):
+        pass
+
+
+# ------------------------------------------------------------------
+# Record / replay
+# ------------------------------------------------------------------
+def record(path, duration=None):
+    """
+    Record the PID controller's input and output topics from the Zenoh network.
+
+    Args:
+        path (str): Log file to create
+        duration (float, optional): Seconds to record, None until CTRL-C
+    """
+    import zenoh
+
+    writer = TopicLogWriter(path)
+    session = zenoh.open(zenoh.Config())
+
+    def listener(sample):
+        attachment = None if sample.attachment is None else sample.attachment.to_bytes()
+        writer.write(str(sample.key_expr), sample.payload.to_bytes(), attachment)
+
+    subscribers = [session.declare_subscriber(topic, listener) for topic in TOPICS]
+    print(f"Recording {len(TOPICS)} topics to {path} (CTRL-C to stop)...")
+    try:
+        if duration is None:
+            while True:
+                time.sleep(1)
+        else:
+            time.sleep(duration)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for subscriber in subscribers:
+            subscriber.undeclare()
+        session.close()
+        writer.close()
+        print(f"Recorded {writer.count} samples")
+
+
+def replay(samples, controller, speed=0.0, verbose=False, legacy_topics=False, rate=None):
+    """
+    Feed recorded input samples through a ZenohHandler on a ReplaySession.
+
+    Args:
+        samples (list): Recorded samples, see read_log
+        controller (PIDController): Controller under test
+        speed (float): Replay speed relative to the recording, 0 for as fast as possible
+        verbose (bool): Let the handler print every sample
+        legacy_topics (bool): Read the current velocity from the string topics, as main.py --legacy-topics
+        rate (float, optional): Control loop rate in Hz, as main.py --rate; None to compute on every velocity sample
+
+    Returns:
+        tuple: (handler, session, stats) with the actuation published in
+        session.published and stats holding the replay wall time and the
+        handler's callback latency
+    """
+    session = ReplaySession()
+    topics = dict(INPUT_TOPICS, sub_state=None) if legacy_topics else INPUT_TOPICS
+    handler = ZenohHandler(controller=controller, session=session, pub_acc=OUTPUT_TOPIC, rate=rate, verbose=verbose, **topics)
+    handler.start()
+
+    inputs = [sample for sample in samples if sample[1] != OUTPUT_TOPIC]
+    latencies = []
+    start = time.perf_counter()
+    first = inputs[0][0] if inputs else 0.0
+    for stamp, topic, payload, attachment in inputs:
+        if speed > 0.0:
+            delay = (stamp - first) / speed - (time.perf_counter() - start)
+            if delay > 0.0:
+                time.sleep(delay)
+        sample = ReplaySample(topic, payload, attachment)
+        before = time.perf_counter()
+        session.deliver(sample)
+        latencies.append(time.perf_counter() - before)
+    wall_time = time.perf_counter() - start
+    handler.stop()
+
+    stats = {
+        'samples': len(inputs),
+        'wall_time': wall_time,
+        'recorded_time': (inputs[-1][0] - first) if inputs else 0.0,
+        'latency_mean_us': 1e6 * sum(latencies) / max(1, len(latencies)),
+        'latency_max_us': 1e6 * max(latencies, default=0.0)
+    }
+    return handler, session, stats
+
+
+def compare(samples, published):
+    """
+    Compare replayed actuation with the recorded one, pairing the n-th
+    published value with the n-th recorded value.
+
+    Args:
+        samples (list): Recorded samples, see read_log
+        published (list): ReplaySession.published
+
+    Returns:
+        dict: Recorded and replayed counts, compared pairs, maximum and RMS difference
+    """
+    recorded = [float(payload.decode()) for _, topic, payload, _ in samples if topic == OUTPUT_TOPIC]
+    replayed = [float(payload.decode()) for key, payload, _ in published if key == OUTPUT_TOPIC]
+    pairs = list(zip(recorded, replayed))
+    differences = [abs(a - b) for a, b in pairs]
+    return {
+        'recorded': len(recorded),
+        'replayed': len(replayed),
+        'compared': len(pairs),
+        'max_difference': max(differences, default=0.0),
+        'rms_difference': math.sqrt(sum(d * d for d in differences) / len(differences)) if differences else 0.0
+    }
+
+
+def main():
+    """
+    Record the PID controller's topics, or replay a recording through the
+    controller offline and compare its actuation with the recorded run.
+    """
+    parser = argparse.ArgumentParser(description="Record and replay the PID controller's Zenoh topics")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    record_parser = commands.add_parser('record', help="record the topics from the Zenoh network")
+    record_parser.add_argument('log', help="log file to create")
+    record_parser.add_argument('--duration', type=float, default=None, help="seconds to record, until CTRL-C by default")
+
+    # Gains default to main.py's
+    Kp = 0.125
+    replay_parser = commands.add_parser('replay', help="replay a log through the controller")
+    replay_parser.add_argument('log', help="log file to replay")
+    replay_parser.add_argument('--speed', type=float, default=0.0,
+                               help="replay speed relative to the recording (e.g. 10), as fast as possible by default")
+    replay_parser.add_argument('--legacy-topics', action='store_true',
+                               help="read the current velocity from the string topics, for a run of main.py --legacy-topics")
+    replay_parser.add_argument('--rate', type=float, default=None,
+                               help="run the control law at this rate in Hz, for a run of main.py --rate "
+                                    "(timed by the wall clock, so only comparable sample for sample without it)")
+    replay_parser.add_argument('--kp', type=float, default=Kp)
+    replay_parser.add_argument('--ki', type=float, default=Kp / 8)
+    replay_parser.add_argument('--kd', type=float, default=Kp / 10)
+    add_mode_arguments(replay_parser)
+    replay_parser.add_argument('--tolerance', type=float, default=1e-9,
+                               help="largest actuation difference accepted as matching")
+    replay_parser.add_argument('--store', action='store_true', help="write the .log files and plot, as main.py does")
+    replay_parser.add_argument('--verbose', action='store_true', help="let the handler print every sample")
+    args = parser.parse_args()
+
+    if args.command == 'record':
+        record(args.log, args.duration)
+        return
+
+    if args.rate is not None and args.rate <= 0:
+        replay_parser.error("--rate must be positive")
+
+    samples = read_log(args.log)
+    controller = controller_from_args(replay_parser, args, args.kp, args.ki, args.kd)
+    handler, session, stats = replay(samples, controller, args.speed, args.verbose, args.legacy_topics, args.rate)
+    result = compare(samples, session.published)
+
+    speedup = stats['recorded_time'] / stats['wall_time'] if stats['wall_time'] > 0.0 else math.inf
+    print(f"Replayed {stats['samples']} samples ({stats['recorded_time']:.1f} s recorded) "
+          f"in {stats['wall_time']:.3f} s ({speedup:.0f}x), "
+          f"callback latency mean {stats['latency_mean_us']:.1f} us, max {stats['latency_max_us']:.1f} us")
+    if args.rate:
+        loop = handler.loop_stats()
+        print(f"Control loop: {loop['ticks']} ticks at {loop['rate_hz']:g} Hz, "
+              f"{loop['misses']} deadlines missed, {loop['stale']} skipped on stale input")
+    print(f"Actuation: {result['recorded']} recorded, {result['replayed']} replayed, "
+          f"max difference {result['max_difference']:.3g}, RMS {result['rms_difference']:.3g}")
+
+    if args.store:
+        handler.store_results()
+        handler.show_results()
+
+    matches = result['recorded'] == result['replayed'] and result['max_difference'] <= args.tolerance
+    print("MATCH" if matches else "MISMATCH")
+    raise SystemExit(0 if matches else 1)
+
+
+if __name__ == "__main__":
+    main()
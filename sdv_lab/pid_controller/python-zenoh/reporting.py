@@ -0,0 +1,45 @@
+# Reporting
+import numpy as np
+import matplotlib.pyplot as plt
+
+
+def plot_results(results, path='results.png'):
+    """
+    Plot target and current velocity and the acceleration over time.
+
+    Imports matplotlib, so only import this module when plotting: the
+    controller itself doesn't need it.
+
+    Args:
+        results (ResultRecorder): Recorded controller data
+        path (str): Image file to save the plot to
+    """
+    data = results.data()
+    if data.shape[0] == 0:
+        print("[INFO] No results to plot")
+        return
+
+    columns = {field: data[:, i] for i, field in enumerate(results.fields)}
+    desired_velocity = columns['desired_velocity']
+    current_velocity = columns['current_velocity']
+    current_time = columns['current_time']
+    acceleration = columns['acceleration']
+
+    # Creating Plots
+    fig, vel = plt.subplots()
+
+    vel.set_title("Target (g) vs Velocity (b) + Acceleration (o)")
+    vel.set_xlabel("Time")
+    vel.set_ylabel("Kph")
+
+    vel.set_xlim((np.amin(current_time) - 2.5), np.amax(current_time) + 2.5)
+    vel.set_ylim((np.amin(current_velocity) - 2.5), np.amax(current_velocity) + 2.5)
+
+    vel.plot(current_time, desired_velocity, 'tab:green')
+    vel.plot(current_time, current_velocity, 'tab:blue')
+    vel.plot(current_time, acceleration, 'tab:orange')
+
+    vel.grid()
+
+    plt.savefig(path)
+    plt.close(fig)
@@ -0,0 +1,81 @@
+import argparse, statistics, subprocess, sys, os
+
+# Each probe runs in a fresh interpreter and prints: seconds, peak RSS (KiB), matplotlib loaded
+PROBE = """
+import resource, sys, time
+start = time.perf_counter()
+{body}
+elapsed = time.perf_counter() - start
+print(elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, 'matplotlib' in sys.modules)
+"""
+
+# Import the controller and handler and build them, as main.py does once the
+# Zenoh session is open (a stand-in session keeps Zenoh itself out of the timing)
+CONTROL_PATH = """
+from controller import PIDController
+from zenoh_handler import ZenohHandler
+
+class Session:
+    def declare_publisher(self, key):
+        return None
+
+ZenohHandler(
+    controller=PIDController(kp=0.125, ki=0.125 / 8, kd=0.125 / 10),
+    session=Session(),
+    sub_current='vehicle/status/velocity_status',
+    sub_desired='adas/cruise_control/target_speed',
+    pub_acc='control/command/actuation_cmd'
+)
+"""
+
+# What show_results loads at shutdown
+REPORTING = """
+import reporting
+"""
+
+
+def probe(body, runs):
+    """
+    Run a probe in fresh interpreters.
+
+    Args:
+        body (str): Code to time
+        runs (int): Number of interpreters to start
+
+    Returns:
+        tuple: (median seconds, median peak RSS in MiB, matplotlib loaded)
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    times, rss, loaded = [], [], False
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", PROBE.format(body=body)],
+            cwd=here, check=True, capture_output=True, text=True
+        ).stdout.split()
+        times.append(float(output[0]))
+        rss.append(int(output[1]) / 1024)
+        loaded = loaded or output[2] == "True"
+    return statistics.median(times), statistics.median(rss), loaded
+
+
+def main():
+    """
+    Measure how quickly the PID control path is ready in a fresh process,
+    and what plotting would add if it were loaded up front.
+    """
+    parser = argparse.ArgumentParser(description="PID controller startup benchmark")
+    parser.add_argument('--runs', type=int, default=5, help="fresh interpreters per probe")
+    args = parser.parse_args()
+
+    print(f"{'probe':<14} {'median ms':>10} {'peak RSS MiB':>13}  matplotlib loaded")
+    for name, body in (("control path", CONTROL_PATH), ("reporting", REPORTING)):
+        try:
+            seconds, rss, loaded = probe(body, args.runs)
+        except subprocess.CalledProcessError as e:
+            print(f"{name:<14} failed: {e.stderr.strip().splitlines()[-1]}")
+            continue
+        print(f"{name:<14} {seconds * 1e3:>10.1f} {rss:>13.1f}  {loaded}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,8 @@
+import os
+import sys
+
+# The controller's modules import each other flat, and the formats shared
+# with the CARLA clients, which setup copies next to them, from contract/
+here = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(here))
+sys.path.insert(1, os.path.join(here, '..', '..', '..', '..', 'contract'))
@@ -0,0 +1,70 @@
+import sys
+import time
+
+import pytest
+
+import replay
+from controller import PIDController
+from replay import INPUT_TOPICS, OUTPUT_TOPIC, TopicLogWriter, read_log
+from sample_envelope import pack_envelope
+from vehicle_state_message import VehicleState, pack_vehicle_state
+
+# Gains of main.py, replay's defaults
+KP, KI, KD = 0.125, 0.125 / 8, 0.125 / 10
+
+
+def write_session(path):
+    """Log a short engaged drive, with the actuation main.py would have published."""
+    controller = PIDController(kp=KP, ki=KI, kd=KD)
+    writer = TopicLogWriter(str(path))
+    writer.write(INPUT_TOPICS['sub_enable'], b"true")
+    writer.write(INPUT_TOPICS['sub_desired'], b"70.0")
+    for i in range(50):
+        frame_id, sim_time, speed = 1000 + i, 20.0 + 0.05 * i, 40.0 + 0.5 * i
+        writer.write(INPUT_TOPICS['sub_state'], pack_vehicle_state(VehicleState(frame_id, sim_time, speed=speed)))
+        acceleration = controller.compute(70.0, speed, sim_time)
+        writer.write(OUTPUT_TOPIC, str(acceleration).encode(), pack_envelope(frame_id, sim_time))
+    writer.close()
+
+
+def run_main(monkeypatch, capsys, *args):
+    monkeypatch.setattr(sys, 'argv', ['replay.py', 'replay', *args])
+    with pytest.raises(SystemExit) as exit_info:
+        replay.main()
+    return exit_info.value.code, capsys.readouterr().out
+
+
+def test_recorded_session_replays_to_a_match(tmp_path, monkeypatch, capsys):
+    log = tmp_path / "session.tlog"
+    write_session(log)
+    assert len(read_log(str(log))) == 102
+
+    code, out = run_main(monkeypatch, capsys, str(log))
+    assert "Actuation: 50 recorded, 50 replayed" in out
+    assert out.splitlines()[-1] == "MATCH"
+    assert code == 0
+
+
+def test_other_gains_mismatch(tmp_path, monkeypatch, capsys):
+    log = tmp_path / "session.tlog"
+    write_session(log)
+
+    code, out = run_main(monkeypatch, capsys, str(log), '--kp', '0.2')
+    assert out.splitlines()[-1] == "MISMATCH"
+    assert code == 1
+
+
+def test_rate_runs_the_control_loop(tmp_path, monkeypatch, capsys):
+    log = tmp_path / "session.tlog"
+    write_session(log)
+
+    samples = read_log(str(log))
+    handler, session, stats = replay.replay(samples, PIDController(kp=KP, ki=KI, kd=KD), rate=200.0)
+    assert handler.loop_stats()['rate_hz'] == 200.0
+    # The loop is stopped once the log is replayed
+    published = len(session.published)
+    time.sleep(0.05)
+    assert len(session.published) == published
+
+    code, out = run_main(monkeypatch, capsys, str(log), '--rate', '0')
+    assert code == 2
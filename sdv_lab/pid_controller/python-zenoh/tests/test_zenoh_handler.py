@@ -0,0 +1,62 @@
+from controller import PIDController
+from replay import INPUT_TOPICS, OUTPUT_TOPIC, ReplaySample, ReplaySession
+from sample_envelope import pack_envelope
+from vehicle_state_message import VehicleState, pack_vehicle_state
+from zenoh_handler import ZenohHandler
+
+
+def make_handler(**topics):
+    session = ReplaySession()
+    handler = ZenohHandler(
+        controller=PIDController(kp=0.125, ki=0.125 / 8, kd=0.125 / 10),
+        session=session,
+        pub_acc=OUTPUT_TOPIC,
+        verbose=False,
+        **dict(INPUT_TOPICS, **topics)
+    )
+    handler.start()
+    session.deliver(ReplaySample(INPUT_TOPICS['sub_enable'], b"true"))
+    session.deliver(ReplaySample(INPUT_TOPICS['sub_desired'], b"70.0"))
+    return handler, session
+
+
+def deliver_state(session, frame_id, sim_time, speed):
+    record = pack_vehicle_state(VehicleState(frame_id, sim_time, speed=speed, throttle=0.5, x=12.0, yaw=90.0))
+    session.deliver(ReplaySample(INPUT_TOPICS['sub_state'], record))
+
+
+def test_packed_vehicle_state_drives_the_controller():
+    handler, session = make_handler()
+    expected = PIDController(kp=0.125, ki=0.125 / 8, kd=0.125 / 10)
+
+    for frame_id, sim_time, speed in ((100, 5.0, 50.0), (101, 5.05, 51.5), (102, 5.1, 53.0)):
+        deliver_state(session, frame_id, sim_time, speed)
+        acceleration = expected.compute(70.0, speed, sim_time)
+        assert session.published[-1] == (OUTPUT_TOPIC, str(acceleration).encode(), pack_envelope(frame_id, sim_time))
+
+    assert len(session.published) == 3
+    assert (handler.current_velocity, handler.current_time, handler.current_frame) == (53.0, 5.1, 102)
+
+
+def test_packed_vehicle_state_is_frame_ordered():
+    handler, session = make_handler()
+
+    deliver_state(session, 100, 5.0, 50.0)
+    deliver_state(session, 99, 4.95, 49.0)
+    deliver_state(session, 101, 5.05, 51.0)
+    # Not a vehicle state record: reported, not passed on
+    session.deliver(ReplaySample(INPUT_TOPICS['sub_state'], b"65.5"))
+
+    assert len(session.published) == 2
+    assert handler.sync_stats() == {'passed': 2, 'late': 1, 'restarts': 0}
+
+
+def test_legacy_topics_are_only_read_without_sub_state():
+    handler, session = make_handler()
+    session.deliver(ReplaySample(INPUT_TOPICS['sub_current'], b"65.5"))
+    assert session.published == []
+
+    handler, session = make_handler(sub_state=None)
+    session.deliver(ReplaySample(INPUT_TOPICS['sub_stamp'], b"1.0"))
+    session.deliver(ReplaySample(INPUT_TOPICS['sub_current'], b"65.5"))
+    assert len(session.published) == 1
@@ -1,20 +1,43 @@
 # Zenoh Pub/Sub
+import contextlib
+import threading
 import time
 
 # Logging
 import datetime
 
-# Show Results
-import numpy as np
-import matplotlib.pyplot as plt
+# Vehicle state and frame ordering
+try:
+    # Copied next to this script from tide's contract package, see README
+    from sample_envelope import pack_envelope, unpack_envelope
+    from vehicle_state_message import unpack_vehicle_state
+except ImportError as error:
+    raise RuntimeError('cannot import %s, copy contract/%s.py next to this script' % (error.name, error.name))
+from frame_sync import FrameGate
+
+# Fixed-rate control
+from control_loop import FixedRateLoop
+
+# Result recording
+from recorder import ResultRecorder
 
 
 class ZenohHandler:
     """
     Handles Zenoh Pub/Sub communication for the PID controller.
     Subscribes to velocity topics and publishes acceleration.
+
+    The current velocity is read from the packed vehicle state record the
+    CARLA clients publish once per tick (`sub_state`), which carries its
+    simulation frame and time. Without `sub_state` it is read from the string
+    topics `sub_current` and `sub_stamp` instead (Rust bridge, z_put).
+
+    By default the acceleration is computed in the Zenoh callback of every
+    velocity sample. With a `rate`, a control thread computes it at that
+    fixed rate from the latest inputs instead, which the listeners hand
+    over as one immutable tuple, so the thread reads them without locking.
     """
-    def __init__(self, controller, session, sub_current, sub_desired, pub_acc, sub_stamp=None, sub_enable="control/pid/enable"):
+    def __init__(self, controller, session, sub_current, sub_desired, pub_acc, sub_stamp=None, sub_enable="control/pid/enable", sub_state=None, max_late_frames=32, rate=None, stale_periods=5, verbose=True, record_path=None, record_capacity=None):
         """
         Initialize the Zenoh handler.
 
@@ -26,7 +49,14 @@ class ZenohHandler:
             pub_acc (str): Topic to publish acceleration values to
             sub_stamp (str, optional): Topic to subscribe for clock/timestamp status
             sub_enable (str): Topic to subscribe for enable/disable commands
+            sub_state (str, optional): Topic of the packed vehicle state record (contract/vehicle_state_message.py), None to read sub_current and sub_stamp instead
             pub_status (str): Topic to publish PID status
+            max_late_frames (int): Largest backwards frame jump of an enveloped sample taken as late, not as a simulator restart
+            rate (float, optional): Control loop rate in Hz, None to compute on every velocity sample
+            stale_periods (int): Control loop periods without a velocity sample after which the loop stops computing
+            verbose (bool): Print every received sample and published acceleration
+            record_path (str, optional): File results are flushed to while running (.csv for CSV, raw float64 otherwise)
+            record_capacity (int, optional): Newest results kept in memory, None to keep all
         """
         self.controller = controller
         self.session = session
@@ -34,6 +64,7 @@ class ZenohHandler:
         self.sub_desired = sub_desired
         self.sub_stamp = sub_stamp
         self.sub_enable = sub_enable
+        self.sub_state = sub_state
 
         # --------------------------------------------------------------
         # Runtime state flag – starts *active* by default.
@@ -49,17 +80,37 @@ class ZenohHandler:
         self.current_time = 0.0
         self.previous_time = 0.0
 
-        self.results = {
-            'desired_velocity': [],
-            'current_velocity': [],
-            'current_time': [],
-            'acceleration': []
-        }
+        # Velocity samples stamped with a sample envelope (CARLA clients) are
+        # used in simulation frame order and timed by simulation time; plain
+        # samples (Rust bridge, z_put) are used as they arrive.
+        self.frame_gate = FrameGate(max_late_frames)
+        self.current_frame = None
+        self.verbose = verbose
+
+        # Latest (desired velocity, current velocity, time, frame, monotonic
+        # time of the velocity sample) read by the control thread; replaced as
+        # a whole, never modified in place. The listeners update the input
+        # attributes and build the tuple under the lock.
+        self._inputs = None
+        self._inputs_lock = threading.Lock()
+        self._current_stamp = None
+        self._loop = FixedRateLoop(rate, self._control_step) if rate else None
+        self._loop_active = False
+        self._max_input_age = stale_periods / rate if rate else None
+        self._stale = False
+        self.stale_ticks = 0
+
+        self.results = ResultRecorder(
+            ('desired_velocity', 'current_velocity', 'current_time', 'acceleration'),
+            capacity=record_capacity,
+            path=record_path
+        )
 
     def stamp_listener(self, sample):
         try:
             value = float(sample.payload.to_string())
-            print(f"Received current clock '{value}'")
+            if self.verbose:
+                print(f"Received current clock '{value}'")
             self.current_time = value
         except Exception as e:
             print(f"[ERROR] Timestamp processing failed: {e}")
@@ -73,12 +124,54 @@ class ZenohHandler:
         """
         try:
             value = float(sample.payload.to_string())
-            print(f"Received current velocity '{value}'")
-            self.current_velocity = value
-            self.publish_acc()
+            if self.verbose:
+                print(f"Received current velocity '{value}'")
+            envelope = unpack_envelope(None if sample.attachment is None else sample.attachment.to_bytes())
+            if envelope is None:
+                self._input_updated(value, self.current_time, None)
+                return
+
+            frame_id, sim_time = envelope
+            self._frame_updated(value, frame_id, sim_time)
         except Exception as e:
             print(f"[ERROR] Current velocity processing failed: {e}")
 
+    def state_listener(self, sample):
+        """
+        Listener for the packed vehicle state record.
+
+        Args:
+            sample: Zenoh sample object
+        """
+        try:
+            state = unpack_vehicle_state(sample.payload.to_bytes())
+            if self.verbose:
+                print(f"Received current velocity '{state.speed}' of frame {state.frame_id}")
+            self._frame_updated(state.speed, state.frame_id, state.sim_time)
+        except Exception as e:
+            print(f"[ERROR] Vehicle state processing failed: {e}")
+
+    def _frame_updated(self, current_velocity, frame_id, sim_time):
+        """
+        Act on the current velocity of a simulation frame, if the frame gate
+        passes it.
+
+        Args:
+            current_velocity (float): Current measured velocity
+            frame_id (int): Simulation frame of the sample
+            sim_time (float): Simulation time of the frame in seconds
+        """
+        order = self.frame_gate.accept(frame_id, sim_time)
+        if order == 'late':
+            return
+        if order == 'restart':
+            print(f"[WARNING] Simulation restarted at frame {frame_id}, sim time {sim_time:.3f} s")
+            # Simulation time went backwards; the control thread times the
+            # controller by its own clock instead
+            if self._loop is None:
+                self.controller.reset()
+        self._input_updated(current_velocity, sim_time, frame_id)
+
 
     def desired_listener(self, sample):
         """
@@ -89,39 +182,132 @@ class ZenohHandler:
         """
         try:
             value = float(sample.payload.to_string())
-            print(f"Received desired velocity '{value}'")
-            self.desired_velocity = value
+            if self.verbose:
+                print(f"Received desired velocity '{value}'")
+            with self._inputs_lock:
+                self.desired_velocity = value
+                if self._loop is not None and self._inputs is not None:
+                    self._hand_over_inputs()
         except Exception as e:
             print(f"[ERROR] Desired velocity processing failed: {e}")
 
 
+    def _input_updated(self, current_velocity, current_time, frame_id):
+        """
+        Act on a new current velocity: compute right away, or hand the inputs
+        over to the control thread.
+
+        Args:
+            current_velocity (float): Current measured velocity
+            current_time (float): Time of the sample in seconds
+            frame_id (int): Simulation frame of the sample, None if not enveloped
+        """
+        with self._inputs_lock:
+            self.current_velocity = current_velocity
+            self.current_time = current_time
+            self.current_frame = frame_id
+            if self._loop is None:
+                self.publish_acc()
+            else:
+                self._current_stamp = time.monotonic()
+                self._hand_over_inputs()
+
+    def _hand_over_inputs(self):
+        """
+        Replace the control thread's inputs with the current ones. Called
+        with the inputs lock held.
+        """
+        self._inputs = (
+            self.desired_velocity,
+            self.current_velocity,
+            self.current_time,
+            self.current_frame,
+            self._current_stamp
+        )
+
     def publish_acc(self):
         """
         Compute and publish acceleration based on the current and desired velocities.
         """
-        current_time = time.perf_counter()
         # Skip the control law entirely if the PID is disabled ----------------
         if not self.pid_active:
             return
 
-        acceleration = self.controller.compute(
+        self._compute_and_publish(
             self.desired_velocity,
             self.current_velocity,
-            self.current_time
+            self.current_time,
+            self.current_time,
+            self.current_frame
+        )
+
+    def _control_step(self, deadline):
+        """
+        One tick of the control thread: compute from the latest inputs, timed
+        by the loop deadline.
+
+        Args:
+            deadline (float): Monotonic time of this tick in seconds
+        """
+        # The control thread owns the controller: reset it on engage/disengage
+        active = self.pid_active
+        if active != self._loop_active:
+            self._loop_active = active
+            self._stale = False
+            self.controller.reset()
+        inputs = self._inputs
+        if not active or inputs is None:
+            return
+
+        desired_velocity, current_velocity, sample_time, frame_id, stamp = inputs
+        if deadline - stamp > self._max_input_age:
+            # No velocity for a while: leave the vehicle at neutral actuation
+            # rather than keep acting on the last sample
+            self.stale_ticks += 1
+            if not self._stale:
+                self._stale = True
+                print(f"[WARNING] No current velocity for {deadline - stamp:.3f} s, control paused")
+                self.controller.reset()
+                self.pub_acc.put(str(0.0))
+            return
+        if self._stale:
+            self._stale = False
+            print("[INFO] Current velocity back, control resumed")
+
+        self._compute_and_publish(desired_velocity, current_velocity, deadline, sample_time, frame_id)
+
+    def _compute_and_publish(self, desired_velocity, current_velocity, current_time, sample_time, frame_id):
+        """
+        Compute, publish and record one acceleration.
+
+        Args:
+            desired_velocity (float): Target velocity
+            current_velocity (float): Current measured velocity
+            current_time (float): Controller time in seconds
+            sample_time (float): Simulation time of the inputs, for the envelope
+            frame_id (int): Simulation frame of the inputs, None if not enveloped
+        """
+        acceleration = self.controller.compute(
+            desired_velocity,
+            current_velocity,
+            current_time
         )
 
         # Publish computed acceleration to the designated topic
-        print(f"Publishing Acceleration: {str(acceleration)}")
-        self.pub_acc.put(str(acceleration))
+        if self.verbose:
+            print(f"Publishing Acceleration: {str(acceleration)}")
+        if frame_id is None:
+            self.pub_acc.put(str(acceleration))
+        else:
+            # Stamp the command with the frame it was computed for
+            self.pub_acc.put(str(acceleration), attachment=pack_envelope(frame_id, sample_time))
 
         # Store results for later analysis
-        self.results['desired_velocity'].append(self.desired_velocity)
-        self.results['current_velocity'].append(self.current_velocity)
-        self.results['current_time'].append(self.current_time)
-        self.results['acceleration'].append(acceleration)
+        self.results.append(desired_velocity, current_velocity, current_time, acceleration)
 
-        print(f"Delta time: {self.current_time - self.previous_time} seconds")
-        self.previous_time = self.current_time
+        if self.verbose:
+            print(f"Delta time: {current_time - self.previous_time} seconds")
+        self.previous_time = current_time
 
     # ------------------------------------------------------------------
     # Enable / disable handling
@@ -148,13 +334,20 @@ class ZenohHandler:
 
     def _activate_pid(self):
         self.pid_active = True
-        self.controller.reset()
+        if self._loop is None:
+            self.controller.reset()
+        else:
+            # Only act on velocity received from now on
+            with self._inputs_lock:
+                self._inputs = None
+        self.frame_gate.reset()
         timestamp = datetime.datetime.now().isoformat()
         print(f"[INFO] PID controller ACTIVATED at {timestamp}")
 
     def _deactivate_pid(self):
         self.pid_active = False
-        self.controller.reset()
+        if self._loop is None:
+            self.controller.reset()
         timestamp = datetime.datetime.now().isoformat()
         print(f"[INFO] PID controller DEACTIVATED at {timestamp}")
 
@@ -163,17 +356,24 @@ class ZenohHandler:
         """
         Start subscribing to Zenoh topics for current and desired velocity.
         """
-        self.session.declare_subscriber(
-            self.sub_stamp,
-            self.stamp_listener
-        )
-        print("Current timestamp subscriber started, waiting for data...")
+        if self.sub_state:
+            self.session.declare_subscriber(
+                self.sub_state,
+                self.state_listener
+            )
+            print("Vehicle state subscriber started, waiting for data...")
+        else:
+            self.session.declare_subscriber(
+                self.sub_stamp,
+                self.stamp_listener
+            )
+            print("Current timestamp subscriber started, waiting for data...")
 
-        self.session.declare_subscriber(
-            self.sub_current,
-            self.current_listener
-        )
-        print("Current velocity subscriber started, waiting for data...")
+            self.session.declare_subscriber(
+                self.sub_current,
+                self.current_listener
+            )
+            print("Current velocity subscriber started, waiting for data...")
 
         if self.sub_enable:
             self.session.declare_subscriber(
@@ -188,63 +388,69 @@ class ZenohHandler:
         )
         print("Desired velocity subscriber started, waiting for data...")
 
+        if self._loop is not None:
+            self._loop.start()
+            print(f"Control loop started at {1.0 / self._loop.period:g} Hz")
 
-    def store_results(self):
-        with open("desired_velocity.log", 'w') as desired_velocity:
-            for dv in self.results['desired_velocity']:
-                desired_velocity.write(str(dv) + '\n')
-
-        with open("current_velocity.log", 'w') as current_velocity:
-            for cv in self.results['current_velocity']:
-                current_velocity.write(str(cv) + '\n')
-
-        with open("current_time.log", 'w') as current_time:
-            for ct in self.results['current_time']:
-                current_time.write(str(ct) + '\n')
-
-        with open("acceleration.log", 'w') as acceleration:
-            for acc in self.results['acceleration']:
-                acceleration.write(str(acc) + '\n')
-
-    def show_results(self):
+    def stop(self):
         """
-        Plot the results of the PID controller computations.
+        Stop the control thread, if running.
         """
-        desired_velocity = np.array(self.results['desired_velocity'])
-        current_velocity = np.array(self.results['current_velocity'])
-        current_time = np.array(self.results['current_time'])
-        acceleration = np.array(self.results['acceleration'])
-
-        # Align samples
-        samples = np.amin(
-            np.array([
-                desired_velocity.shape[0],
-                current_velocity.shape[0],
-                current_time.shape[0],
-                acceleration.shape[0]
-            ])
-        )
+        if self._loop is not None:
+            self._loop.stop()
 
-        desired_velocity = np.reshape(desired_velocity, samples)
-        current_velocity = np.reshape(current_velocity, samples)
-        current_time = np.reshape(current_time, samples)
-        acceleration = np.reshape(acceleration, samples)
+    def loop_stats(self):
+        """
+        Report deadline misses and jitter of the control thread.
 
-        # Creating Plots
-        fig, vel = plt.subplots()
+        Returns:
+            dict: See FixedRateLoop.stats, plus 'stale': ticks skipped for
+            lack of a recent velocity sample. None without a control thread
+        """
+        if self._loop is None:
+            return None
+        stats = self._loop.stats()
+        stats['stale'] = self.stale_ticks
+        return stats
 
-        vel.set_title("Target (g) vs Velocity (b) + Acceleration (o)")
-        vel.set_xlabel("Time")
-        vel.set_ylabel("Kph")
 
-        vel.set_xlim((np.amin(current_time) - 2.5), np.amax(current_time) + 2.5)
-        vel.set_ylim((np.amin(current_velocity) - 2.5), np.amax(current_velocity) + 2.5)
+    def sync_stats(self):
+        """
+        Report how velocity samples of simulation frames were ordered.
+
+        Returns:
+            dict: Frames passed to the controller, late samples dropped and simulator restarts seen
+        """
+        return {
+            'passed': self.frame_gate.passed,
+            'late': self.frame_gate.late,
+            'restarts': self.frame_gate.restarts
+        }
 
-        vel.plot(current_time, desired_velocity, 'tab:green')
-        vel.plot(current_time, current_velocity, 'tab:blue')
-        vel.plot(current_time, acceleration, 'tab:orange')
+    def store_results(self):
+        """
+        Write each recorded field to its own log file, one value per line.
+        The results are streamed chunk by chunk, so a run recorded to a file
+        is not loaded back as a whole.
+        """
+        with contextlib.ExitStack() as stack:
+            logs = [stack.enter_context(open(f"{field}.log", 'w')) for field in self.results.fields]
+            for rows in self.results.chunks():
+                for i, log in enumerate(logs):
+                    log.writelines(f"{value}\n" for value in rows[:, i].tolist())
+        self.results.close()
 
-        vel.grid()
+    def show_results(self):
+        """
+        Plot the results of the PID controller computations.
 
-        plt.savefig('results.png')
-        plt.close()
+        Plotting (matplotlib) is only loaded here, at shutdown, so it doesn't
+        slow down getting the control path ready; without matplotlib the plot
+        is skipped.
+        """
+        try:
+            from reporting import plot_results
+        except ImportError as e:
+            print(f"[WARNING] Plotting unavailable, skipping results.png: {e}")
+            return
+        plot_results(self.results)
@@ -0,0 +1,112 @@
+import threading
+import time
+import uuid
+from datetime import datetime
+
+import pytest
+
+from contract.adas_actor_event import AdasActorEvent
+from contract.ego_telemetry import EgoTelemetry
+from infotainment_app import notification_manager, notification_scheduler
+from infotainment_app.notification_manager import NotificationAggregator
+
+
+def make_event(x: float) -> AdasActorEvent:
+    return AdasActorEvent(
+        UUID=str(uuid.uuid4()),
+        actor_tag="pedestrian",
+        is_visible=True,
+        timestamp=datetime.utcnow(),
+        location=(x, 0.0, 0.0),
+    )
+
+
+class Frontend:
+    """Collects the UI updates an aggregator publishes."""
+
+    def __init__(self):
+        self.updates = []
+        self.lock = threading.Lock()
+
+    def __call__(self, message, count):
+        with self.lock:
+            self.updates.append((message, count))
+
+    def total(self):
+        with self.lock:
+            return sum(count for _, count in self.updates)
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_burst_is_one_update_with_the_latest_message_per_key():
+    frontend = Frontend()
+    aggregator = NotificationAggregator(frontend, window=60.0, max_messages=3)
+
+    for i in range(150):
+        aggregator.add(f"event {i} at 40 m", key=f"uuid-{i}")
+    # Newer states of the first 50 events supersede the pending ones in place
+    for i in range(50):
+        aggregator.add(f"event {i} at 20 m", key=f"uuid-{i}")
+    aggregator.flush()
+
+    assert frontend.updates == [("event 0 at 20 m; event 1 at 20 m; event 2 at 20 m (+147 more)", 150)]
+    assert aggregator.stats() == {"received": 200, "sent": 1, "superseded": 50, "suppressed": 199}
+
+
+def test_window_closes_on_its_own():
+    frontend = Frontend()
+    aggregator = NotificationAggregator(frontend, window=0.05, max_messages=3)
+
+    aggregator.add("first", key="a")
+    aggregator.add("second", key="b")
+    wait_for(lambda: frontend.updates)
+    aggregator.add("third", key="c")
+    wait_for(lambda: len(frontend.updates) == 2)
+
+    assert frontend.updates == [("first; second", 2), ("third", 1)]
+    assert aggregator.stats()["suppressed"] == 1
+
+
+@pytest.fixture
+def scheduler(monkeypatch):
+    frontend = Frontend()
+    monkeypatch.setattr(notification_manager, "_aggregator", NotificationAggregator(frontend, window=0.05, max_messages=3))
+    monkeypatch.setattr(notification_scheduler, "NOTIFICATION_MIN_INTERVAL_SECONDS", 0.2)
+    monkeypatch.setattr(notification_scheduler, "_grid", notification_scheduler.SpatialGrid(notification_scheduler.SPATIAL_CELL_SIZE_METERS))
+    monkeypatch.setattr(notification_scheduler, "_events", {})
+    monkeypatch.setattr(notification_scheduler, "_notified", set())
+    monkeypatch.setattr(notification_scheduler, "_last_notification_time", float("-inf"))
+    monkeypatch.setattr(notification_scheduler, "_deferred_dispatch", None)
+    monkeypatch.setattr(notification_scheduler, "ego_location", None)
+    notification_scheduler.update_ego_telemetry(EgoTelemetry(timestamp=datetime.utcnow(), location=(0.0, 0.0, 0.0), speed=0.0))
+    return frontend
+
+
+def test_traffic_jam_gives_a_handful_of_updates(scheduler):
+    events = [make_event(float(i % 45)) for i in range(300)]
+    for event in events:
+        notification_scheduler.add_event(event)
+
+    wait_for(lambda: scheduler.total() == len(events))
+    assert len(scheduler.updates) <= 3
+    # Events held back by the rate limit go out nearest first
+    assert scheduler.updates[-1][0].startswith("pedestrian detected 0 m away")
+    stats = notification_manager.get_notification_stats()
+    assert stats["received"] == len(events)
+    assert stats["sent"] == len(scheduler.updates)
+    assert stats["suppressed"] == len(events) - len(scheduler.updates)
+
+
+def test_events_outside_the_radius_are_not_notified(scheduler):
+    notification_scheduler.add_event(make_event(10.0))
+    notification_scheduler.add_event(make_event(500.0))
+
+    wait_for(lambda: scheduler.updates)
+    time.sleep(0.3)
+    assert scheduler.updates == [("pedestrian detected 10 m away", 1)]